@@ -36,6 +36,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'worlds.middleware.ServerTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -81,12 +82,14 @@ if os.getenv('USE_SQLITE', '0') == '1':
     DATABASES['default'] = {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file rather than the in-memory default, so threaded tests share one database.
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 
 CACHES = {
     'default': {
         'BACKEND': os.getenv('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
-        'LOCATION': 'github-profile-world-cache',
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', 'github-profile-world-cache'),
     }
 }
 
@@ -113,9 +116,45 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': os.getenv('API_ANON_THROTTLE', '30/min'),
+        'world-status': os.getenv('API_STATUS_THROTTLE', '120/min'),
     },
 }
 
-GITHUB_API_BASE = 'https://api.github.com'
+GITHUB_API_BASE = os.getenv('GITHUB_API_BASE', 'https://api.github.com')
 GITHUB_TOKEN = os.getenv('GITHUB_TOKEN', '')
 WORLD_TTL_HOURS = int(os.getenv('WORLD_TTL_HOURS', '24'))
+GITHUB_DEEP_FETCH_REPOS = int(os.getenv('GITHUB_DEEP_FETCH_REPOS', '12'))
+GITHUB_DEEP_FETCH_WORKERS = int(os.getenv('GITHUB_DEEP_FETCH_WORKERS', '6'))
+GITHUB_DEEP_FETCH_BUDGET_SECONDS = float(os.getenv('GITHUB_DEEP_FETCH_BUDGET_SECONDS', '10'))
+WORLD_GENERATION_ASYNC = os.getenv('WORLD_GENERATION_ASYNC', '1') == '1'
+WORLD_JOB_WORKERS = int(os.getenv('WORLD_JOB_WORKERS', '4'))
+WORLD_BATCH_JOB_WORKERS = int(os.getenv('WORLD_BATCH_JOB_WORKERS', '1'))
+WORLD_PROCESSING_TIMEOUT_SECONDS = int(os.getenv('WORLD_PROCESSING_TIMEOUT_SECONDS', '300'))
+GITHUB_HTTP_CACHE_SIZE = int(os.getenv('GITHUB_HTTP_CACHE_SIZE', '2048'))
+GITHUB_HTTP_CACHE_TTL_SECONDS = int(os.getenv('GITHUB_HTTP_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+GITHUB_HTTP_CACHE_MAX_BYTES = int(os.getenv('GITHUB_HTTP_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+WORLD_INCREMENTAL_REFRESH = os.getenv('WORLD_INCREMENTAL_REFRESH', '1') == '1'
+GITHUB_MAX_REPOS = int(os.getenv('GITHUB_MAX_REPOS', '2000'))
+GITHUB_PAGE_FETCH_WORKERS = int(os.getenv('GITHUB_PAGE_FETCH_WORKERS', '4'))
+GITHUB_API_MODE = os.getenv('GITHUB_API_MODE', 'rest')
+GITHUB_GRAPHQL_URL = f'{GITHUB_API_BASE}/graphql'
+GITHUB_TOKENS = [token.strip() for token in os.getenv('GITHUB_TOKENS', '').split(',') if token.strip()]
+GITHUB_TOKEN_INVALID_PARK_SECONDS = int(os.getenv('GITHUB_TOKEN_INVALID_PARK_SECONDS', '3600'))
+GITHUB_HTTP_POOL_SIZE = int(os.getenv('GITHUB_HTTP_POOL_SIZE', '32'))
+GITHUB_HTTP_MAX_RETRIES = int(os.getenv('GITHUB_HTTP_MAX_RETRIES', '2'))
+GITHUB_HTTP_RETRY_BACKOFF = float(os.getenv('GITHUB_HTTP_RETRY_BACKOFF', '0.3'))
+WORLD_ASYNC_VIEWS = os.getenv('WORLD_ASYNC_VIEWS', '0') == '1'
+GITHUB_ASYNC_MAX_CONNECTIONS = int(os.getenv('GITHUB_ASYNC_MAX_CONNECTIONS', '200'))
+WORLD_STALE_GRACE_HOURS = float(os.getenv('WORLD_STALE_GRACE_HOURS', '24'))
+WORLD_RETENTION_KEEP = int(os.getenv('WORLD_RETENTION_KEEP', '2'))
+SHARE_TOKEN_TTL_DAYS = int(os.getenv('SHARE_TOKEN_TTL_DAYS', '0'))
+WORLD_BATCH_CONCURRENCY = int(os.getenv('WORLD_BATCH_CONCURRENCY', '8'))
+WORLD_BATCH_CHUNK_SIZE = int(os.getenv('WORLD_BATCH_CHUNK_SIZE', '50'))
+WORLD_BATCH_MAX_USERNAMES = int(os.getenv('WORLD_BATCH_MAX_USERNAMES', '1000'))
+WORLD_SERVER_TIMING = os.getenv('WORLD_SERVER_TIMING', '1') == '1'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+WORLD_PROFILE_DIR = os.getenv('WORLD_PROFILE_DIR', '')
+WORLD_LOCAL_CACHE_SIZE = int(os.getenv('WORLD_LOCAL_CACHE_SIZE', '1024'))
+WORLD_LOCAL_RENDERED_CACHE_SIZE = int(os.getenv('WORLD_LOCAL_RENDERED_CACHE_SIZE', '64'))
+WORLD_LOCAL_CACHE_TTL_SECONDS = int(os.getenv('WORLD_LOCAL_CACHE_TTL_SECONDS', '10'))
+WORLD_SHARE_CACHE_SECONDS = int(os.getenv('WORLD_SHARE_CACHE_SECONDS', '60'))
@@ -1,9 +1,11 @@
 from django.contrib import admin
 
-from .models import LanguageStats, RenderConfig, RepoSnapshot, ShareToken, World
+from .models import LanguageStats, RenderConfig, RenderedWorld, RepoContent, RepoSnapshot, ShareToken, World
 
 admin.site.register(World)
 admin.site.register(RepoSnapshot)
+admin.site.register(RepoContent)
 admin.site.register(LanguageStats)
 admin.site.register(RenderConfig)
 admin.site.register(ShareToken)
+admin.site.register(RenderedWorld)
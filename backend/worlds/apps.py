@@ -4,3 +4,22 @@ from django.apps import AppConfig
 class WorldsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'worlds'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save
+
+        from .models import ShareToken
+
+        from .services.http_cache import response_cache_metrics
+        from .services.metrics import REGISTRY, install_query_counter
+        from .services.tiered_cache import tiered_cache_metrics
+        from .services.token_pool import token_pool_metrics
+        from .services.world_service import forget_share_token
+
+        connection_created.connect(install_query_counter, dispatch_uid='worlds.count_queries')
+        post_save.connect(forget_share_token, sender=ShareToken, dispatch_uid='worlds.share_token_saved')
+        post_delete.connect(forget_share_token, sender=ShareToken, dispatch_uid='worlds.share_token_deleted')
+        REGISTRY.add_collector(response_cache_metrics)
+        REGISTRY.add_collector(token_pool_metrics)
+        REGISTRY.add_collector(tiered_cache_metrics)
@@ -0,0 +1,213 @@
+"""Native async versions of the generate, detail and share endpoints for ASGI deployments.
+
+Routed instead of the DRF views when ``WORLD_ASYNC_VIEWS`` is on. They answer with the same
+bodies and headers; GitHub calls go through the async client for ``GITHUB_API_MODE`` and
+reads use the async ORM and cache APIs, so a worker can keep many requests in flight
+without a thread each. Database writes and DRF's throttles, which are synchronous, run in
+a worker thread.
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from .models import RenderedWorld, World
+from .serializers import GenerateWorldInputSerializer
+from .services.github_async import get_async_github_client
+from .services.github_service import GitHubError, GitHubNotFoundError, GitHubRateLimitError
+from .services.metrics import stage
+from .services.rendering import aget_current_rendering, world_etag
+from .services.world_service import (
+    agenerate_world,
+    aload_share_token,
+    aload_world_meta,
+    arate_limited_until,
+    aremember_rate_limit,
+    await_world,
+    claim_world_generation,
+    display_status,
+    failure_message,
+    find_active_world,
+    find_latest_ready_world,
+    mark_failed,
+    revalidate_world,
+    schedule_world_generation,
+    within_stale_grace,
+)
+from .views import (
+    WorldDetailView,
+    _apply_cache_headers,
+    _not_modified,
+    _render_on_demand,
+    _rendered_response,
+    cached_world_data,
+    created_world_data,
+    queued_world_data,
+    rate_limited_data,
+    stale_world_data,
+)
+
+
+def _json(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(JSONRenderer().render(data), content_type='application/json', status=status_code)
+
+
+def _finalize(response):
+    """Render a DRF ``Response`` built by the sync helpers outside of an ``APIView``."""
+    if isinstance(response, Response):
+        response.accepted_renderer = JSONRenderer()
+        response.accepted_media_type = 'application/json'
+        response.renderer_context = {}
+        response.render()
+    return response
+
+
+def _throttle_wait(request):
+    """Apply the default DRF throttles to a plain Django request; seconds to wait, or ``None``."""
+    view = APIView()
+    drf_request = view.initialize_request(request)
+    waits = [
+        throttle.wait()
+        for throttle in (throttle_class() for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES)
+        if not throttle.allow_request(drf_request, view)
+    ]
+    if not waits:
+        return None
+    return max((wait for wait in waits if wait is not None), default=0)
+
+
+async def _throttled_response(request):
+    wait = await sync_to_async(_throttle_wait)(request)
+    if wait is None:
+        return None
+    seconds = int(round(wait))
+    response = _json(
+        {'detail': f'Request was throttled. Expected available in {seconds} seconds.'},
+        status.HTTP_429_TOO_MANY_REQUESTS,
+    )
+    response['Retry-After'] = str(seconds)
+    return response
+
+
+def _not_found(model):
+    return _json({'detail': f'No {model._meta.object_name} matches the given query.'}, status.HTTP_404_NOT_FOUND)
+
+
+async def _aserve_world(request, world, kind):
+    etag = world_etag(world, kind)
+    not_modified = _not_modified(request, world, etag, gzipped=True)
+    if not_modified is not None:
+        return not_modified
+    rendered = await aget_current_rendering(world, kind, etag)
+    if rendered is None:
+        return _finalize(await sync_to_async(_render_on_demand)(request, world.pk, kind))
+    return _apply_cache_headers(_rendered_response(request, rendered), world, etag)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncGenerateWorldView(View):
+    async def post(self, request):
+        throttled = await _throttled_response(request)
+        if throttled is not None:
+            return throttled
+        try:
+            data = json.loads(request.body or b'{}') if request.content_type == 'application/json' else request.POST
+        except ValueError as exc:
+            return _json({'detail': f'JSON parse error - {exc}'}, status.HTTP_400_BAD_REQUEST)
+        serializer = GenerateWorldInputSerializer(data=data)
+        if not serializer.is_valid():
+            return _json(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+        client = get_async_github_client()
+        try:
+            username = client.parse_username(
+                github_url=serializer.validated_data.get('github_url'),
+                username=serializer.validated_data.get('username'),
+            )
+        except GitHubError as exc:
+            return _json({'detail': str(exc)}, status.HTTP_400_BAD_REQUEST)
+
+        with stage('lookup'):
+            active_world = await sync_to_async(find_active_world)(username)
+            stale_world = None if active_world else await sync_to_async(find_latest_ready_world)(username)
+        if active_world:
+            return _json(cached_world_data(active_world))
+
+        reset_at = await arate_limited_until()
+        if reset_at:
+            return _json(*rate_limited_data(stale_world, reset_at))
+
+        if stale_world and within_stale_grace(stale_world):
+            await sync_to_async(revalidate_world)(username)
+            return _json(stale_world_data(stale_world))
+
+        world, created = await sync_to_async(claim_world_generation)(username)
+        if not created and display_status(world) == World.STATUS_READY:
+            return _json(cached_world_data(world))
+
+        if settings.WORLD_GENERATION_ASYNC:
+            if created:
+                await sync_to_async(schedule_world_generation)(world)
+            return _json(queued_world_data(world), status.HTTP_202_ACCEPTED)
+
+        if not created:
+            world = await await_world(world)
+            if display_status(world) != World.STATUS_READY:
+                return _json(
+                    {'detail': failure_message(world) or 'World generation is still in progress.'},
+                    status.HTTP_502_BAD_GATEWAY,
+                )
+            return _json(cached_world_data(world))
+
+        try:
+            await agenerate_world(world, client)
+        except GitHubNotFoundError as exc:
+            await sync_to_async(mark_failed)(world, str(exc))
+            return _json({'detail': str(exc)}, status.HTTP_404_NOT_FOUND)
+        except GitHubRateLimitError as exc:
+            await aremember_rate_limit(exc.reset_at)
+            await sync_to_async(mark_failed)(world, 'GitHub API rate limit reached. Try again later.')
+            return _json(*rate_limited_data(stale_world, exc.reset_at))
+        except GitHubError as exc:
+            await sync_to_async(mark_failed)(world, str(exc))
+            return _json({'detail': str(exc)}, status.HTTP_502_BAD_GATEWAY)
+
+        return _json(created_world_data(world), status.HTTP_201_CREATED)
+
+
+class AsyncWorldDetailView(View):
+    async def get(self, request, world_id):
+        if 'fields' in request.GET:
+            # Sparse projections are rendered live by the sync view.
+            return await sync_to_async(WorldDetailView.as_view())(request, world_id=world_id)
+        throttled = await _throttled_response(request)
+        if throttled is not None:
+            return throttled
+        world = await aload_world_meta(world_id)
+        if world is None:
+            return _not_found(World)
+        return await _aserve_world(request, world, RenderedWorld.KIND_DETAIL)
+
+
+class AsyncWorldShareView(View):
+    async def get(self, request, world_id):
+        throttled = await _throttled_response(request)
+        if throttled is not None:
+            return throttled
+        world = await aload_world_meta(world_id)
+        if world is None:
+            return _not_found(World)
+        token = await aload_share_token(world.pk)
+        if not token or not token.is_valid():
+            return _json({'detail': 'Share link is not active.'}, status.HTTP_403_FORBIDDEN)
+        return await _aserve_world(request, world, RenderedWorld.KIND_SHARE)
@@ -0,0 +1,86 @@
+"""Deterministic synthetic GitHub data and timing helpers shared by the benchmark commands."""
+
+import random
+import statistics
+import time
+
+LANGUAGES = ['Python', 'TypeScript', 'JavaScript', 'Go', 'Rust', 'C++', 'Shell', None]
+
+
+def synthetic_user(login='bench-user', repo_count=0, seed=0):
+    rng = random.Random(f'{login}:{seed}')
+    return {
+        'id': rng.randint(1, 10_000_000),
+        'login': login,
+        'html_url': f'https://github.com/{login}',
+        'avatar_url': f'https://avatars.githubusercontent.com/u/{rng.randint(1, 10_000_000)}',
+        'followers': rng.randint(0, 50_000),
+        'following': rng.randint(0, 500),
+        'public_repos': repo_count,
+    }
+
+
+def synthetic_repos(count, owner='bench-user', seed=0):
+    """Return ``count`` repo dicts shaped like GitHub's ``/users/{u}/repos`` response."""
+    rng = random.Random(f'{owner}:{seed}')
+    repos = []
+    for idx in range(count):
+        stars = int(rng.paretovariate(1.2)) - 1
+        name = f'repo-{idx:05d}'
+        repos.append(
+            {
+                'id': 1_000_000 + idx,
+                'name': name,
+                'full_name': f'{owner}/{name}',
+                'html_url': f'https://github.com/{owner}/{name}',
+                'description': f'Synthetic repository {idx} ' * rng.randint(0, 4),
+                'language': rng.choice(LANGUAGES),
+                'stargazers_count': stars,
+                'forks_count': stars // rng.randint(2, 10),
+                'watchers_count': stars,
+                'open_issues_count': rng.randint(0, 40),
+                'size': rng.randint(0, 200_000),
+                'fork': rng.random() < 0.2,
+                'default_branch': rng.choice(['main', 'master']),
+                'pushed_at': f'2026-{rng.randint(1, 9):02d}-{rng.randint(1, 28):02d}T12:00:00Z',
+            }
+        )
+    return repos
+
+
+def synthetic_repo_details(repos, limit=12, seed=0):
+    rng = random.Random(seed)
+    return {
+        repo['full_name']: {
+            'commits_30d': rng.randint(0, 120),
+            'language_breakdown': {repo['language'] or 'Shell': rng.randint(1, 500_000), 'Makefile': 120},
+        }
+        for repo in repos[:limit]
+    }
+
+
+def time_call(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        'n': len(samples),
+        'mean_ms': statistics.fmean(samples) * 1000 if samples else 0.0,
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+    }
@@ -0,0 +1,248 @@
+"""A local stand-in for the GitHub API, for tests, benchmarks and manual load tests.
+
+Serves the endpoints ``GitHubClient`` uses with deterministic synthetic data: users,
+paginated repos with ``Link`` headers, per-repo languages and 30-day commit counts (as the
+``Link`` last page, like GitHub). Responses carry ``ETag`` and answer ``If-None-Match`` with
+304, and ``X-RateLimit-*`` headers count down per token; an exhausted budget returns 403
+until the window resets. Usernames starting with ``missing`` return 404.
+
+``POST /graphql`` answers the repo page query of ``GitHubGraphQLClient`` from the same data,
+with cursors as repo offsets; like GitHub it needs a token. Point ``GITHUB_GRAPHQL_URL`` at
+it to exercise ``GITHUB_API_MODE=graphql``.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .benchmarks import synthetic_repos, synthetic_user
+
+USER_PATH = re.compile(r'^/users/([^/]+)$')
+REPOS_PATH = re.compile(r'^/users/([^/]+)/repos$')
+LANGUAGES_PATH = re.compile(r'^/repos/([^/]+)/([^/]+)/languages$')
+COMMITS_PATH = re.compile(r'^/repos/([^/]+)/([^/]+)/commits$')
+
+
+class FakeGitHub:
+    """Deterministic fake GitHub API; ``start()`` serves it on a background thread.
+
+    ``repos`` is the repo count of every user, ``latency``/``jitter`` (seconds) delay each
+    response, and ``rate_limit`` is the per-token budget of one ``window`` (seconds).
+    ``calls`` counts requests by kind (``user``, ``repos``, ``languages``, ``commits``,
+    ``graphql``), and ``not_modified`` those of them answered 304. After ``graphql_limit``
+    GraphQL queries every further one is answered 401, as if the token had been revoked
+    mid-generation.
+    """
+
+    def __init__(self, repos=30, latency=0.0, jitter=0.0, rate_limit=5000, window=3600, seed=0, graphql_limit=None):
+        self.repos = repos
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.window = window
+        self.seed = seed
+        self.graphql_limit = graphql_limit
+        self._graphql_served = 0
+        self.calls = Counter()
+        self.not_modified = Counter()
+        self._budgets = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self, host='127.0.0.1', port=0):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self._reply(*fake.handle(self.path, self.headers))
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                self._reply(*fake.handle(self.path, self.headers, self.rfile.read(length)))
+
+            def _reply(self, status, body, headers):
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='fake-github', daemon=True).start()
+        return self.base_url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _charge(self, token):
+        """Spend one call of ``token``'s budget; returns ``(remaining, reset)``, remaining ``-1`` once exhausted."""
+        now = time.time()
+        with self._lock:
+            remaining, reset = self._budgets.get(token, (self.rate_limit, int(now) + self.window))
+            if now >= reset:
+                remaining, reset = self.rate_limit, int(now) + self.window
+            if remaining <= 0:
+                return -1, reset
+            self._budgets[token] = (remaining - 1, reset)
+            return remaining - 1, reset
+
+    def handle(self, raw_path, request_headers, request_body=None):
+        """Answer one request, a POST when ``request_body`` is given; returns ``(status, body_bytes, headers)``."""
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+        url = urlparse(raw_path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        token = request_headers.get('Authorization') or 'anonymous'
+        remaining, reset = self._charge(token)
+        headers = {
+            'Content-Type': 'application/json; charset=utf-8',
+            'X-RateLimit-Limit': str(self.rate_limit),
+            'X-RateLimit-Remaining': str(max(remaining, 0)),
+            'X-RateLimit-Reset': str(reset),
+        }
+        if remaining < 0:
+            return 403, json.dumps({'message': 'API rate limit exceeded'}).encode(), headers
+
+        if request_body is not None:
+            kind, status, payload = self._graphql(url.path, request_headers, request_body)
+        else:
+            kind, status, payload = self._route(url.path, query, headers)
+        self.calls[kind] += 1
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        if status == 200 and request_body is None:
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            headers['ETag'] = etag
+            if request_headers.get('If-None-Match') == etag:
+                self.not_modified[kind] += 1
+                return 304, b'', headers
+        return status, body, headers
+
+    def _route(self, path, query, headers):
+        match = USER_PATH.match(path)
+        if match:
+            login = match.group(1)
+            if login.startswith('missing'):
+                return 'user', 404, {'message': 'Not Found'}
+            return 'user', 200, synthetic_user(login, repo_count=self.repos, seed=self.seed)
+
+        match = REPOS_PATH.match(path)
+        if match:
+            login = match.group(1)
+            per_page = int(query.get('per_page', 30))
+            page = int(query.get('page', 1))
+            last = max(1, -(-self.repos // per_page))
+            if page < last:
+                link = f'{path}?per_page={per_page}&page='
+                headers['Link'] = f'<{link}{page + 1}>; rel="next", <{link}{last}>; rel="last"'
+            return 'repos', 200, self.user_repos(login)[(page - 1) * per_page : page * per_page]
+
+        match = LANGUAGES_PATH.match(path)
+        if match:
+            return 'languages', 200, self.repo_languages(f'{match.group(1)}/{match.group(2)}')
+
+        match = COMMITS_PATH.match(path)
+        if match:
+            count = self.commit_count(f'{match.group(1)}/{match.group(2)}')
+            if count > 1:
+                link = f'{path}?per_page=1&page='
+                headers['Link'] = f'<{link}2>; rel="next", <{link}{count}>; rel="last"'
+            return 'commits', 200, [{}] if count else []
+
+        return 'other', 404, {'message': 'Not Found'}
+
+    def _graphql(self, path, request_headers, request_body):
+        if path != '/graphql':
+            return 'other', 404, {'message': 'Not Found'}
+        if not request_headers.get('Authorization'):
+            return 'graphql', 401, {'message': 'This endpoint requires you to be authenticated.'}
+        with self._lock:
+            served = self._graphql_served
+            self._graphql_served += 1
+        if self.graphql_limit is not None and served >= self.graphql_limit:
+            return 'graphql', 401, {'message': 'Bad credentials'}
+
+        variables = json.loads(request_body)['variables']
+        login = variables['login']
+        if login.startswith('missing'):
+            return 'graphql', 200, {'data': {'user': None}, 'errors': [{'type': 'NOT_FOUND'}]}
+        offset = int(variables.get('after') or 0)
+        end = min(offset + variables['first'], self.repos)
+        user = synthetic_user(login, repo_count=self.repos, seed=self.seed)
+        nodes = [self._graphql_repo(repo, variables['withHistory']) for repo in self.user_repos(login)[offset:end]]
+        return 'graphql', 200, {
+            'data': {
+                'user': {
+                    'databaseId': user['id'],
+                    'login': user['login'],
+                    'name': None,
+                    'url': user['html_url'],
+                    'avatarUrl': user['avatar_url'],
+                    'followers': {'totalCount': user['followers']},
+                    'following': {'totalCount': user['following']},
+                    'repositories': {
+                        'totalCount': self.repos,
+                        'pageInfo': {'hasNextPage': end < self.repos, 'endCursor': str(end)},
+                        'nodes': nodes,
+                    },
+                }
+            }
+        }
+
+    def _graphql_repo(self, repo, with_history):
+        languages = self.repo_languages(repo['full_name'])
+        target = {'history': {'totalCount': self.commit_count(repo['full_name'])}} if with_history else {}
+        return {
+            'databaseId': repo['id'],
+            'name': repo['name'],
+            'nameWithOwner': repo['full_name'],
+            'url': repo['html_url'],
+            'description': repo['description'],
+            'primaryLanguage': {'name': repo['language']} if repo['language'] else None,
+            'stargazerCount': repo['stargazers_count'],
+            'forkCount': repo['forks_count'],
+            'issues': {'totalCount': repo['open_issues_count']},
+            'diskUsage': repo['size'],
+            'isFork': repo['fork'],
+            'pushedAt': repo['pushed_at'],
+            'updatedAt': None,
+            'languages': {'edges': [{'size': size, 'node': {'name': name}} for name, size in languages.items()]},
+            'defaultBranchRef': {'name': repo['default_branch'], 'target': target},
+        }
+
+    def repo_languages(self, full_name):
+        rng = random.Random(f'/repos/{full_name}/languages:{self.seed}')
+        language = rng.choice(['Python', 'TypeScript', 'Go', 'Rust', 'Shell'])
+        return {language: rng.randint(1, 500_000), 'Makefile': 120}
+
+    def commit_count(self, full_name):
+        return random.Random(f'/repos/{full_name}/commits:{self.seed}').randint(0, 120)
+
+    def user_repos(self, login):
+        repos = synthetic_repos(self.repos, owner=login, seed=self.seed)
+        # Repo ids are global on GitHub; keep them unique across synthetic users too.
+        base = (zlib.crc32(login.encode('utf-8')) % 1_000_000) * 100_000
+        for index, repo in enumerate(repos):
+            repo['id'] = base + index
+        return repos
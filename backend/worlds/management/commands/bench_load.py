@@ -0,0 +1,235 @@
+import json
+import queue
+import secrets
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+
+from worlds.benchmarks import summarize
+from worlds.fake_github import FakeGitHub
+from worlds.models import World
+from worlds.services.retention import delete_orphaned_contents, delete_worlds
+from worlds.services.token_pool import reset_token_pool
+from worlds.services.world_service import RATE_LIMIT_CACHE_KEY
+
+SCENARIOS = ('cold_generate', 'cached_generate', 'detail', 'share', 'same_user')
+CLEANUP_BATCH = 500
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test world generation and reads in-process against a local fake GitHub API and report '
+        'throughput and p50/p95/p99 per scenario. Worlds it creates are deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated subset to run.')
+        parser.add_argument('--users', type=int, default=20, help='Distinct usernames generated.')
+        parser.add_argument('--repos', type=int, default=60, help='Repos per synthetic user.')
+        parser.add_argument('--latency-ms', type=float, default=20.0, help='Fake GitHub delay per call.')
+        parser.add_argument('--jitter-ms', type=float, default=0.0, help='Extra random delay per call, up to this.')
+        parser.add_argument('--rate-limit', type=int, default=1_000_000, help='Fake GitHub calls per token per hour.')
+        parser.add_argument('--concurrency', type=int, default=4, help='Client threads per scenario.')
+        parser.add_argument('--reads', type=int, default=200, help='Requests per read scenario.')
+        parser.add_argument('--same-user', type=int, default=16, help='Simultaneous generates of one new username.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--save', help='Write the results as JSON, e.g. to keep as a baseline.')
+        parser.add_argument('--compare', help='Baseline JSON from --save; fails on p95 or throughput regressions.')
+        parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed regression against --compare.')
+
+    def handle(self, *args, **options):
+        scenarios = [name for name in options['scenarios'].split(',') if name]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}. Choose from {', '.join(SCENARIOS)}.")
+        fake = FakeGitHub(
+            repos=options['repos'],
+            latency=options['latency_ms'] / 1000,
+            jitter=options['jitter_ms'] / 1000,
+            rate_limit=options['rate_limit'],
+            seed=options['seed'],
+        )
+        # A fresh prefix per run keeps cold generates cold: no ETag or world cache entries apply.
+        prefix = f'bench-{secrets.token_hex(3)}-'
+        usernames = [f'{prefix}{index}' for index in range(options['users'])]
+        results = {}
+        try:
+            with self._bench_settings(fake.start()):
+                world_ids = self._generate(usernames, options, results, timed='cold_generate' in scenarios)
+                if 'cached_generate' in scenarios:
+                    results['cached_generate'] = self._run(self._generate_requests(usernames), options['concurrency'])
+                for name, suffix in (('detail', ''), ('share', '/share')):
+                    if name in scenarios:
+                        requests = self._read_requests(world_ids, suffix, options['reads'])
+                        results[name] = self._run(requests, options['concurrency'])
+                if 'same_user' in scenarios:
+                    before = fake.calls['user']
+                    requests = self._generate_requests([f'{prefix}same'] * options['same_user'])
+                    results['same_user'] = self._run(requests, options['same_user'], together=True)
+                    results['same_user']['github_user_fetches'] = fake.calls['user'] - before
+        finally:
+            fake.stop()
+            self._cleanup(prefix)
+
+        self.stdout.write(
+            f"{options['users']} users x {options['repos']} repos, fake GitHub {options['latency_ms']:.0f} ms/call, "
+            f'{sum(fake.calls.values())} GitHub calls served.'
+        )
+        for name, result in results.items():
+            self.stdout.write(self._format(name, result))
+        report = {'config': self._config(options), 'scenarios': results}
+        if options['save']:
+            with open(options['save'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Saved results to {options['save']}.")
+        incomplete = [name for name, result in results.items() if result['requests'] < result['issued']]
+        if incomplete:
+            raise CommandError(f"Requests did not complete in: {', '.join(incomplete)}.")
+        if options['compare']:
+            self._compare(report, options['compare'], options['tolerance'])
+
+    @contextmanager
+    def _bench_settings(self, base_url):
+        """Point GitHub calls at the fake server, generate inline and lift API throttles for the run."""
+        rates = settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+        saved_rates = dict(rates)
+        rate_limited = cache.get(RATE_LIMIT_CACHE_KEY)
+        overrides = override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            GITHUB_API_BASE=base_url,
+            GITHUB_API_MODE='rest',
+            # Real tokens must not be sent to the fake server or have its rate limits recorded.
+            GITHUB_TOKEN='',
+            GITHUB_TOKENS=[],
+            WORLD_GENERATION_ASYNC=False,
+        )
+        # Throttle classes keep a reference to this dict; a rate of None disables a scope.
+        rates.update(dict.fromkeys(rates))
+        reset_token_pool()
+        try:
+            with overrides:
+                yield
+        finally:
+            rates.update(saved_rates)
+            reset_token_pool()
+            if rate_limited is None:
+                cache.delete(RATE_LIMIT_CACHE_KEY)
+
+    def _generate_requests(self, usernames):
+        return [('post', '/api/world/generate', {'username': username}) for username in usernames]
+
+    def _read_requests(self, world_ids, suffix, count):
+        return [('get', f'/api/world/{world_ids[index % len(world_ids)]}{suffix}') for index in range(count)]
+
+    def _generate(self, usernames, options, results, timed):
+        """Generate a world per username, timed as ``cold_generate`` if asked; returns the world ids."""
+        result = self._run(self._generate_requests(usernames), options['concurrency'])
+        if timed:
+            results['cold_generate'] = result
+        world_ids = list(World.objects.filter(username__in=usernames).values_list('id', flat=True))
+        if not world_ids:
+            raise CommandError(f"No world was generated (responses: {result['statuses']}).")
+        return world_ids
+
+    def _run(self, requests, concurrency, together=False):
+        """Send ``requests`` from ``concurrency`` client threads; ``together`` starts them all at once."""
+        pending = queue.SimpleQueue()
+        for request in requests:
+            pending.put(request)
+        samples = []
+        statuses = Counter()
+        lock = threading.Lock()
+        workers = max(1, min(concurrency, len(requests)))
+        barrier = threading.Barrier(workers) if together else None
+
+        def worker():
+            # View exceptions become 500 responses instead of killing the thread uncounted.
+            client = Client(raise_request_exception=False)
+            try:
+                if barrier is not None:
+                    barrier.wait()
+                while True:
+                    try:
+                        method, path, *data = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    started = time.perf_counter()
+                    try:
+                        if method == 'post':
+                            response = client.post(path, data[0], content_type='application/json')
+                        else:
+                            response = client.get(path, HTTP_ACCEPT_ENCODING='gzip')
+                    except Exception as exc:
+                        with lock:
+                            statuses[type(exc).__name__] += 1
+                        continue
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        samples.append(elapsed)
+                        statuses[str(response.status_code)] += 1
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+        stats = summarize(samples)
+        return {
+            'issued': len(requests),
+            'requests': stats.pop('n'),
+            'errors': sum(count for code, count in statuses.items() if not code.isdigit() or int(code) >= 400),
+            'statuses': dict(sorted(statuses.items())),
+            'throughput_rps': len(samples) / wall if wall else 0.0,
+            **stats,
+        }
+
+    def _cleanup(self, prefix):
+        world_ids = list(World.objects.filter(username__startswith=prefix).values_list('id', flat=True))
+        for start in range(0, len(world_ids), CLEANUP_BATCH):
+            delete_worlds(world_ids[start : start + CLEANUP_BATCH])
+        delete_orphaned_contents(CLEANUP_BATCH)
+
+    def _config(self, options):
+        keys = ('users', 'repos', 'latency_ms', 'jitter_ms', 'concurrency', 'reads', 'same_user', 'seed')
+        return {key: options[key] for key in keys}
+
+    def _format(self, name, result):
+        line = (
+            f"{name:<16} {result['requests']:>5}/{result['issued']} req  {result['throughput_rps']:8.1f} req/s  "
+            f"p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+            f"errors {result['errors']}"
+        )
+        if 'github_user_fetches' in result:
+            line += f"  github profile fetches {result['github_user_fetches']}"
+        return line
+
+    def _compare(self, report, path, tolerance):
+        with open(path) as fh:
+            baseline = json.load(fh)
+        if baseline.get('config') != report['config']:
+            self.stdout.write(self.style.WARNING('Baseline was recorded with different options; deltas may mislead.'))
+        regressions = []
+        for name, result in report['scenarios'].items():
+            before = baseline.get('scenarios', {}).get(name)
+            if before is None:
+                continue
+            p95_delta = result['p95_ms'] / max(before['p95_ms'], 1e-9) - 1
+            rps_delta = result['throughput_rps'] / max(before['throughput_rps'], 1e-9) - 1
+            self.stdout.write(f'{name:<16} p95 {p95_delta:+.1%}  throughput {rps_delta:+.1%}  vs baseline')
+            if p95_delta > tolerance or rps_delta < -tolerance:
+                regressions.append(name)
+        if regressions:
+            raise CommandError(f"Regressed beyond {tolerance:.0%} of the baseline: {', '.join(regressions)}.")
+        self.stdout.write(self.style.SUCCESS(f'Within {tolerance:.0%} of the baseline.'))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from worlds.benchmarks import summarize, synthetic_repos, synthetic_user, time_call
+from worlds.services import github_service
+from worlds.services.github_service import build_world_payload
+
+
+class Command(BaseCommand):
+    help = 'Time build_world_payload on synthetic repo lists and check the NumPy and Python backends agree.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,10000,100000', help='Comma-separated repo counts.')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size]
+        backends = [False, True] if github_service.np is not None else [False]
+        if len(backends) == 1:
+            self.stdout.write('NumPy is not installed; timing the pure-Python backend only.')
+
+        for size in sizes:
+            repos = synthetic_repos(size, owner=f'bench-{size}')
+            user = synthetic_user(f'bench-{size}', repo_count=size)
+            outputs = [build_world_payload(user, repos, use_numpy=use_numpy) for use_numpy in backends]
+            if any(output != outputs[0] for output in outputs[1:]):
+                raise CommandError(f'Backends disagree for {size} repos.')
+
+            line = [f'{size:>7} repos']
+            for use_numpy in backends:
+                stats = summarize(time_call(lambda: build_world_payload(user, repos, use_numpy=use_numpy), options['repeat']))
+                label = 'numpy' if use_numpy else 'python'
+                line.append(f"{label} p50 {stats['p50_ms']:9.2f} ms")
+            self.stdout.write('  '.join(line))
@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from worlds.benchmarks import summarize, synthetic_repo_details, synthetic_repos, synthetic_user, time_call
+from worlds.models import RepoSnapshot
+from worlds.services.bulk_insert import can_copy, insert_rows
+from worlds.services.github_service import build_world_payload
+from worlds.services.world_service import (
+    SNAPSHOT_INSERT_FIELDS,
+    create_processing_world,
+    persist_world,
+    snapshot_rows,
+    store_repo_contents,
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Time RepoSnapshot inserts through bulk_create against the bulk insert path (COPY on PostgreSQL).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,5000', help='Comma-separated repo counts.')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size]
+        self.stdout.write(f"Insert path: {'COPY' if can_copy() else 'multi-row INSERT'} above the COPY threshold.")
+        try:
+            # Everything is written inside a transaction that is always rolled back.
+            with transaction.atomic():
+                for size in sizes:
+                    rows = self._snapshot_rows(size)
+
+                    def orm():
+                        with transaction.atomic():
+                            RepoSnapshot.objects.bulk_create(
+                                [RepoSnapshot(**dict(zip(SNAPSHOT_INSERT_FIELDS, row))) for row in rows]
+                            )
+                            transaction.set_rollback(True)
+
+                    def bulk():
+                        with transaction.atomic():
+                            insert_rows(RepoSnapshot, SNAPSHOT_INSERT_FIELDS, rows)
+                            transaction.set_rollback(True)
+
+                    orm_stats = summarize(time_call(orm, options['repeat']))
+                    bulk_stats = summarize(time_call(bulk, options['repeat']))
+                    persist_stats = summarize(time_call(lambda: self._persist(size), options['repeat']))
+                    self.stdout.write(
+                        f"{size:>6} repos  bulk_create p50 {orm_stats['p50_ms']:8.2f} ms  "
+                        f"bulk insert p50 {bulk_stats['p50_ms']:8.2f} ms  "
+                        f"speedup x{orm_stats['p50_ms'] / max(bulk_stats['p50_ms'], 1e-9):.1f}  "
+                        f"persist_world p50 {persist_stats['p50_ms']:8.2f} ms"
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _payload(self, size):
+        login = f'bench-{size}'
+        repos = synthetic_repos(size, owner=login)
+        user = synthetic_user(login, repo_count=size)
+        return user, build_world_payload(user, repos), synthetic_repo_details(repos)
+
+    def _snapshot_rows(self, size):
+        _, payload, details = self._payload(size)
+        world = create_processing_world(f'bench-{size}')
+        return snapshot_rows(world, payload['repos'], details, store_repo_contents(payload['repos'], details))
+
+    def _persist(self, size):
+        user, payload, details = self._payload(size)
+        with transaction.atomic():
+            persist_world(create_processing_world(f'bench-{size}'), user, payload, details)
+            transaction.set_rollback(True)
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from worlds.benchmarks import summarize, synthetic_repo_details, synthetic_repos, synthetic_user, time_call
+from worlds.models import RepoSnapshot
+from worlds.serializers import RepoSnapshotSerializer, ShareSerializer, WorldSerializer, repo_rows
+from worlds.services.github_service import build_world_payload
+from worlds.services.rendering import load_world_for_render
+from worlds.services.world_service import create_processing_world, persist_world
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Check parity and time the fast repo serialization path against RepoSnapshotSerializer.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='50,300,1000', help='Comma-separated repo counts.')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size]
+        renderer = JSONRenderer()
+        try:
+            # Synthetic worlds are written inside a transaction that is always rolled back.
+            with transaction.atomic():
+                for size in sizes:
+                    world = self._make_world(size)
+                    queryset = RepoSnapshot.objects.filter(world_id=world.pk).select_related('content')
+
+                    def legacy():
+                        return renderer.render(RepoSnapshotSerializer(queryset, many=True).data)
+
+                    def fast():
+                        return renderer.render(repo_rows(queryset))
+
+                    if legacy() != fast():
+                        raise CommandError(f'Output mismatch for {size} repos.')
+                    self._check_world_parity(world, renderer)
+
+                    legacy_stats = summarize(time_call(legacy, options['repeat']))
+                    fast_stats = summarize(time_call(fast, options['repeat']))
+                    self.stdout.write(
+                        f"{size:>6} repos  legacy p50 {legacy_stats['p50_ms']:8.2f} ms  "
+                        f"fast p50 {fast_stats['p50_ms']:8.2f} ms  "
+                        f"speedup x{legacy_stats['p50_ms'] / max(fast_stats['p50_ms'], 1e-9):.1f}"
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(self.style.SUCCESS('Parity OK: fast path output is byte-identical.'))
+
+    def _make_world(self, size):
+        login = f'bench-{size}'
+        repos = synthetic_repos(size, owner=login)
+        user = synthetic_user(login, repo_count=size)
+        payload = build_world_payload(user, repos)
+        world = create_processing_world(login)
+        return persist_world(world, user, payload, synthetic_repo_details(repos))
+
+    def _check_world_parity(self, world, renderer):
+        world = load_world_for_render(world.pk)
+        legacy_repos = RepoSnapshotSerializer(world.repos.select_related('content'), many=True).data
+        for serializer_class in (WorldSerializer, ShareSerializer):
+            data = serializer_class(world).data
+            expected = dict(data, repos=legacy_repos)
+            if renderer.render(data) != renderer.render(expected):
+                raise CommandError(f'{serializer_class.__name__} output mismatch for world {world.pk}.')
@@ -0,0 +1,36 @@
+import threading
+
+from django.core.management.base import BaseCommand
+
+from worlds.fake_github import FakeGitHub
+
+
+class Command(BaseCommand):
+    help = 'Serve the fake GitHub API for local load tests; point GITHUB_API_BASE at the printed URL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--repos', type=int, default=60, help='Repos per synthetic user.')
+        parser.add_argument('--latency-ms', type=float, default=20.0, help='Delay added to every response.')
+        parser.add_argument('--jitter-ms', type=float, default=0.0, help='Extra random delay, up to this much.')
+        parser.add_argument('--rate-limit', type=int, default=5000, help='Calls per token per hour before 403s.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        fake = FakeGitHub(
+            repos=options['repos'],
+            latency=options['latency_ms'] / 1000,
+            jitter=options['jitter_ms'] / 1000,
+            rate_limit=options['rate_limit'],
+            seed=options['seed'],
+        )
+        base_url = fake.start(options['host'], options['port'])
+        self.stdout.write(f'Fake GitHub API on {base_url} (Ctrl-C to stop).')
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            fake.stop()
+            self.stdout.write(f'Served {sum(fake.calls.values())} calls: {dict(fake.calls)}')
@@ -0,0 +1,75 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from worlds.services.batch import prewarm_worlds
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate worlds for many GitHub usernames ahead of time. Usernames that already have a fresh '
+        'world are skipped; expired ones are refreshed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help='GitHub usernames.')
+        parser.add_argument('--file', help="File with one username per line ('-' for stdin); '#' starts a comment.")
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.WORLD_BATCH_CONCURRENCY,
+            help='Profiles fetched from GitHub at once.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.WORLD_BATCH_CHUNK_SIZE,
+            help='Worlds saved per transaction.',
+        )
+        parser.add_argument(
+            '--no-wait',
+            action='store_true',
+            help='Stop at the first GitHub rate limit instead of waiting for it to reset.',
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--concurrency and --chunk-size must be positive.')
+        usernames = list(options['usernames'])
+        if options['file']:
+            usernames.extend(self._read_usernames(options['file']))
+        if not usernames:
+            raise CommandError('Pass usernames as arguments or with --file.')
+
+        report = prewarm_worlds(
+            usernames,
+            concurrency=options['concurrency'],
+            chunk_size=options['chunk_size'],
+            wait=not options['no_wait'],
+            progress=self._progress if options['verbosity'] > 0 else None,
+        ).as_dict()
+
+        for username, message in report['failures'].items():
+            self.stderr.write(f'  {username}: {message}')
+        self.stdout.write(
+            f"Created {report['created']}, refreshed {report['refreshed']}, skipped {report['skipped']}, "
+            f"failed {report['failed']} of {report['total']} in {report['elapsed_seconds']}s."
+        )
+
+    def _progress(self, report):
+        if report.finished:
+            return
+        state = report.as_dict()
+        self.stdout.write(
+            f"{state['done']}/{state['total']} done ({state['created']} created, {state['refreshed']} refreshed, "
+            f"{state['skipped']} skipped, {state['failed']} failed) {state['elapsed_seconds']}s"
+        )
+
+    def _read_usernames(self, path):
+        try:
+            handle = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        except OSError as exc:
+            raise CommandError(f'Cannot read {path}: {exc}') from exc
+        with handle:
+            return [line.split('#', 1)[0].strip() for line in handle if line.split('#', 1)[0].strip()]
@@ -0,0 +1,94 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from worlds.services.retention import (
+    WORLD_TABLES,
+    average_row_bytes,
+    count_world_rows,
+    delete_orphaned_contents,
+    delete_worlds,
+    estimate_bytes,
+    orphaned_contents,
+    prunable_worlds,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired worlds in small batches, keeping the newest ready worlds per username '
+        'and worlds whose public share link has an unexpired expiry date.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep',
+            type=int,
+            default=settings.WORLD_RETENTION_KEEP,
+            help='Newest ready worlds to keep per username (at least 1).',
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Worlds deleted per transaction.')
+        parser.add_argument('--sleep', type=float, default=0.0, help='Seconds to pause between batches.')
+        parser.add_argument('--limit', type=int, default=None, help='Stop after this many worlds.')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted without deleting.')
+
+    def handle(self, *args, **options):
+        keep, batch_size = options['keep'], options['batch_size']
+        if keep < 1:
+            raise CommandError('--keep must be at least 1 so every username keeps its latest world.')
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        row_bytes = average_row_bytes()
+        totals = dict.fromkeys((model.__name__ for model in WORLD_TABLES), 0)
+        limit = options['limit']
+        started = time.monotonic()
+        batches = 0
+        last_seen = None
+
+        while limit is None or totals['World'] < limit:
+            size = batch_size if limit is None else min(batch_size, limit - totals['World'])
+            candidates = prunable_worlds(keep)
+            if last_seen is not None:
+                # A dry run deletes nothing, so walk forward instead of re-reading the same batch.
+                last_id, last_generated_at = last_seen
+                candidates = candidates.filter(
+                    Q(generated_at__gt=last_generated_at) | Q(generated_at=last_generated_at, id__gt=last_id)
+                )
+            batch = list(candidates.values_list('id', 'generated_at')[:size])
+            if not batch:
+                break
+            world_ids = [world_id for world_id, _ in batch]
+            if options['dry_run']:
+                counts = count_world_rows(world_ids)
+                last_seen = batch[-1]
+            else:
+                counts = delete_worlds(world_ids)
+            for name, count in counts.items():
+                totals[name] = totals.get(name, 0) + count
+            batches += 1
+            if options['verbosity'] > 1:
+                self.stdout.write(f'batch {batches}: {len(world_ids)} worlds, {sum(counts.values())} rows')
+            if options['sleep'] and not options['dry_run']:
+                time.sleep(options['sleep'])
+
+        # Content shared with surviving worlds stays; only rows nothing refers to any more go.
+        # A dry run can only count content that is orphaned already.
+        if options['dry_run']:
+            totals['RepoContent'] = orphaned_contents().count()
+        else:
+            totals['RepoContent'] = delete_orphaned_contents(batch_size)
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(
+            f"{verb} {totals['World']} worlds in {batches} batches ({time.monotonic() - started:.1f}s)."
+        )
+        for name, count in totals.items():
+            self.stdout.write(f'  {name:<14} {count:>10} rows')
+        reclaimed = estimate_bytes(totals, row_bytes)
+        if reclaimed is not None:
+            self.stdout.write(f'  ~{reclaimed / (1024 * 1024):.1f} MiB of table and index space (reusable after VACUUM)')
+        else:
+            self.stdout.write('  Reclaimed size is only estimated on PostgreSQL.')
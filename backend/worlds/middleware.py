@@ -0,0 +1,78 @@
+import cProfile
+import re
+import time
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .services.metrics import REQUEST_DB_QUERIES, REQUEST_SECONDS, collect
+
+
+def _duration(name, seconds, description=None):
+    entry = f'{name};dur={seconds * 1000:.1f}'
+    if description:
+        entry += f';desc="{description}"'
+    return entry
+
+
+def server_timing(timings, total_seconds):
+    """The ``Server-Timing`` value for one request: stages, GitHub, database and total time."""
+    entries = [_duration(name, seconds) for name, seconds in timings.stages.items()]
+    if timings.github_calls:
+        entries.append(_duration('github', timings.github_seconds, f'{timings.github_calls} calls, summed'))
+    entries.append(_duration('db', timings.db_seconds, f'{timings.db_queries} queries'))
+    entries.append(_duration('total', total_seconds))
+    return ', '.join(entries)
+
+
+class ServerTimingMiddleware:
+    """Time every request: Prometheus histograms, a ``Server-Timing`` header and, when
+    ``WORLD_PROFILE_DIR`` is set, a cProfile dump per synchronous request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with collect() as timings:
+            if settings.WORLD_PROFILE_DIR:
+                response = self._profile(request)
+            else:
+                response = self.get_response(request)
+        return self._finish(request, response, timings, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with collect() as timings:
+            response = await self.get_response(request)
+        return self._finish(request, response, timings, started)
+
+    def _profile(self, request):
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(self.get_response, request)
+        finally:
+            directory = Path(settings.WORLD_PROFILE_DIR)
+            directory.mkdir(parents=True, exist_ok=True)
+            slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+            profiler.dump_stats(directory / f'{time.time():.6f}-{request.method}-{slug}.prof')
+
+    def _finish(self, request, response, timings, started):
+        total = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        view = match.url_name or match.view_name if match else 'unmatched'
+        REQUEST_SECONDS.observe(total, view=view, method=request.method, status=response.status_code)
+        REQUEST_DB_QUERIES.observe(timings.db_queries, view=view)
+        if settings.WORLD_SERVER_TIMING:
+            response['Server-Timing'] = server_timing(timings, total)
+        return response
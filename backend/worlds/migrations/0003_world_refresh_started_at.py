@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('worlds', '0002_rename_worlds_repos_primary_451c0f_idx_worlds_repo_primary_a209f9_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='world',
+            name='refresh_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
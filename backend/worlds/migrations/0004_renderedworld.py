@@ -0,0 +1,29 @@
+# Generated by Django 5.1.5 on 2026-10-18 14:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('worlds', '0003_world_refresh_started_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenderedWorld',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('detail', 'Detail'), ('share', 'Share')], max_length=10)),
+                ('version', models.PositiveSmallIntegerField()),
+                ('etag', models.CharField(max_length=64)),
+                ('body', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('world', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rendered', to='worlds.world')),
+            ],
+            options={
+                'unique_together': {('world', 'kind', 'version')},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.5 on 2026-10-18 15:01
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('worlds', '0004_renderedworld'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='world',
+            name='worlds_worl_usernam_059d02_idx',
+        ),
+        migrations.AddIndex(
+            model_name='world',
+            index=models.Index(django.db.models.functions.text.Lower('username'), models.OrderBy(models.F('generated_at'), descending=True), name='worlds_username_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.5 on 2026-10-18 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('worlds', '0005_world_username_lower_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepoContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('repo_id', models.BigIntegerField()),
+                ('description', models.TextField(blank=True)),
+                ('language_breakdown', models.JSONField(blank=True, default=dict)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='reposnapshot',
+            name='content',
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name='snapshots',
+                to='worlds.repocontent',
+            ),
+        ),
+    ]
@@ -0,0 +1,65 @@
+import hashlib
+import json
+
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+
+def _hash(repo_id, description, language_breakdown):
+    # Mirrors RepoContent.make_hash; historical models do not carry custom methods.
+    source = json.dumps([repo_id, description, language_breakdown], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def move_content(apps, schema_editor):
+    RepoContent = apps.get_model('worlds', 'RepoContent')
+    RepoSnapshot = apps.get_model('worlds', 'RepoSnapshot')
+    queryset = RepoSnapshot.objects.filter(content__isnull=True).order_by('pk')
+    while True:
+        batch = list(queryset.only('pk', 'repo_id', 'description', 'language_breakdown')[:BATCH_SIZE])
+        if not batch:
+            return
+        hashes = {}
+        contents = {}
+        for snapshot in batch:
+            content_hash = _hash(snapshot.repo_id, snapshot.description, snapshot.language_breakdown)
+            hashes[snapshot.pk] = content_hash
+            contents[content_hash] = RepoContent(
+                content_hash=content_hash,
+                repo_id=snapshot.repo_id,
+                description=snapshot.description,
+                language_breakdown=snapshot.language_breakdown,
+            )
+        RepoContent.objects.bulk_create(contents.values(), ignore_conflicts=True)
+        content_ids = dict(RepoContent.objects.filter(content_hash__in=contents).values_list('content_hash', 'id'))
+        for snapshot in batch:
+            snapshot.content_id = content_ids[hashes[snapshot.pk]]
+        RepoSnapshot.objects.bulk_update(batch, ['content'])
+
+
+def restore_content(apps, schema_editor):
+    RepoSnapshot = apps.get_model('worlds', 'RepoSnapshot')
+    queryset = RepoSnapshot.objects.select_related('content').filter(content__isnull=False).order_by('pk')
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(page[:BATCH_SIZE])
+        if not batch:
+            return
+        for snapshot in batch:
+            snapshot.description = snapshot.content.description
+            snapshot.language_breakdown = snapshot.content.language_breakdown
+        RepoSnapshot.objects.bulk_update(batch, ['description', 'language_breakdown'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('worlds', '0006_repocontent'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_content, restore_content),
+    ]
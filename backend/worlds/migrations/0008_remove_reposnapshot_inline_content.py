@@ -0,0 +1,31 @@
+# Generated by Django 5.1.5 on 2026-10-18 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('worlds', '0007_move_repo_content'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='reposnapshot',
+            name='description',
+        ),
+        migrations.RemoveField(
+            model_name='reposnapshot',
+            name='language_breakdown',
+        ),
+        migrations.AlterField(
+            model_name='reposnapshot',
+            name='content',
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name='snapshots',
+                to='worlds.repocontent',
+            ),
+        ),
+    ]
@@ -1,7 +1,10 @@
+import hashlib
+import json
 import secrets
 import uuid
 
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 
 
@@ -29,11 +32,13 @@ class World(models.Model):
     expires_at = models.DateTimeField(db_index=True)
     source_hash = models.CharField(max_length=64, blank=True)
     error_message = models.TextField(blank=True)
+    refresh_started_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ['-generated_at']
         indexes = [
-            models.Index(fields=['username', 'generated_at']),
+            # Username lookups are case-insensitive; this serves them newest-first.
+            models.Index(Lower('username'), models.F('generated_at').desc(), name='worlds_username_lower_idx'),
             models.Index(fields=['generation_status']),
         ]
 
@@ -41,15 +46,35 @@ class World(models.Model):
         return f"World<{self.username}:{self.id}>"
 
 
+class RepoContent(models.Model):
+    """A repo's description and language breakdown, stored once per distinct value.
+
+    Snapshots refer to it by content hash, so worlds that see the same repo text share one row
+    instead of each keeping a copy.
+    """
+
+    content_hash = models.CharField(max_length=64, unique=True)
+    repo_id = models.BigIntegerField()
+    description = models.TextField(blank=True)
+    language_breakdown = models.JSONField(default=dict, blank=True)
+
+    @staticmethod
+    def make_hash(repo_id, description, language_breakdown) -> str:
+        source = json.dumps([repo_id, description, language_breakdown], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+    def __str__(self) -> str:
+        return f"RepoContent<{self.repo_id}:{self.content_hash[:12]}>"
+
+
 class RepoSnapshot(models.Model):
     world = models.ForeignKey(World, on_delete=models.CASCADE, related_name='repos')
     repo_id = models.BigIntegerField()
     name = models.CharField(max_length=255)
     full_name = models.CharField(max_length=255)
     html_url = models.URLField()
-    description = models.TextField(blank=True)
+    content = models.ForeignKey(RepoContent, on_delete=models.PROTECT, related_name='snapshots')
     primary_language = models.CharField(max_length=100, blank=True)
-    language_breakdown = models.JSONField(default=dict, blank=True)
     stars = models.PositiveIntegerField(default=0)
     forks = models.PositiveIntegerField(default=0)
     open_issues = models.PositiveIntegerField(default=0)
@@ -73,6 +98,14 @@ class RepoSnapshot(models.Model):
     def __str__(self) -> str:
         return f"Repo<{self.full_name}>"
 
+    @property
+    def description(self):
+        return self.content.description
+
+    @property
+    def language_breakdown(self):
+        return self.content.language_breakdown
+
 
 class LanguageStats(models.Model):
     world = models.ForeignKey(World, on_delete=models.CASCADE, related_name='languages')
@@ -108,3 +141,24 @@ class ShareToken(models.Model):
 
     def is_valid(self) -> bool:
         return self.is_public and (self.expires_at is None or self.expires_at > timezone.now())
+
+
+class RenderedWorld(models.Model):
+    """Pre-serialized JSON for a ready world, stored gzip-compressed per serializer version."""
+
+    KIND_DETAIL = 'detail'
+    KIND_SHARE = 'share'
+    KIND_CHOICES = [
+        (KIND_DETAIL, 'Detail'),
+        (KIND_SHARE, 'Share'),
+    ]
+
+    world = models.ForeignKey(World, on_delete=models.CASCADE, related_name='rendered')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    version = models.PositiveSmallIntegerField()
+    etag = models.CharField(max_length=64)
+    body = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('world', 'kind', 'version')
@@ -0,0 +1,10 @@
+from rest_framework.pagination import CursorPagination
+
+
+class RepoCursorPagination(CursorPagination):
+    """Repos in the same order as ``RepoSnapshot.Meta.ordering``, with ``id`` as a stable tie-breaker."""
+
+    ordering = ('-activity_score', '-stars', 'id')
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
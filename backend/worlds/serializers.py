@@ -1,4 +1,7 @@
-from rest_framework import serializers
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 
 from .models import LanguageStats, RenderConfig, RepoSnapshot, ShareToken, World
 
@@ -13,7 +16,18 @@ class GenerateWorldInputSerializer(serializers.Serializer):
         return attrs
 
 
+class BatchGenerateInputSerializer(serializers.Serializer):
+    usernames = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        allow_empty=False,
+        max_length=settings.WORLD_BATCH_MAX_USERNAMES,
+    )
+
+
 class RepoSnapshotSerializer(serializers.ModelSerializer):
+    description = serializers.CharField(source='content.description', read_only=True)
+    language_breakdown = serializers.JSONField(source='content.language_breakdown', read_only=True)
+
     class Meta:
         model = RepoSnapshot
         fields = [
@@ -39,6 +53,109 @@ class RepoSnapshotSerializer(serializers.ModelSerializer):
         ]
 
 
+def _datetime_converter(field):
+    """``DateTimeField.to_representation`` with the output timezone resolved once, not per value."""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if not settings.USE_TZ or output_format is None or output_format.lower() != ISO_8601:
+        return field.to_representation
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+
+    def convert(value):
+        if timezone.is_naive(value):
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    return convert
+
+
+def _fast_converter(field):
+    """Pick a plain callable equivalent to ``field.to_representation`` (``None`` means identity)."""
+    if isinstance(field, serializers.BooleanField):
+        return bool
+    if isinstance(field, serializers.IntegerField):
+        return int
+    if isinstance(field, serializers.FloatField):
+        return float
+    if isinstance(field, serializers.CharField):
+        return str
+    if isinstance(field, serializers.JSONField) and not field.binary:
+        return None
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    return field.to_representation
+
+
+_repo_row_fields = None
+
+
+def _get_repo_row_fields():
+    global _repo_row_fields
+    if _repo_row_fields is None:
+        fields = RepoSnapshotSerializer().fields
+        _repo_row_fields = [(name, fields[name]) for name in RepoSnapshotSerializer.Meta.fields]
+    return _repo_row_fields
+
+
+def parse_repo_fields(value):
+    """Parse a ``?fields=`` list into repo field names in canonical order; ``None`` means all fields."""
+    if not value:
+        return None
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = requested.difference(RepoSnapshotSerializer.Meta.fields)
+    if unknown:
+        raise serializers.ValidationError({'fields': f"Unknown repo fields: {', '.join(sorted(unknown))}."})
+    return [name for name in RepoSnapshotSerializer.Meta.fields if name in requested]
+
+
+def _repo_converters(fields=None):
+    selected = [(name, field) for name, field in _get_repo_row_fields() if fields is None or name in fields]
+    return [name for name, _ in selected], [_fast_converter(field) for _, field in selected]
+
+
+def repo_value_paths(fields=None):
+    """ORM lookup paths for repo fields, following ``source`` into the shared ``RepoContent`` row."""
+    return [
+        field.source.replace('.', '__')
+        for name, field in _get_repo_row_fields()
+        if fields is None or name in fields
+    ]
+
+
+def repo_rows(queryset, fields=None):
+    """Serialize repo snapshots straight from ``values_list`` tuples.
+
+    Produces the same output as ``RepoSnapshotSerializer(queryset, many=True).data`` without
+    building a model instance or a serializer per row. ``fields`` limits the output to a
+    subset of ``RepoSnapshotSerializer.Meta.fields``.
+    """
+    names, converters = _repo_converters(fields)
+    rows = []
+    for values in queryset.values_list(*repo_value_paths(fields)):
+        rows.append(
+            {
+                name: value if value is None or convert is None else convert(value)
+                for name, convert, value in zip(names, converters, values)
+            }
+        )
+    return rows
+
+
+def repo_rows_from_dicts(rows, fields=None):
+    """Like :func:`repo_rows`, for rows already fetched with ``.values(*repo_value_paths(fields))``."""
+    names, converters = _repo_converters(fields)
+    paths = repo_value_paths(fields)
+    return [
+        {
+            name: row[path] if row[path] is None or convert is None else convert(row[path])
+            for name, path, convert in zip(names, paths, converters)
+        }
+        for row in rows
+    ]
+
+
 class LanguageStatsSerializer(serializers.ModelSerializer):
     class Meta:
         model = LanguageStats
@@ -52,7 +169,7 @@ class RenderConfigSerializer(serializers.ModelSerializer):
 
 
 class WorldSerializer(serializers.ModelSerializer):
-    repos = RepoSnapshotSerializer(many=True, read_only=True)
+    repos = serializers.SerializerMethodField()
     languages = LanguageStatsSerializer(many=True, read_only=True)
     render_config = RenderConfigSerializer(read_only=True)
 
@@ -76,9 +193,12 @@ class WorldSerializer(serializers.ModelSerializer):
             'render_config',
         ]
 
+    def get_repos(self, obj):
+        return repo_rows(RepoSnapshot.objects.filter(world_id=obj.pk), fields=self.context.get('repo_fields'))
+
 
 class ShareSerializer(serializers.ModelSerializer):
-    repos = RepoSnapshotSerializer(many=True, read_only=True)
+    repos = serializers.SerializerMethodField()
     languages = LanguageStatsSerializer(many=True, read_only=True)
     render_config = RenderConfigSerializer(read_only=True)
     share_token = serializers.SerializerMethodField()
@@ -100,6 +220,9 @@ class ShareSerializer(serializers.ModelSerializer):
             'share_token',
         ]
 
+    def get_repos(self, obj):
+        return repo_rows(RepoSnapshot.objects.filter(world_id=obj.pk), fields=self.context.get('repo_fields'))
+
     def get_share_token(self, obj):
         token = getattr(obj, 'share_token', None)
         if isinstance(token, ShareToken):
@@ -0,0 +1,278 @@
+"""Pre-generating worlds for many usernames at once, e.g. ahead of a leaderboard or event.
+
+Usernames are processed in chunks. Within a chunk, up to ``concurrency`` profiles are fetched
+from GitHub at once over the shared HTTP session and token pool, then every new world of the
+chunk is written in a single transaction. Each username is claimed like a regular request
+first, so a run never duplicates a world someone is generating. Expired worlds are refreshed
+in place instead, as a regular request would. Chunks shrink to what the token pool can still
+afford, and once GitHub rate limits us the run waits for the reset (or stops) instead of
+failing everyone; queued runs wait on their own pool, never on generation workers.
+"""
+
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, close_old_connections
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from ..models import World
+from .github_service import (
+    BaseGitHubClient,
+    GitHubError,
+    GitHubRateLimitError,
+    build_world_payload,
+    fetch_repo_details,
+    get_github_client,
+)
+from .jobs import BATCH_POOL, enqueue
+from .metrics import collect, record_world, stage
+from .token_pool import get_token_pool
+from .world_service import (
+    claim_world_generation,
+    forget_worlds,
+    generate_world,
+    mark_failed,
+    persist_worlds,
+    rate_limited_until,
+    remember_rate_limit,
+)
+
+logger = logging.getLogger(__name__)
+
+# Attempts per username before a rate-limited profile is reported as failed.
+MAX_ATTEMPTS = 3
+BATCH_REPORT_TIMEOUT_SECONDS = 24 * 3600
+
+
+def batch_cache_key(batch_id):
+    return f'world:batch:{batch_id}'
+
+
+def normalize_usernames(values):
+    """Valid usernames from ``values`` in their original order, without case-insensitive duplicates.
+
+    Returns ``(usernames, invalid)``.
+    """
+    parser = BaseGitHubClient()
+    usernames = {}
+    invalid = []
+    for value in values:
+        try:
+            username = parser.parse_username(username=value)
+        except GitHubError:
+            if value.strip():
+                invalid.append(value.strip())
+            continue
+        usernames.setdefault(username.lower(), username)
+    return list(usernames.values()), invalid
+
+
+def active_usernames(usernames):
+    """The lower-cased usernames among ``usernames`` that already have an unexpired ready world."""
+    return set(
+        World.objects.annotate(username_lower=Lower('username'))
+        .filter(
+            username_lower__in=[username.lower() for username in usernames],
+            generation_status=World.STATUS_READY,
+            expires_at__gt=timezone.now(),
+        )
+        .values_list('username_lower', flat=True)
+    )
+
+
+def calls_per_world():
+    """Rough GitHub calls one new world costs: profile, first repo page and the deep fetch."""
+    return 2 + 2 * settings.GITHUB_DEEP_FETCH_REPOS
+
+
+def budget_wait_seconds():
+    """Seconds until GitHub will serve us again, or ``0`` when there is budget left."""
+    blocked_until = get_token_pool().blocked_until() or 0
+    reset_at = rate_limited_until()
+    if reset_at:
+        blocked_until = max(blocked_until, reset_at.timestamp())
+    return max(0.0, blocked_until - time.time())
+
+
+def affordable_chunk_size(chunk_size):
+    """Shrink ``chunk_size`` to the worlds the token pool can still pay for (anonymous runs are not paced)."""
+    pool = get_token_pool()
+    if not pool:
+        return chunk_size
+    return max(1, min(chunk_size, pool.headroom() // calls_per_world()))
+
+
+class BatchReport:
+    """Progress of one pre-warm run; ``as_dict()`` is what the API and command report."""
+
+    def __init__(self, total, invalid=()):
+        self.total = total
+        self.created = 0
+        self.refreshed = 0
+        self.skipped = 0
+        self.failures = {value: 'Invalid GitHub username or URL.' for value in invalid}
+        self.started = time.monotonic()
+        self.finished = False
+
+    @property
+    def done(self):
+        return self.created + self.refreshed + self.skipped + len(self.failures)
+
+    def as_dict(self):
+        return {
+            'total': self.total,
+            'done': self.done,
+            'created': self.created,
+            'refreshed': self.refreshed,
+            'skipped': self.skipped,
+            'failed': len(self.failures),
+            'failures': self.failures,
+            'elapsed_seconds': round(time.monotonic() - self.started, 1),
+            'finished': self.finished,
+        }
+
+
+def _fetch_world(username):
+    """Fetch one profile for the batch; returns ``(outcome, value)``.
+
+    ``outcome`` is ``'fetched'`` (value: a ``persist_worlds`` entry), ``'refreshed'``,
+    ``'skipped'``, ``'rate_limited'`` (value: the reset time) or ``'failed'`` (value: message).
+    A claimed world that could not be built is marked failed, so a retry can claim it again.
+    """
+    close_old_connections()
+    try:
+        world, created = claim_world_generation(username)
+        if not created:
+            return 'skipped', None
+        client = get_github_client()
+        try:
+            if world.generation_status == World.STATUS_READY:
+                generate_world(world, client)
+                return 'refreshed', None
+            with collect() as timings:
+                with stage('github_profile'):
+                    user_payload = client.fetch_user(username)
+                    repos = client.fetch_repos(username)
+                with stage('payload'):
+                    payload = build_world_payload(user_payload, repos)
+                with stage('deep_fetch'):
+                    repo_details = fetch_repo_details(client, payload['repos'])
+        except GitHubRateLimitError:
+            mark_failed(world, 'GitHub API rate limit reached. Try again later.')
+            raise
+        except GitHubError as exc:
+            mark_failed(world, str(exc))
+            raise
+        except Exception:
+            mark_failed(world, 'World generation failed.')
+            raise
+        record_world(timings)
+        return 'fetched', (world, user_payload, payload, repo_details)
+    except GitHubRateLimitError as exc:
+        return 'rate_limited', exc.reset_at
+    except GitHubError as exc:
+        return 'failed', str(exc)
+    except Exception:
+        logger.exception('Pre-warming the world of %s failed', username)
+        return 'failed', 'World generation failed.'
+    finally:
+        close_old_connections()
+
+
+def prewarm_worlds(values, concurrency=None, chunk_size=None, wait=True, progress=None):
+    """Build worlds for every username in ``values`` that does not have a fresh one yet.
+
+    ``progress(report)`` is called after every chunk. With ``wait`` off, the run stops at the
+    first rate limit and reports the usernames it did not get to. Returns the final report.
+    """
+    concurrency = concurrency or settings.WORLD_BATCH_CONCURRENCY
+    chunk_size = chunk_size or settings.WORLD_BATCH_CHUNK_SIZE
+    usernames, invalid = normalize_usernames(values)
+    report = BatchReport(len(usernames) + len(invalid), invalid)
+    pending = list(usernames)
+    attempts = dict.fromkeys(usernames, 0)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='world-batch') as executor:
+        while pending:
+            delay = budget_wait_seconds()
+            if delay:
+                if not wait:
+                    for username in pending:
+                        report.failures[username] = 'GitHub API rate limit reached. Try again later.'
+                    break
+                logger.info('Pre-warm waiting %.0fs for the GitHub rate limit to reset', delay)
+                time.sleep(delay)
+
+            chunk = pending[: affordable_chunk_size(chunk_size)]
+            pending = pending[len(chunk) :]
+            warm = active_usernames(chunk)
+            report.skipped += sum(1 for username in chunk if username.lower() in warm)
+            chunk = [username for username in chunk if username.lower() not in warm]
+
+            entries = []
+            for username, (outcome, value) in zip(chunk, executor.map(_fetch_world, chunk)):
+                attempts[username] += 1
+                if outcome == 'fetched':
+                    entries.append(value)
+                elif outcome == 'refreshed':
+                    report.refreshed += 1
+                elif outcome == 'skipped':
+                    report.skipped += 1
+                elif outcome == 'rate_limited':
+                    remember_rate_limit(value)
+                    if attempts[username] < MAX_ATTEMPTS:
+                        pending.append(username)
+                    else:
+                        report.failures[username] = 'GitHub API rate limit reached. Try again later.'
+                else:
+                    report.failures[username] = value
+
+            try:
+                persist_worlds(entries)
+            except DatabaseError:
+                logger.exception('Saving a pre-warm chunk of %d worlds failed', len(entries))
+                # The in-memory worlds already look ready; fail the claimed rows directly.
+                world_ids = [world.pk for world, *_ in entries]
+                World.objects.filter(pk__in=world_ids).update(
+                    generation_status=World.STATUS_FAILED,
+                    error_message='Saving the world failed.',
+                    updated_at=timezone.now(),
+                )
+                forget_worlds(world_ids)
+                for world, *_ in entries:
+                    report.failures[world.username] = 'Saving the world failed.'
+            else:
+                report.created += len(entries)
+            if progress is not None:
+                progress(report)
+
+    report.finished = True
+    if progress is not None:
+        progress(report)
+    return report
+
+
+def start_batch(values):
+    """Queue a pre-warm run of ``values`` on the batch job pool; returns its batch id for polling."""
+    batch_id = uuid.uuid4().hex
+    usernames, invalid = normalize_usernames(values)
+    report = BatchReport(len(usernames) + len(invalid), invalid)
+    cache.set(batch_cache_key(batch_id), report.as_dict(), timeout=BATCH_REPORT_TIMEOUT_SECONDS)
+    enqueue(run_batch_job, batch_id, list(values), pool=BATCH_POOL)
+    return batch_id, report
+
+
+def run_batch_job(batch_id, values):
+    def save(report):
+        cache.set(batch_cache_key(batch_id), report.as_dict(), timeout=BATCH_REPORT_TIMEOUT_SECONDS)
+
+    prewarm_worlds(values, progress=save)
+
+
+def get_batch_report(batch_id):
+    return cache.get(batch_cache_key(batch_id))
@@ -0,0 +1,113 @@
+"""Row inserts without model instances, for the high-volume generation paths.
+
+Rows are plain tuples in ``fields`` order (attribute names, e.g. ``world_id``) and are
+prepared once per field the way the ORM would prepare them. On PostgreSQL with psycopg 3
+large sets are streamed with ``COPY``; everywhere else they go out as multi-row ``INSERT``
+statements sized to the backend's parameter limit. Nothing here sends signals or fills in
+``auto_now``/``auto_now_add`` values, so callers pass those explicitly.
+"""
+
+from django.db import connection
+from django.db.models.constants import OnConflict
+
+try:
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+except ImportError:  # psycopg is not installed, e.g. on a SQLite-only setup.
+    is_psycopg3 = False
+
+# Below this many rows a plain INSERT is as fast as setting up a COPY.
+COPY_MIN_ROWS = 200
+# PostgreSQL's wire protocol caps one statement at 65535 bind parameters.
+POSTGRES_MAX_PARAMS = 65535
+
+
+def _prepare(model, fields, rows):
+    model_fields = [model._meta.get_field(name) for name in fields]
+    preparers = [field.get_db_prep_save for field in model_fields]
+    prepared = [tuple(prepare(value, connection) for prepare, value in zip(preparers, row)) for row in rows]
+    return model_fields, prepared
+
+
+def _columns(model_fields):
+    return ', '.join(connection.ops.quote_name(field.column) for field in model_fields)
+
+
+def _batch_size(model_fields, rows):
+    size = connection.ops.bulk_batch_size(model_fields, rows)
+    if connection.vendor == 'postgresql':
+        size = min(size, POSTGRES_MAX_PARAMS // len(model_fields))
+    return max(1, size)
+
+
+def _insert_sql(model, model_fields, row_count, ignore_conflicts=False):
+    on_conflict = OnConflict.IGNORE if ignore_conflicts else None
+    values = connection.ops.bulk_insert_sql(model_fields, [['%s'] * len(model_fields)] * row_count)
+    suffix = connection.ops.on_conflict_suffix_sql(model_fields, on_conflict, None, None)
+    return (
+        f'{connection.ops.insert_statement(on_conflict=on_conflict)} '
+        f'{connection.ops.quote_name(model._meta.db_table)} ({_columns(model_fields)}) {values} {suffix}'
+    ).rstrip()
+
+
+def can_copy():
+    return connection.vendor == 'postgresql' and is_psycopg3
+
+
+def copy_rows(model, fields, rows):
+    """Stream ``rows`` into ``model``'s table with ``COPY ... FROM STDIN`` (PostgreSQL, psycopg 3)."""
+    model_fields, rows = _prepare(model, fields, rows)
+    sql = f'COPY {connection.ops.quote_name(model._meta.db_table)} ({_columns(model_fields)}) FROM STDIN'
+    with connection.cursor() as cursor:
+        with cursor.copy(sql) as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def insert_rows(model, fields, rows, ignore_conflicts=False):
+    """Insert ``rows`` into ``model``'s table with as few statements as the backend allows.
+
+    ``ignore_conflicts`` skips rows that violate a unique constraint, like
+    ``bulk_create(ignore_conflicts=True)``; such inserts never use ``COPY``.
+    """
+    if not rows:
+        return
+    if not ignore_conflicts and len(rows) >= COPY_MIN_ROWS and can_copy():
+        copy_rows(model, fields, rows)
+        return
+    model_fields, rows = _prepare(model, fields, rows)
+    batch_size = _batch_size(model_fields, rows)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start : start + batch_size]
+            cursor.execute(
+                _insert_sql(model, model_fields, len(batch), ignore_conflicts),
+                [value for row in batch for value in row],
+            )
+
+
+def insert_tables(tables):
+    """Insert into several tables at once; ``tables`` holds ``(model, fields, rows)`` triples.
+
+    PostgreSQL runs them as one statement of data-modifying CTEs, so a world's small
+    one-to-one and language rows cost a single round trip. Other backends (or sets too
+    large for one statement) fall back to ``insert_rows`` per table.
+    """
+    tables = [(model, fields, rows) for model, fields, rows in tables if rows]
+    if not tables:
+        return
+    param_count = sum(len(fields) * len(rows) for _, fields, rows in tables)
+    if connection.vendor != 'postgresql' or len(tables) == 1 or param_count > POSTGRES_MAX_PARAMS:
+        for model, fields, rows in tables:
+            insert_rows(model, fields, rows)
+        return
+
+    statements = []
+    params = []
+    for model, fields, rows in tables:
+        model_fields, rows = _prepare(model, fields, rows)
+        statements.append(_insert_sql(model, model_fields, len(rows)))
+        params.extend(value for row in rows for value in row)
+    *ctes, last = statements
+    sql = 'WITH ' + ', '.join(f'ins_{index} AS ({statement})' for index, statement in enumerate(ctes)) + f' {last}'
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
@@ -0,0 +1,64 @@
+"""Packed binary layout of a world's per-repo numeric columns for the 3D scene.
+
+Layout (all integers little-endian)::
+
+    0      4 bytes   magic ``b'GPWG'``
+    4      uint32    header length ``H`` in bytes
+    8      H bytes   UTF-8 JSON header, space-padded so the columns start 4-byte aligned
+    8 + H  columns   one block of ``count`` values per column, in header order
+
+The header lists ``count``, the ``columns`` with their ``type`` and byte ``offset`` from the
+start of the column section (so a browser can wrap each one in a ``Float32Array`` or
+``Int32Array`` view without copying), and the per-repo ``repo_id``, ``name`` and
+``primary_language`` values in the same order.
+"""
+
+import json
+import struct
+import sys
+from array import array
+
+from ..models import RepoSnapshot
+
+MAGIC = b'GPWG'
+FORMAT_VERSION = 1
+CONTENT_TYPE = 'application/vnd.github-profile-world.geometry'
+
+FLOAT_COLUMNS = ('pos_x', 'pos_y', 'pos_z', 'activity_score')
+INT_COLUMNS = ('stars', 'forks', 'size_kb', 'commits_30d')
+LABEL_COLUMNS = ('repo_id', 'name', 'primary_language')
+
+
+def _pack_column(typecode, values):
+    column = array(typecode, values)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column.tobytes()
+
+
+def pack_world_geometry(world_id):
+    rows = list(
+        RepoSnapshot.objects.filter(world_id=world_id).values_list(*LABEL_COLUMNS, *FLOAT_COLUMNS, *INT_COLUMNS)
+    )
+    count = len(rows)
+    columns = list(zip(*rows)) if rows else [()] * (len(LABEL_COLUMNS) + len(FLOAT_COLUMNS) + len(INT_COLUMNS))
+    labels = dict(zip(LABEL_COLUMNS, columns[: len(LABEL_COLUMNS)]))
+    numeric = columns[len(LABEL_COLUMNS):]
+
+    blocks = [_pack_column('f', values) for values in numeric[: len(FLOAT_COLUMNS)]]
+    blocks += [_pack_column('i', values) for values in numeric[len(FLOAT_COLUMNS):]]
+    column_types = ['float32'] * len(FLOAT_COLUMNS) + ['int32'] * len(INT_COLUMNS)
+
+    header = {
+        'version': FORMAT_VERSION,
+        'count': count,
+        'columns': [
+            {'name': name, 'type': column_type, 'offset': idx * count * 4}
+            for idx, (name, column_type) in enumerate(zip(FLOAT_COLUMNS + INT_COLUMNS, column_types))
+        ],
+        **{name: list(values) for name, values in labels.items()},
+    }
+    encoded = json.dumps(header, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    encoded += b' ' * (-(8 + len(encoded)) % 4)
+
+    return b''.join([MAGIC, struct.pack('<I', len(encoded)), encoded, *blocks])
@@ -0,0 +1,223 @@
+import asyncio
+import math
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .github_service import (
+    DEEP_FETCH_ERRORS,
+    REPOS_PER_PAGE,
+    BaseGitHubClient,
+    GitHubError,
+    GraphQLResults,
+    TokenUnavailable,
+    commit_count_from_response,
+    commit_count_params,
+    last_page_from_link,
+    repo_page_params,
+)
+from .http_session import get_async_http_client, httpx
+from .metrics import record_github_call, record_github_failure
+from .token_pool import RESOURCE_CORE, RESOURCE_GRAPHQL, get_token_pool
+
+
+class AsyncGitHubClient(BaseGitHubClient):
+    """Non-blocking REST client for the async views, built on a per-loop ``httpx.AsyncClient``.
+
+    Shares the token pool and ETag cache with ``GitHubClient`` and returns the same shapes;
+    their cache reads and writes go through the async cache API.
+    """
+
+    def __init__(self):
+        if httpx is None:
+            raise ImproperlyConfigured('The async views need httpx: pip install httpx')
+        super().__init__()
+        self.http = get_async_http_client()
+
+    async def _achoose_token(self, require_token=False, resource=RESOURCE_CORE):
+        token = await self.token_pool.aacquire(resource)
+        if token is None:
+            self._no_token(await self.token_pool.ablocked_until(resource), require_token)
+        return token
+
+    async def _aaccept(self, token, response, resource=RESOURCE_CORE):
+        if token is None:
+            return True
+        parking = self._parking(response)
+        if parking is not None:
+            await self.token_pool.apark(token, *parking, resource=resource)
+            return False
+        await self.token_pool.aupdate(token, response, resource)
+        return self._still_usable(response)
+
+    async def _send(self, method, url, require_token=False, resource=RESOURCE_CORE, **kwargs):
+        headers = kwargs.pop('headers', None) or {}
+        for _ in self._attempts():
+            token = await self._achoose_token(require_token, resource)
+            auth = {'Authorization': f'Bearer {token}'} if token else {}
+            started = time.perf_counter()
+            try:
+                response = await self.http.request(method, url, headers={**headers, **auth}, **kwargs)
+            except httpx.HTTPError as exc:
+                record_github_failure()
+                raise GitHubError('GitHub API is temporarily unavailable.') from exc
+            record_github_call(response, time.perf_counter() - started, self.token_pool.label(token))
+            if await self._aaccept(token, response, resource):
+                return response
+        return response
+
+    async def _request(self, path, params=None):
+        url = f"{settings.GITHUB_API_BASE}{path}"
+        cache_key = self.response_cache.make_key(url, params)
+        cached = await self.response_cache.aget(cache_key)
+        headers = self.response_cache.conditional_headers(cached)
+        response = await self._send('GET', url, params=params, headers=headers)
+
+        if response.status_code == 304 and cached is not None:
+            self.response_cache.record(hit=True)
+            return self.response_cache.to_response(cached, url)
+
+        self._check_response(response)
+        self.response_cache.record(hit=False)
+        await self.response_cache.astore(cache_key, response)
+        return response
+
+    async def fetch_user(self, username):
+        return (await self._request(f'/users/{username}')).json()
+
+    async def fetch_repos(self, username, max_repos=None):
+        """All of the user's repos (up to ``GITHUB_MAX_REPOS``), with pages 2..N requested at once."""
+        max_repos = settings.GITHUB_MAX_REPOS if max_repos is None else max_repos
+        if max_repos <= 0:
+            return []
+        path = f'/users/{username}/repos'
+        first = await self._request(path, params=repo_page_params(1))
+        repos = first.json()[:max_repos]
+        last_page = last_page_from_link(first.headers.get('Link', '')) or 1
+        last_page = min(last_page, math.ceil(max_repos / REPOS_PER_PAGE))
+        if len(repos) < max_repos and last_page >= 2:
+            pages = await asyncio.gather(
+                *(self._request(path, params=repo_page_params(page)) for page in range(2, last_page + 1))
+            )
+            for page in pages:
+                payload = page.json()
+                if not payload:
+                    break
+                repos.extend(payload)
+        return repos[:max_repos]
+
+    async def fetch_repo_languages(self, owner, repo):
+        return (await self._request(f'/repos/{owner}/{repo}/languages')).json()
+
+    async def fetch_commit_count_30d(self, owner, repo, default_branch):
+        response = await self._request(f'/repos/{owner}/{repo}/commits', params=commit_count_params(default_branch))
+        return commit_count_from_response(response)
+
+
+class AsyncGitHubGraphQLClient(GraphQLResults, AsyncGitHubClient):
+    """``GitHubGraphQLClient`` for the async views.
+
+    ``fetch_user`` and ``fetch_repos`` run concurrently in ``agenerate_world``, so both await
+    one shared query for the first page. Without a usable token it falls back to REST.
+    """
+
+    async def _fetch_page(self, username, after=None, first=REPOS_PER_PAGE):
+        response = await self._send(
+            'POST',
+            settings.GITHUB_GRAPHQL_URL,
+            require_token=True,
+            resource=RESOURCE_GRAPHQL,
+            json=self._page_request(username, after, first),
+        )
+        return self._parse_page(self._page_user(response))
+
+    def _first_page(self, username):
+        task = self._pages.get(username.lower())
+        if task is None:
+            task = self._pages[username.lower()] = asyncio.ensure_future(self._fetch_page(username))
+        return task
+
+    async def fetch_user(self, username):
+        try:
+            user, _, _ = await self._first_page(username)
+        except TokenUnavailable:
+            return await super().fetch_user(username)
+        return self._user_payload(user)
+
+    async def fetch_repos(self, username, max_repos=None):
+        remaining = settings.GITHUB_MAX_REPOS if max_repos is None else max_repos
+        if remaining <= 0:
+            return []
+        try:
+            _, page, cursor = await self._first_page(username)
+        except TokenUnavailable:
+            return await super().fetch_repos(username, max_repos=max_repos)
+        repos = []
+        while True:
+            repos.extend(page[:remaining])
+            remaining -= len(page[:remaining])
+            if remaining <= 0 or cursor is None:
+                return repos
+            try:
+                _, page, cursor = await self._fetch_page(username, after=cursor, first=min(REPOS_PER_PAGE, remaining))
+            except TokenUnavailable:
+                # The token was rejected part-way through; finish the list over REST.
+                seen = {repo['id'] for repo in repos}
+                rest = await super().fetch_repos(username, max_repos=len(repos) + remaining)
+                return repos + [repo for repo in rest if repo['id'] not in seen][:remaining]
+
+    async def fetch_repo_languages(self, owner, repo):
+        languages = self._languages.get(f'{owner}/{repo}')
+        if languages is None:
+            return await super().fetch_repo_languages(owner, repo)
+        return languages
+
+    async def fetch_commit_count_30d(self, owner, repo, default_branch):
+        count = self._commit_counts.get(f'{owner}/{repo}')
+        if count is None:
+            return await super().fetch_commit_count_30d(owner, repo, default_branch)
+        return count
+
+
+def get_async_github_client():
+    """``get_github_client`` for the async views."""
+    if settings.GITHUB_API_MODE == 'graphql' and get_token_pool():
+        return AsyncGitHubGraphQLClient()
+    return AsyncGitHubClient()
+
+
+async def afetch_repo_details(client, repos, limit=None, budget_seconds=None):
+    """Async counterpart of ``fetch_repo_details``: every call is in flight at once.
+
+    Same result shape and defaults; calls that fail or miss the time budget are dropped.
+    """
+    limit = settings.GITHUB_DEEP_FETCH_REPOS if limit is None else limit
+    budget_seconds = settings.GITHUB_DEEP_FETCH_BUDGET_SECONDS if budget_seconds is None else budget_seconds
+
+    details = {}
+    jobs = {}
+    for repo in repos[:limit]:
+        full_name = repo['full_name']
+        owner, name = full_name.split('/', 1)
+        details[full_name] = {'commits_30d': 0, 'language_breakdown': {}}
+        commits = asyncio.ensure_future(
+            client.fetch_commit_count_30d(owner, name, repo.get('default_branch') or 'main')
+        )
+        languages = asyncio.ensure_future(client.fetch_repo_languages(owner, name))
+        jobs[commits] = (full_name, 'commits_30d')
+        jobs[languages] = (full_name, 'language_breakdown')
+    if not jobs:
+        return details
+
+    done, pending = await asyncio.wait(jobs, timeout=budget_seconds)
+    for task in pending:
+        task.cancel()
+    for task in done:
+        try:
+            value = task.result()
+        except DEEP_FETCH_ERRORS:
+            continue
+        full_name, field = jobs[task]
+        details[full_name][field] = value
+    return details
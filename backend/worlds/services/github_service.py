@@ -1,7 +1,10 @@
 import hashlib
 import math
 import re
+import threading
+import time
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta, timezone as dt_timezone
 from urllib.parse import urlparse
 
@@ -9,6 +12,16 @@ import requests
 from django.conf import settings
 from django.utils import timezone
 
+from .http_cache import get_response_cache
+from .http_session import get_http_session
+from .metrics import record_github_call, record_github_failure, submit_in_context
+from .token_pool import PARK_INVALID, PARK_SECONDARY, RESOURCE_CORE, RESOURCE_GRAPHQL, get_token_pool
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; build_world_payload falls back to plain Python.
+    np = None
+
 
 class GitHubError(Exception):
     pass
@@ -24,22 +37,49 @@ class GitHubRateLimitError(GitHubError):
         self.reset_at = reset_at
 
 
-class GitHubClient:
+class TokenUnavailable(Exception):
+    """No pooled token is usable for a call that cannot be made anonymously."""
+
+
+REPOS_PER_PAGE = 100
+LINK_LAST_PAGE_PATTERN = re.compile(r'[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+
+def last_page_from_link(link):
+    """Return the ``rel="last"`` page number from a GitHub ``Link`` header, or ``None``."""
+    match = LINK_LAST_PAGE_PATTERN.search(link or '')
+    return int(match.group(1)) if match else None
+
+
+def repo_page_params(page):
+    return {'per_page': REPOS_PER_PAGE, 'page': page, 'sort': 'updated', 'type': 'owner'}
+
+
+def commits_since():
+    # Truncated to the hour so repeated requests share a cache key and can be revalidated.
+    return (timezone.now() - timedelta(days=30)).replace(minute=0, second=0, microsecond=0)
+
+
+def commit_count_params(default_branch):
+    return {'sha': default_branch, 'since': commits_since().isoformat(), 'per_page': 1}
+
+
+def commit_count_from_response(response):
+    # With per_page=1 the last page number is the commit count.
+    last_page = last_page_from_link(response.headers.get('Link', ''))
+    if last_page:
+        return last_page
+    return len(response.json())
+
+
+class BaseGitHubClient:
+    """Username parsing and token/response bookkeeping shared by the sync and async clients."""
+
     USERNAME_PATTERN = re.compile(r'^[a-zA-Z0-9-]{1,39}$')
 
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                'Accept': 'application/vnd.github+json',
-                'User-Agent': 'github-profile-world-app',
-            }
-        )
-        token = settings.GITHUB_TOKEN
-        self._has_auth_header = False
-        if token:
-            self.session.headers.update({'Authorization': f'Bearer {token}'})
-            self._has_auth_header = True
+        self.token_pool = get_token_pool()
+        self.response_cache = get_response_cache()
 
     def parse_username(self, github_url=None, username=None):
         if username:
@@ -60,67 +100,442 @@ class GitHubClient:
         path = parsed.path.strip('/').split('/')
         return path[0] if path and path[0] else ''
 
-    def _request(self, path, params=None):
-        url = f"{settings.GITHUB_API_BASE}{path}"
-        try:
-            response = self.session.get(url, params=params, timeout=15)
-        except requests.RequestException as exc:
-            raise GitHubError('GitHub API is temporarily unavailable.') from exc
-
-        # Retry once without token if the configured token is invalid or expired.
-        if response.status_code == 401 and self._has_auth_header:
-            self.session.headers.pop('Authorization', None)
-            self._has_auth_header = False
-            try:
-                response = self.session.get(url, params=params, timeout=15)
-            except requests.RequestException as exc:
-                raise GitHubError('GitHub API is temporarily unavailable.') from exc
+    def _choose_token(self, require_token=False, resource=RESOURCE_CORE):
+        """The pooled token with the most headroom, or ``None`` to go out anonymously.
+
+        Once every token is parked by a rate limit this raises ``GitHubRateLimitError``; if
+        they were all rejected (or none are configured) the request goes out anonymously,
+        unless ``require_token`` is set, which raises ``TokenUnavailable`` instead.
+        """
+        token = self.token_pool.acquire(resource)
+        if token is None:
+            self._no_token(self.token_pool.blocked_until(resource), require_token)
+        return token
+
+    def _no_token(self, blocked_until, require_token):
+        if blocked_until:
+            raise GitHubRateLimitError(reset_at=datetime.fromtimestamp(blocked_until, tz=dt_timezone.utc))
+        if require_token:
+            raise TokenUnavailable
+
+    def _accept(self, token, response, resource=RESOURCE_CORE):
+        """Record ``response`` against ``token``; ``False`` when the token was parked and the call should move on."""
+        if token is None:
+            return True
+        parking = self._parking(response)
+        if parking is not None:
+            self.token_pool.park(token, *parking, resource=resource)
+            return False
+        self.token_pool.update(token, response, resource)
+        return self._still_usable(response)
+
+    @staticmethod
+    def _parking(response):
+        """``(until, reason)`` when ``response`` means its token must be parked, else ``None``."""
+        retry_after = response.headers.get('Retry-After')
+        if response.status_code == 401:
+            return None, PARK_INVALID
+        if response.status_code in (403, 429) and retry_after and retry_after.isdigit():
+            # Secondary rate limit: back off this token for as long as GitHub asks.
+            return time.time() + int(retry_after), PARK_SECONDARY
+        return None
+
+    @staticmethod
+    def _still_usable(response):
+        return response.status_code not in (403, 429) or not _is_rate_limited(response)
 
+    def _attempts(self):
+        return range(len(self.token_pool.tokens) + 1)
+
+    def _check_response(self, response):
         if response.status_code == 404:
             raise GitHubNotFoundError('GitHub user or resource not found.')
-        if response.status_code == 403 and response.headers.get('X-RateLimit-Remaining') == '0':
-            reset_epoch = int(response.headers.get('X-RateLimit-Reset', '0'))
-            reset_at = datetime.fromtimestamp(reset_epoch, tz=dt_timezone.utc)
-            raise GitHubRateLimitError(reset_at=reset_at)
+        if response.status_code in (403, 429) and _is_rate_limited(response):
+            raise GitHubRateLimitError(reset_at=_rate_limit_reset(response))
         if response.status_code >= 400:
             raise GitHubError(f'GitHub API error: {response.status_code}')
+
+
+class GitHubClient(BaseGitHubClient):
+    def __init__(self):
+        super().__init__()
+        self.session = get_http_session()
+
+    def _send(self, method, url, require_token=False, resource=RESOURCE_CORE, **kwargs):
+        """Send a request with the pooled token that has the most ``resource`` headroom.
+
+        Rejected and rate-limited tokens are parked and the request moves on to the next one.
+        """
+        headers = kwargs.pop('headers', None) or {}
+        for _ in self._attempts():
+            token = self._choose_token(require_token, resource)
+            auth = {'Authorization': f'Bearer {token}'} if token else {}
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, headers={**headers, **auth}, timeout=15, **kwargs)
+            except requests.RequestException as exc:
+                record_github_failure()
+                raise GitHubError('GitHub API is temporarily unavailable.') from exc
+            record_github_call(response, time.perf_counter() - started, self.token_pool.label(token))
+            if self._accept(token, response, resource):
+                return response
+        return response
+
+    def _request(self, path, params=None):
+        url = f"{settings.GITHUB_API_BASE}{path}"
+        cache_key = self.response_cache.make_key(url, params)
+        cached = self.response_cache.get(cache_key)
+        headers = self.response_cache.conditional_headers(cached)
+        response = self._send('GET', url, params=params, headers=headers)
+
+        # Unchanged resources come back as 304, which does not count against the rate limit.
+        if response.status_code == 304 and cached is not None:
+            self.response_cache.record(hit=True)
+            return self.response_cache.to_response(cached, url)
+
+        self._check_response(response)
+        self.response_cache.record(hit=False)
+        self.response_cache.store(cache_key, response)
         return response
 
     def fetch_user(self, username):
         return self._request(f'/users/{username}').json()
 
-    def fetch_repos(self, username):
-        repos = []
-        page = 1
-        while page <= 3:
-            payload = self._request(
-                f'/users/{username}/repos',
-                params={'per_page': 100, 'page': page, 'sort': 'updated', 'type': 'owner'},
-            ).json()
-            if not payload:
-                break
-            repos.extend(payload)
-            if len(payload) < 100:
-                break
-            page += 1
-        return repos
+    def iter_repo_pages(self, username, max_repos=None):
+        """Yield the user's repos page by page, in GitHub's order, as the pages arrive.
+
+        Page 1 reveals the last page through the ``Link`` header; pages 2..N are then fetched
+        concurrently. At most ``max_repos`` (``GITHUB_MAX_REPOS`` by default) are yielded.
+        """
+        max_repos = settings.GITHUB_MAX_REPOS if max_repos is None else max_repos
+        if max_repos <= 0:
+            return
+        path = f'/users/{username}/repos'
+        first = self._request(path, params=repo_page_params(1))
+        payload = first.json()[:max_repos]
+        yield payload
+        remaining = max_repos - len(payload)
+        last_page = last_page_from_link(first.headers.get('Link', '')) or 1
+        last_page = min(last_page, math.ceil(max_repos / REPOS_PER_PAGE))
+        if remaining <= 0 or last_page < 2:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=settings.GITHUB_PAGE_FETCH_WORKERS, thread_name_prefix='github-pages')
+        try:
+            futures = [
+                submit_in_context(executor, self._request, path, repo_page_params(page))
+                for page in range(2, last_page + 1)
+            ]
+            for future in futures:
+                payload = future.result().json()[:remaining]
+                if not payload:
+                    break
+                yield payload
+                remaining -= len(payload)
+                if remaining <= 0:
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_repos(self, username, max_repos=None):
+        for page in self.iter_repo_pages(username, max_repos=max_repos):
+            yield from page
+
+    def fetch_repos(self, username, max_repos=None):
+        return list(self.iter_repos(username, max_repos=max_repos))
 
     def fetch_repo_languages(self, owner, repo):
         return self._request(f'/repos/{owner}/{repo}/languages').json()
 
     def fetch_commit_count_30d(self, owner, repo, default_branch):
-        since = (timezone.now() - timedelta(days=30)).isoformat()
-        response = self._request(
-            f'/repos/{owner}/{repo}/commits',
-            params={'sha': default_branch, 'since': since, 'per_page': 1},
+        response = self._request(f'/repos/{owner}/{repo}/commits', params=commit_count_params(default_branch))
+        return commit_count_from_response(response)
+
+
+REPO_PAGE_QUERY = """
+query($login: String!, $first: Int!, $after: String, $since: GitTimestamp!, $withHistory: Boolean!) {
+  user(login: $login) {
+    databaseId
+    login
+    name
+    url
+    avatarUrl
+    followers { totalCount }
+    following { totalCount }
+    repositories(
+      first: $first
+      after: $after
+      privacy: PUBLIC
+      ownerAffiliations: OWNER
+      orderBy: {field: UPDATED_AT, direction: DESC}
+    ) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        databaseId
+        name
+        nameWithOwner
+        url
+        description
+        primaryLanguage { name }
+        stargazerCount
+        forkCount
+        issues(states: OPEN) { totalCount }
+        diskUsage
+        isFork
+        pushedAt
+        updatedAt
+        languages(first: 100, orderBy: {field: SIZE, direction: DESC}) {
+          edges { size node { name } }
+        }
+        defaultBranchRef {
+          name
+          target {
+            ... on Commit {
+              history(since: $since) @include(if: $withHistory) { totalCount }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+class GraphQLResults:
+    """Builds GraphQL repo page queries and normalizes their results to the REST shapes.
+
+    Shared by the sync and async GraphQL clients. Languages and commit counts seen in a page
+    are kept, so the per-repo lookups can be answered from memory.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._pages = {}
+        self._languages = {}
+        self._commit_counts = {}
+
+    def _page_request(self, username, after, first):
+        variables = {
+            'login': username,
+            'first': first,
+            'after': after,
+            'since': commits_since().isoformat(),
+            # Only the first page holds the repos that get deep-fetched.
+            'withHistory': after is None,
+        }
+        return {'query': REPO_PAGE_QUERY, 'variables': variables}
+
+    def _page_user(self, response):
+        if response.status_code in (403, 429) and _is_rate_limited(response):
+            raise GitHubRateLimitError(reset_at=_rate_limit_reset(response))
+        if response.status_code >= 400:
+            raise GitHubError(f'GitHub API error: {response.status_code}')
+
+        body = response.json()
+        error_types = {error.get('type') for error in body.get('errors') or []}
+        if 'RATE_LIMITED' in error_types:
+            raise GitHubRateLimitError(reset_at=_rate_limit_reset(response))
+        user = (body.get('data') or {}).get('user')
+        if user is None:
+            if 'NOT_FOUND' in error_types or not error_types:
+                raise GitHubNotFoundError('GitHub user or resource not found.')
+            raise GitHubError('GitHub API error: ' + ', '.join(sorted(filter(None, error_types))))
+        return user
+
+    def _parse_page(self, user):
+        """``(user, repos, next_cursor)`` from a page's ``user``; ``next_cursor`` is ``None`` on the last page."""
+        connection = user['repositories']
+        repos = [self._normalize_repo(node) for node in connection['nodes']]
+        page_info = connection['pageInfo']
+        return user, repos, page_info['endCursor'] if page_info['hasNextPage'] else None
+
+    def _normalize_repo(self, node):
+        full_name = node['nameWithOwner']
+        branch = node.get('defaultBranchRef') or {}
+        history = (branch.get('target') or {}).get('history')
+        self._languages[full_name] = {
+            edge['node']['name']: edge['size'] for edge in (node.get('languages') or {}).get('edges', [])
+        }
+        if history is not None:
+            self._commit_counts[full_name] = history['totalCount']
+        return {
+            'id': node['databaseId'],
+            'name': node['name'],
+            'full_name': full_name,
+            'html_url': node['url'],
+            'description': node.get('description'),
+            'language': (node.get('primaryLanguage') or {}).get('name'),
+            'stargazers_count': node['stargazerCount'],
+            'forks_count': node['forkCount'],
+            'open_issues_count': node['issues']['totalCount'],
+            # REST reports stargazers as ``watchers_count``; GraphQL ``watchers`` are subscribers.
+            'watchers_count': node['stargazerCount'],
+            'size': node['diskUsage'] or 0,
+            'fork': node['isFork'],
+            'default_branch': branch.get('name') or 'main',
+            'pushed_at': node.get('pushedAt'),
+            'updated_at': node.get('updatedAt'),
+        }
+
+    def _user_payload(self, user):
+        return {
+            'id': user['databaseId'],
+            'login': user['login'],
+            'name': user.get('name'),
+            'html_url': user['url'],
+            'avatar_url': user['avatarUrl'],
+            'followers': user['followers']['totalCount'],
+            'following': user['following']['totalCount'],
+            'public_repos': user['repositories']['totalCount'],
+        }
+
+
+class GitHubGraphQLClient(GraphQLResults, GitHubClient):
+    """Fetches the profile, repos, language sizes and 30-day commit counts through GraphQL.
+
+    One query returns the user together with the first page of repos, including each repo's
+    languages and (for the first page) its default-branch commit count since 30 days ago.
+    Results are normalized to the REST shapes ``build_world_payload`` consumes, and the
+    per-repo lookups are answered from memory, falling back to REST for anything not seen.
+    GraphQL requires a token; without one (or once it is rejected) the client behaves like
+    the REST client.
+    """
+
+    def _fetch_page(self, username, after=None, first=REPOS_PER_PAGE):
+        response = self._send(
+            'POST',
+            settings.GITHUB_GRAPHQL_URL,
+            require_token=True,
+            resource=RESOURCE_GRAPHQL,
+            json=self._page_request(username, after, first),
         )
-        link = response.headers.get('Link', '')
-        if 'rel="last"' in link:
-            match = re.search(r'&page=(\d+)>; rel="last"', link)
-            if match:
-                return int(match.group(1))
-        commits = response.json()
-        return len(commits)
+        return self._parse_page(self._page_user(response))
+
+    def fetch_user(self, username):
+        try:
+            user, repos, cursor = self._fetch_page(username)
+        except TokenUnavailable:
+            return super().fetch_user(username)
+        self._pages[username.lower()] = (repos, cursor)
+        return self._user_payload(user)
+
+    def iter_repo_pages(self, username, max_repos=None):
+        """Yield repo pages by following GraphQL cursors, reusing the page ``fetch_user`` loaded."""
+        remaining = settings.GITHUB_MAX_REPOS if max_repos is None else max_repos
+        if remaining <= 0:
+            return
+        try:
+            if username.lower() in self._pages:
+                repos, cursor = self._pages.pop(username.lower())
+            else:
+                _, repos, cursor = self._fetch_page(username)
+        except TokenUnavailable:
+            yield from super().iter_repo_pages(username, max_repos=max_repos)
+            return
+        seen = set()
+        while True:
+            page = repos[:remaining]
+            if page:
+                yield page
+            seen.update(repo['id'] for repo in page)
+            remaining -= len(page)
+            if remaining <= 0 or cursor is None:
+                return
+            try:
+                _, repos, cursor = self._fetch_page(username, after=cursor, first=min(REPOS_PER_PAGE, remaining))
+            except TokenUnavailable:
+                # The token was rejected part-way through; finish the list over REST.
+                yield from self._rest_repo_pages(username, seen, remaining)
+                return
+
+    def _rest_repo_pages(self, username, seen, remaining):
+        """REST repo pages, minus the repos in ``seen``, up to ``remaining`` more repos."""
+        for page in super().iter_repo_pages(username, max_repos=len(seen) + remaining):
+            page = [repo for repo in page if repo['id'] not in seen][:remaining]
+            if page:
+                yield page
+            remaining -= len(page)
+            if remaining <= 0:
+                return
+
+    def fetch_repo_languages(self, owner, repo):
+        languages = self._languages.get(f'{owner}/{repo}')
+        if languages is None:
+            return super().fetch_repo_languages(owner, repo)
+        return languages
+
+    def fetch_commit_count_30d(self, owner, repo, default_branch):
+        count = self._commit_counts.get(f'{owner}/{repo}')
+        if count is None:
+            return super().fetch_commit_count_30d(owner, repo, default_branch)
+        return count
+
+
+def _is_rate_limited(response):
+    return response.headers.get('X-RateLimit-Remaining') == '0' or 'Retry-After' in response.headers
+
+
+def _rate_limit_reset(response):
+    retry_after = response.headers.get('Retry-After')
+    if retry_after and retry_after.isdigit():
+        return timezone.now() + timedelta(seconds=int(retry_after))
+    reset_epoch = int(response.headers.get('X-RateLimit-Reset', '0'))
+    return datetime.fromtimestamp(reset_epoch, tz=dt_timezone.utc)
+
+
+def get_github_client():
+    """A client for the configured ``GITHUB_API_MODE``; GraphQL needs a token, so REST otherwise."""
+    if settings.GITHUB_API_MODE == 'graphql' and get_token_pool():
+        return GitHubGraphQLClient()
+    return GitHubClient()
+
+
+# What one deep-fetch call may raise without costing the world: API errors, and bodies that
+# are not JSON (``ValueError``) or lack the fields we read (``KeyError``).
+DEEP_FETCH_ERRORS = (GitHubError, ValueError, KeyError)
+
+
+def fetch_repo_details(client, repos, limit=None, max_workers=None, budget_seconds=None):
+    """Fetch 30-day commit counts and language breakdowns for the top repos in parallel.
+
+    Returns a mapping of ``full_name`` to ``{'commits_30d', 'language_breakdown'}``. Calls that
+    fail or do not finish within the time budget keep their defaults, so a slow GitHub only
+    costs detail, never the whole world.
+    """
+    limit = settings.GITHUB_DEEP_FETCH_REPOS if limit is None else limit
+    max_workers = max_workers or settings.GITHUB_DEEP_FETCH_WORKERS
+    budget_seconds = settings.GITHUB_DEEP_FETCH_BUDGET_SECONDS if budget_seconds is None else budget_seconds
+
+    details = {}
+    jobs = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='github-deep-fetch')
+    try:
+        for repo in repos[:limit]:
+            full_name = repo['full_name']
+            owner, name = full_name.split('/', 1)
+            details[full_name] = {'commits_30d': 0, 'language_breakdown': {}}
+            commits = submit_in_context(
+                executor,
+                client.fetch_commit_count_30d, owner, name, repo.get('default_branch') or 'main'
+            )
+            languages = submit_in_context(executor, client.fetch_repo_languages, owner, name)
+            jobs[commits] = (full_name, 'commits_30d')
+            jobs[languages] = (full_name, 'language_breakdown')
+
+        done, _ = wait(jobs, timeout=budget_seconds)
+        for future in done:
+            try:
+                value = future.result()
+            except DEEP_FETCH_ERRORS:
+                continue
+            full_name, field = jobs[future]
+            details[full_name][field] = value
+    finally:
+        # Do not block on stragglers past the budget; they finish (or time out) on their own.
+        executor.shutdown(wait=False, cancel_futures=True)
+    return details
 
 
 def language_token(language):
@@ -134,16 +549,65 @@ def language_token(language):
     return mapping.get(language, 'text-300')
 
 
-def build_world_payload(user, repos):
-    total_stars = sum(repo.get('stargazers_count', 0) for repo in repos)
-    total_forks = sum(repo.get('forks_count', 0) for repo in repos)
-    total_watchers = sum(repo.get('watchers_count', 0) for repo in repos)
+# Spiral coordinates depend only on a repo's index, so they are computed once and reused.
+# Entries are produced with ``math`` so every backend yields bit-identical positions.
+_SPIRAL_CACHE_LIMIT = 20_000
+_spiral_cache = []
+_spiral_lock = threading.Lock()
+
+
+def _spiral_position(idx):
+    angle = idx * 0.45
+    radius = 8 + math.floor(idx / 8) * 4
+    return round(math.cos(angle) * radius, 2), round(math.sin(angle) * radius, 2)
+
 
-    language_counter = Counter()
-    for repo in repos:
-        primary_language = repo.get('language')
-        if primary_language:
-            language_counter[primary_language] += 1
+def _spiral_layout(count):
+    if len(_spiral_cache) < min(count, _SPIRAL_CACHE_LIMIT):
+        with _spiral_lock:
+            start = len(_spiral_cache)
+            _spiral_cache.extend(_spiral_position(idx) for idx in range(start, min(count, _SPIRAL_CACHE_LIMIT)))
+    layout = _spiral_cache[:count]
+    if count > len(layout):
+        layout.extend(_spiral_position(idx) for idx in range(len(layout), count))
+    return layout
+
+
+def _score_columns(stars, forks, watchers, use_numpy):
+    """Activity scores and building heights for whole columns at once.
+
+    Both backends do the same IEEE float64 operations in the same order, and rounding goes
+    through Python's ``round`` in each case, so their output matches exactly.
+    """
+    if use_numpy:
+        stars_arr = np.asarray(stars, dtype=np.float64)
+        raw_scores = (stars_arr * 1.7) + (np.asarray(forks, dtype=np.float64) * 1.3)
+        raw_scores += np.asarray(watchers, dtype=np.float64) * 1.1
+        heights = np.clip(1.2 + np.sqrt(stars_arr + 1) * 2.1, 1.2, 20.0)
+        return [round(score, 2) for score in raw_scores.tolist()], heights.tolist()
+    scores = [round((s * 1.7) + (f * 1.3) + (w * 1.1), 2) for s, f, w in zip(stars, forks, watchers)]
+    heights = [max(1.2, min(20.0, 1.2 + math.sqrt(s + 1) * 2.1)) for s in stars]
+    return scores, heights
+
+
+def build_world_payload(user, repos, use_numpy=None):
+    """Turn a GitHub user and repo list into totals, language shares and per-repo layout.
+
+    Numeric fields are pulled into columns once and scored in batch, with NumPy when it is
+    installed (``use_numpy=None``) and plain Python otherwise.
+    """
+    use_numpy = np is not None if use_numpy is None else use_numpy and np is not None
+
+    stars = [repo.get('stargazers_count', 0) for repo in repos]
+    forks = [repo.get('forks_count', 0) for repo in repos]
+    watchers = [repo.get('watchers_count', 0) for repo in repos]
+    total_stars = sum(stars)
+    total_forks = sum(forks)
+    total_watchers = sum(watchers)
+
+    language_counter = Counter(repo.get('language') for repo in repos)
+    language_counter.pop(None, None)
+    language_counter.pop('', None)
 
     total_language_count = sum(language_counter.values()) or 1
     languages = [
@@ -155,37 +619,34 @@ def build_world_payload(user, repos):
         for lang, count in language_counter.items()
     ]
 
-    repo_payload = []
-    for idx, repo in enumerate(repos):
-        stars = repo.get('stargazers_count', 0)
-        forks = repo.get('forks_count', 0)
-        watchers = repo.get('watchers_count', 0)
-        activity_score = round((stars * 1.7) + (forks * 1.3) + (watchers * 1.1), 2)
-        angle = idx * 0.45
-        radius = 8 + math.floor(idx / 8) * 4
-        repo_payload.append(
-            {
-                'repo_id': repo['id'],
-                'name': repo['name'],
-                'full_name': repo['full_name'],
-                'html_url': repo['html_url'],
-                'description': repo.get('description') or '',
-                'primary_language': repo.get('language') or '',
-                'stars': stars,
-                'forks': forks,
-                'open_issues': repo.get('open_issues_count', 0),
-                'watchers': watchers,
-                'size_kb': repo.get('size', 0),
-                'is_fork': repo.get('fork', False),
-                'default_branch': repo.get('default_branch') or 'main',
-                'last_activity_at': repo.get('pushed_at'),
-                'activity_score': activity_score,
-                'pos_x': round(math.cos(angle) * radius, 2),
-                'pos_y': max(1.2, min(20.0, 1.2 + math.sqrt(stars + 1) * 2.1)),
-                'pos_z': round(math.sin(angle) * radius, 2),
-            }
-        )
+    scores, heights = _score_columns(stars, forks, watchers, use_numpy)
+    layout = _spiral_layout(len(repos))
 
+    repo_payload = [
+        {
+            'repo_id': repo['id'],
+            'name': repo['name'],
+            'full_name': repo['full_name'],
+            'html_url': repo['html_url'],
+            'description': repo.get('description') or '',
+            'primary_language': repo.get('language') or '',
+            'stars': repo_stars,
+            'forks': repo_forks,
+            'open_issues': repo.get('open_issues_count', 0),
+            'watchers': repo_watchers,
+            'size_kb': repo.get('size', 0),
+            'is_fork': repo.get('fork', False),
+            'default_branch': repo.get('default_branch') or 'main',
+            'last_activity_at': repo.get('pushed_at'),
+            'activity_score': score,
+            'pos_x': pos_x,
+            'pos_y': height,
+            'pos_z': pos_z,
+        }
+        for repo, repo_stars, repo_forks, repo_watchers, score, height, (pos_x, pos_z) in zip(
+            repos, stars, forks, watchers, scores, heights, layout
+        )
+    ]
     payload_hash = hashlib.sha256(
         f"{user.get('id', '')}:{total_stars}:{len(repos)}:{user.get('followers', 0)}".encode('utf-8')
     ).hexdigest()
@@ -0,0 +1,176 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.structures import CaseInsensitiveDict
+
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Link')
+
+
+class ResponseCache:
+    """Bounded LRU of conditional-request validators and bodies for GitHub GET requests.
+
+    Entries live in process memory and are written through to the Django cache, so other
+    workers (and restarts, with a persistent backend) can revalidate instead of refetching.
+    Process memory is capped at ``max_entries`` and at ``max_bytes`` of bodies and headers;
+    least recently used entries are evicted until both fit. A body bigger than
+    ``max_bytes // 8`` is only kept in the Django cache, so one large repo page cannot
+    flush everything else.
+    """
+
+    def __init__(self, max_entries, timeout, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(url, params=None):
+        query = '&'.join(f'{key}={value}' for key, value in sorted((params or {}).items()))
+        return 'github:http:' + hashlib.sha1(f'{url}?{query}'.encode('utf-8')).hexdigest()
+
+    def _local_get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            self._entries.move_to_end(key)
+            return item[0]
+
+    def get(self, key):
+        entry = self._local_get(key)
+        if entry is None:
+            entry = cache.get(key)
+            if entry is not None:
+                self._remember(key, entry)
+        return entry
+
+    async def aget(self, key):
+        entry = self._local_get(key)
+        if entry is None:
+            entry = await cache.aget(key)
+            if entry is not None:
+                self._remember(key, entry)
+        return entry
+
+    def _entry(self, response):
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return None
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'headers': {name: response.headers[name] for name in STORED_HEADERS if name in response.headers},
+            'body': response.content,
+        }
+
+    def store(self, key, response):
+        entry = self._entry(response)
+        if entry is not None:
+            self._remember(key, entry)
+            cache.set(key, entry, timeout=self.timeout)
+
+    async def astore(self, key, response):
+        entry = self._entry(response)
+        if entry is not None:
+            self._remember(key, entry)
+            await cache.aset(key, entry, timeout=self.timeout)
+
+    @staticmethod
+    def entry_size(entry):
+        """Approximate bytes ``entry`` holds: the body plus its stored headers."""
+        return len(entry['body']) + sum(len(name) + len(value) for name, value in entry['headers'].items())
+
+    def _remember(self, key, entry):
+        size = self.entry_size(entry)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            if size > self.max_bytes // 8:
+                return
+            self._entries[key] = (entry, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def conditional_headers(self, entry):
+        if entry is None:
+            return {}
+        if entry['etag']:
+            return {'If-None-Match': entry['etag']}
+        return {'If-Modified-Since': entry['last_modified']}
+
+    def to_response(self, entry, url):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.encoding = 'utf-8'
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = entry['body']
+        return response
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(
+                    max_entries=settings.GITHUB_HTTP_CACHE_SIZE,
+                    timeout=settings.GITHUB_HTTP_CACHE_TTL_SECONDS,
+                    max_bytes=settings.GITHUB_HTTP_CACHE_MAX_BYTES,
+                )
+    return _response_cache
+
+
+def response_cache_metrics():
+    stats = get_response_cache().stats()
+    return [
+        (
+            'world_github_http_cache_lookups_total',
+            'Conditional GitHub requests answered from (hit) or refetched past (miss) the ETag cache.',
+            'counter',
+            [({'result': 'hit'}, stats['hits']), ({'result': 'miss'}, stats['misses'])],
+        ),
+        ('world_github_http_cache_entries', 'Responses held in process memory.', 'gauge', [({}, stats['entries'])]),
+        (
+            'world_github_http_cache_bytes',
+            'Approximate bytes of response bodies and headers held in process memory.',
+            'gauge',
+            [({}, stats['bytes'])],
+        ),
+    ]
@@ -0,0 +1,121 @@
+import asyncio
+import atexit
+import os
+import threading
+import weakref
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:  # httpx is optional; it is only needed by the async views.
+    httpx = None
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def build_session():
+    """A ``requests.Session`` with a keep-alive connection pool and retries for transient failures.
+
+    Connection errors and 5xx responses are retried with exponential backoff. Rate-limit
+    responses (403/429) are left to the caller, which parks the token and moves on.
+    """
+    retry = Retry(
+        total=settings.GITHUB_HTTP_MAX_RETRIES,
+        backoff_factor=settings.GITHUB_HTTP_RETRY_BACKOFF,
+        status_forcelist=(500, 502, 503, 504),
+        # GraphQL queries are POSTs but read-only, so they are as safe to repeat as GETs.
+        allowed_methods=frozenset({'GET', 'POST'}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=settings.GITHUB_HTTP_POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(
+        {
+            'Accept': 'application/vnd.github+json',
+            'User-Agent': 'github-profile-world-app',
+        }
+    )
+    return session
+
+
+def get_http_session():
+    """The process-wide GitHub session, shared by every client and thread.
+
+    Headers are never mutated after creation (tokens are sent per request), so the session is
+    safe to share. A forked worker (e.g. gunicorn with ``--preload``) gets its own session
+    rather than inheriting the parent's sockets.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = build_session()
+                _session_pid = pid
+    return _session
+
+
+def close_http_session():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+atexit.register(close_http_session)
+
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+async def _close_with_loop(loop, client):
+    """Hold ``client`` open until the loop shuts down, then close its connections.
+
+    ``asyncio.run`` (used by ASGI servers and asgiref) cancels leftover tasks before closing
+    the loop, which runs the ``finally`` while the loop can still await.
+    """
+    try:
+        await asyncio.Event().wait()
+    finally:
+        _async_clients.pop(loop, None)
+        await client.aclose()
+
+
+def get_async_http_client():
+    """The ``httpx.AsyncClient`` for the running event loop.
+
+    Connections belong to the loop that opened them, so each loop (one per ASGI worker) keeps
+    its own pooled client, closed when the loop shuts down.
+    """
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(loop)
+    if entry is None:
+        client = httpx.AsyncClient(
+            headers={
+                'Accept': 'application/vnd.github+json',
+                'User-Agent': 'github-profile-world-app',
+            },
+            limits=httpx.Limits(
+                max_connections=settings.GITHUB_ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GITHUB_HTTP_POOL_SIZE,
+            ),
+            # httpx retries connection failures only; 5xx responses surface as GitHubError.
+            transport=httpx.AsyncHTTPTransport(retries=settings.GITHUB_HTTP_MAX_RETRIES),
+            timeout=15,
+        )
+        # The entry keeps the closing task alive; the task removes the entry when it runs.
+        entry = _async_clients[loop] = (client, loop.create_task(_close_with_loop(loop, client)))
+    return entry[0]
@@ -0,0 +1,45 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+JOB_POOL = 'world-job'
+# Pre-warm runs can wait out a GitHub rate limit for up to an hour, so they get their own
+# threads instead of holding generation workers.
+BATCH_POOL = 'world-batch-job'
+POOL_WORKERS_SETTINGS = {JOB_POOL: 'WORLD_JOB_WORKERS', BATCH_POOL: 'WORLD_BATCH_JOB_WORKERS'}
+
+_executors = {}
+_executor_lock = threading.Lock()
+
+
+def _get_executor(pool):
+    executor = _executors.get(pool)
+    if executor is None:
+        with _executor_lock:
+            executor = _executors.get(pool)
+            if executor is None:
+                executor = _executors[pool] = ThreadPoolExecutor(
+                    max_workers=getattr(settings, POOL_WORKERS_SETTINGS[pool]),
+                    thread_name_prefix=pool,
+                )
+    return executor
+
+
+def _run(func, args):
+    close_old_connections()
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('Background job %s failed', getattr(func, '__name__', func))
+    finally:
+        close_old_connections()
+
+
+def enqueue(func, *args, pool=JOB_POOL):
+    """Run ``func(*args)`` on an in-process worker pool once the current transaction commits."""
+    transaction.on_commit(lambda: _get_executor(pool).submit(_run, func, args))
@@ -0,0 +1,302 @@
+"""In-process metrics for the generation pipeline, rendered in the Prometheus text format.
+
+Counters and histograms live in the worker process that recorded them, so with several
+workers each one is scraped (or aggregated) separately. Values read from shared state,
+such as the token pool's headroom, are collected at scrape time instead.
+
+Per-request numbers (stage timings, GitHub calls, DB queries) are also summed into the
+``Timings`` of the current context, which ``ServerTimingMiddleware`` turns into a
+``Server-Timing`` header. Worker threads see that context only when they are started
+through ``submit_in_context``; asyncio tasks and ``sync_to_async`` carry it over on their own.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}, got {tuple(labels)}.')
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in sorted(self._values.items())]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = (*sorted(buckets), float('inf'))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['buckets'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, state['buckets']):
+                    samples.append((f'{self.name}_bucket', (*key, ('le', _format_value(bound))), count))
+                samples.append((f'{self.name}_sum', key, state['sum']))
+                samples.append((f'{self.name}_count', key, state['count']))
+        return samples
+
+
+class Registry:
+    """Named metrics plus collectors that report values computed at scrape time.
+
+    A collector is a callable returning ``(name, help_text, kind, [(labels_dict, value), ...])``
+    tuples.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def add_collector(self, collector):
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help_text}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        for collector in collectors:
+            for name, help_text, kind, values in collector():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in values:
+                    lines.append(f'{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    'world_http_request_duration_seconds', 'Time to answer an HTTP request.', ('view', 'method', 'status')
+)
+REQUEST_DB_QUERIES = REGISTRY.histogram(
+    'world_http_request_db_queries', 'Database queries per HTTP request.', ('view',), buckets=COUNT_BUCKETS
+)
+STAGE_SECONDS = REGISTRY.histogram('world_stage_duration_seconds', 'Time spent per pipeline stage.', ('stage',))
+GITHUB_CALLS = REGISTRY.counter('world_github_calls_total', 'GitHub API calls by status code.', ('status',))
+GITHUB_SECONDS = REGISTRY.histogram('world_github_call_duration_seconds', 'Latency of one GitHub API call.')
+GITHUB_RATE_REMAINING = REGISTRY.gauge(
+    'world_github_rate_limit_remaining', 'X-RateLimit-Remaining from the last GitHub response.', ('token',)
+)
+GITHUB_RATE_RESET = REGISTRY.gauge(
+    'world_github_rate_limit_reset_timestamp', 'X-RateLimit-Reset from the last GitHub response.', ('token',)
+)
+WORLD_GITHUB_CALLS = REGISTRY.histogram(
+    'world_generation_github_calls', 'GitHub calls made to build or refresh one world.', buckets=COUNT_BUCKETS
+)
+WORLD_GITHUB_SECONDS = REGISTRY.histogram(
+    'world_generation_github_seconds', 'Summed GitHub call latency for one world.'
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    'world_cache_lookups_total', 'Cache lookups by cache, tier and result.', ('cache', 'tier', 'result')
+)
+DB_QUERIES = REGISTRY.counter('world_db_queries_total', 'Database queries executed.')
+
+
+class Timings:
+    """Stage durations, GitHub calls and DB queries summed for one request or one world.
+
+    Everything recorded on a nested ``Timings`` is added to its parents too.
+    """
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.stages = {}
+        self.github_calls = 0
+        self.github_seconds = 0.0
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _chain(self):
+        timings = self
+        while timings is not None:
+            yield timings
+            timings = timings.parent
+
+    def add_stage(self, name, seconds):
+        for timings in self._chain():
+            with timings._lock:
+                timings.stages[name] = timings.stages.get(name, 0.0) + seconds
+
+    def add_github_call(self, seconds):
+        for timings in self._chain():
+            with timings._lock:
+                timings.github_calls += 1
+                timings.github_seconds += seconds
+
+    def add_db_query(self, seconds):
+        for timings in self._chain():
+            with timings._lock:
+                timings.db_queries += 1
+                timings.db_seconds += seconds
+
+
+_current = contextvars.ContextVar('world_timings', default=None)
+
+
+def current_timings():
+    return _current.get()
+
+
+@contextmanager
+def collect():
+    """Collect timings for the enclosed block, nested under whatever is already collecting."""
+    timings = Timings(parent=_current.get())
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        timings = _current.get()
+        if timings is not None:
+            timings.add_stage(name, elapsed)
+
+
+def submit_in_context(executor, func, *args):
+    """``executor.submit`` that runs ``func`` in a copy of the caller's context, so its timings count."""
+    return executor.submit(contextvars.copy_context().run, func, *args)
+
+
+def record_github_call(response, seconds, token_label):
+    GITHUB_CALLS.inc(status=response.status_code)
+    GITHUB_SECONDS.observe(seconds)
+    remaining = response.headers.get('X-RateLimit-Remaining')
+    reset = response.headers.get('X-RateLimit-Reset')
+    if remaining is not None and remaining.isdigit():
+        GITHUB_RATE_REMAINING.set(int(remaining), token=token_label)
+    if reset is not None and reset.isdigit():
+        GITHUB_RATE_RESET.set(int(reset), token=token_label)
+    timings = _current.get()
+    if timings is not None:
+        timings.add_github_call(seconds)
+
+
+def record_github_failure():
+    GITHUB_CALLS.inc(status='error')
+
+
+def record_world(timings):
+    """Observe the GitHub cost of one generated or refreshed world."""
+    WORLD_GITHUB_CALLS.observe(timings.github_calls)
+    WORLD_GITHUB_SECONDS.observe(timings.github_seconds)
+
+
+def record_cache_lookup(cache_name, tier, hit):
+    CACHE_LOOKUPS.inc(cache=cache_name, tier=tier, result='hit' if hit else 'miss')
+
+
+def count_queries(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` hook counting queries globally and for the current request."""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        DB_QUERIES.inc()
+        timings = _current.get()
+        if timings is not None:
+            timings.add_db_query(time.perf_counter() - started)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """``connection_created`` receiver: count every query on ``connection`` from now on."""
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
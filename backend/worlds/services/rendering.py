@@ -0,0 +1,147 @@
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from ..models import LanguageStats, RenderedWorld, World
+from ..serializers import ShareSerializer, WorldSerializer
+from .metrics import record_cache_lookup
+from .tiered_cache import RENDERED_WORLDS, rendered_worlds
+
+# Bump whenever WorldSerializer or ShareSerializer output changes so stale blobs are ignored.
+SERIALIZER_VERSION = 1
+
+SERIALIZERS = {
+    RenderedWorld.KIND_DETAIL: WorldSerializer,
+    RenderedWorld.KIND_SHARE: ShareSerializer,
+}
+
+
+def world_etag(world, kind):
+    """Strong validator for one rendering of ``world``; changes whenever its content does."""
+    source = f'{kind}:{SERIALIZER_VERSION}:{world.pk}:{world.source_hash}:{world.updated_at.isoformat()}'
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()[:32]
+
+
+def load_world_for_render(world_id):
+    return (
+        World.objects.prefetch_related(
+            Prefetch('languages', queryset=LanguageStats.objects.all()),
+        )
+        .select_related('render_config', 'share_token')
+        .filter(pk=world_id)
+        .first()
+    )
+
+
+def render_world(world, kind):
+    return JSONRenderer().render(SERIALIZERS[kind](world).data)
+
+
+def build_rendered_world(world):
+    """Render every kind of a prefetched ``world`` into unsaved gzip-compressed blobs keyed by kind."""
+    return {
+        kind: RenderedWorld(
+            world=world,
+            kind=kind,
+            version=SERIALIZER_VERSION,
+            etag=world_etag(world, kind),
+            body=gzip.compress(render_world(world, kind), mtime=0),
+        )
+        for kind in SERIALIZERS
+    }
+
+
+def save_rendered_world(world, rendered):
+    with transaction.atomic():
+        RenderedWorld.objects.filter(world=world).delete()
+        RenderedWorld.objects.bulk_create(rendered.values())
+    return rendered
+
+
+def store_rendered_world(world):
+    """Render and store every kind of ``world``, replacing older blobs."""
+    world = load_world_for_render(world.pk)
+    return save_rendered_world(world, build_rendered_world(world))
+
+
+def store_rendered_worlds(worlds):
+    """Render every kind of several newly persisted ``worlds`` with one load and one insert."""
+    loaded = (
+        World.objects.prefetch_related(
+            Prefetch('languages', queryset=LanguageStats.objects.all()),
+        )
+        .select_related('render_config', 'share_token')
+        .filter(pk__in=[world.pk for world in worlds])
+    )
+    rendered = [blob for world in loaded for blob in build_rendered_world(world).values()]
+    RenderedWorld.objects.bulk_create(rendered)
+    return rendered
+
+
+def get_rendered_world(world_id, kind):
+    return (
+        RenderedWorld.objects.filter(world_id=world_id, kind=kind, version=SERIALIZER_VERSION)
+        .only('etag', 'body')
+        .first()
+    )
+
+
+async def aget_rendered_world(world_id, kind):
+    return await (
+        RenderedWorld.objects.filter(world_id=world_id, kind=kind, version=SERIALIZER_VERSION)
+        .only('etag', 'body')
+        .afirst()
+    )
+
+
+def rendered_cache_key(world_id, kind):
+    return f'world:rendered:{world_id}:{kind}'
+
+
+def _rendered_timeout(world):
+    # The ETag check already rejects superseded renderings; the timeout only bounds memory.
+    seconds_left = int((world.expires_at - timezone.now()).total_seconds())
+    return max(settings.WORLD_LOCAL_CACHE_TTL_SECONDS, seconds_left)
+
+
+def _from_entry(world, kind, entry):
+    return RenderedWorld(
+        world_id=world.pk, kind=kind, version=SERIALIZER_VERSION, etag=entry['etag'], body=entry['body']
+    )
+
+
+def _stored_entry(rendered, etag):
+    current = rendered is not None and rendered.etag == etag
+    record_cache_lookup(RENDERED_WORLDS, 'database', current)
+    return {'etag': etag, 'body': bytes(rendered.body)} if current else None
+
+
+def get_current_rendering(world, kind, etag):
+    """The stored rendering of ``world`` matching ``etag``, or ``None`` if it must be rendered again.
+
+    Looked up in process memory, then the shared cache, then the database.
+    """
+    key = rendered_cache_key(world.pk, kind)
+    entry = rendered_worlds().get(key, valid=lambda entry: entry['etag'] == etag)
+    if entry is None:
+        entry = _stored_entry(get_rendered_world(world.pk, kind), etag)
+        if entry is None:
+            return None
+        rendered_worlds().set(key, entry, timeout=_rendered_timeout(world))
+    return _from_entry(world, kind, entry)
+
+
+async def aget_current_rendering(world, kind, etag):
+    key = rendered_cache_key(world.pk, kind)
+    entry = await rendered_worlds().aget(key, valid=lambda entry: entry['etag'] == etag)
+    if entry is None:
+        entry = _stored_entry(await aget_rendered_world(world.pk, kind), etag)
+        if entry is None:
+            return None
+        await rendered_worlds().aset(key, entry, timeout=_rendered_timeout(world))
+    return _from_entry(world, kind, entry)
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Window
+from django.db.models.functions import Lower, RowNumber
+from django.utils import timezone
+
+from ..models import LanguageStats, RenderConfig, RenderedWorld, RepoContent, RepoSnapshot, ShareToken, World
+from .tiered_cache import latest_worlds
+from .world_service import forget_worlds, latest_cache_key
+
+# Everything deleted along with a world, in reporting order.
+WORLD_TABLES = (World, RepoSnapshot, LanguageStats, RenderedWorld, RenderConfig, ShareToken)
+
+
+def prunable_worlds(keep, now=None):
+    """Expired worlds that retention may delete, oldest first.
+
+    Kept regardless of expiry: the ``keep`` newest ready worlds of each username (compared
+    case-insensitively), worlds whose public share link promises to outlive them (see
+    ``SHARE_TOKEN_TTL_DAYS``) and has not expired yet, and worlds that are generating or
+    refreshing right now. A link without an expiry lives only as long as its world.
+    """
+    now = now or timezone.now()
+    newest = (
+        World.objects.filter(generation_status=World.STATUS_READY)
+        .annotate(
+            rank=Window(RowNumber(), partition_by=[Lower('username')], order_by=F('generated_at').desc())
+        )
+        .filter(rank__lte=keep)
+        .values('id')
+    )
+    shared = ShareToken.objects.filter(expires_at__gt=now, is_public=True).values('world_id')
+    started_after = now - timedelta(seconds=settings.WORLD_PROCESSING_TIMEOUT_SECONDS)
+    return (
+        World.objects.filter(expires_at__lte=now)
+        .exclude(id__in=newest)
+        .exclude(id__in=shared)
+        .exclude(refresh_started_at__gt=started_after)
+        .exclude(generation_status=World.STATUS_PROCESSING, generated_at__gt=started_after)
+        .order_by('generated_at', 'id')
+    )
+
+
+def count_world_rows(world_ids):
+    """Rows in every world table that belong to ``world_ids``, keyed by model name."""
+    counts = {World.__name__: len(world_ids)}
+    for model in WORLD_TABLES[1:]:
+        counts[model.__name__] = model.objects.filter(world_id__in=world_ids).count()
+    return counts
+
+
+def delete_worlds(world_ids):
+    """Delete one batch of worlds and their rows in a short transaction; returns rows per model."""
+    with transaction.atomic():
+        usernames = set(World.objects.filter(id__in=world_ids).values_list('username', flat=True))
+        _, deleted = World.objects.filter(id__in=world_ids).delete()
+    latest_worlds().delete_many([latest_cache_key(username) for username in usernames])
+    forget_worlds(world_ids)
+    return {label.split('.')[-1]: count for label, count in deleted.items()}
+
+
+def orphaned_contents():
+    return RepoContent.objects.filter(snapshots__isnull=True)
+
+
+def delete_orphaned_contents(batch_size):
+    """Delete ``RepoContent`` rows no snapshot points at any more, in batches; returns the count.
+
+    Rows a generation has locked (see ``store_repo_contents``) are skipped: it is about to
+    point a snapshot at them.
+    """
+    total = 0
+    while True:
+        with transaction.atomic():
+            orphans = orphaned_contents().select_for_update(skip_locked=True, of=('self',))
+            content_ids = list(orphans.values_list('id', flat=True)[:batch_size])
+            if not content_ids:
+                return total
+            deleted, _ = orphaned_contents().filter(id__in=content_ids).delete()
+        total += deleted
+
+
+def average_row_bytes():
+    """Average on-disk bytes per row for each world table, including indexes and TOAST.
+
+    Only PostgreSQL exposes this cheaply; other backends return an empty mapping and the
+    reclaimed size is simply not reported.
+    """
+    if connection.vendor != 'postgresql':
+        return {}
+    sizes = {}
+    with connection.cursor() as cursor:
+        for model in (*WORLD_TABLES, RepoContent):
+            cursor.execute(
+                'SELECT pg_total_relation_size(c.oid), c.reltuples FROM pg_class c WHERE c.oid = %s::regclass',
+                [model._meta.db_table],
+            )
+            total_bytes, tuples = cursor.fetchone()
+            if tuples and tuples > 0:
+                sizes[model.__name__] = total_bytes / tuples
+    return sizes
+
+
+def estimate_bytes(row_counts, row_bytes):
+    if not row_bytes:
+        return None
+    return int(sum(count * row_bytes.get(name, 0) for name, count in row_counts.items()))
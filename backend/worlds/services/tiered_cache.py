@@ -0,0 +1,151 @@
+"""Two-tier caches for world reads: a small in-process LRU in front of the shared Django cache.
+
+Process memory answers hot keys without a network hop; the Django cache (Redis in
+production) shares entries between workers and survives their restarts. Writes and deletes
+go to both tiers, but another worker only notices them once its own copy is older than
+``WORLD_LOCAL_CACHE_TTL_SECONDS``. Callers that cannot accept that pass a ``valid``
+check (an expiry, an ETag) so a superseded entry is never served.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import record_cache_lookup
+
+LATEST_WORLDS = 'world_latest'
+WORLD_META = 'world_meta'
+RENDERED_WORLDS = 'rendered_world'
+
+
+class TieredCache:
+    """Bounded LRU with a per-entry TTL, written through to the Django cache.
+
+    Lookups are counted per tier under ``name``: ``local`` first, then ``shared`` for the
+    local misses.
+    """
+
+    def __init__(self, name, max_entries, local_ttl):
+        self.name = name
+        self.max_entries = max_entries
+        self.local_ttl = local_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _local_get(self, key, valid):
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] > now and (valid is None or valid(item[1])):
+                self._entries.move_to_end(key)
+                return item[1]
+            if item is not None:
+                del self._entries[key]
+        return None
+
+    def _remember(self, key, value, ttl):
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _shared_hit(self, key, value, valid):
+        hit = value is not None and (valid is None or valid(value))
+        record_cache_lookup(self.name, 'shared', hit)
+        if hit:
+            self._remember(key, value, self.local_ttl)
+        return value if hit else None
+
+    def get(self, key, valid=None):
+        """The value for ``key`` from the nearest tier, or ``None``; ``valid`` rejects superseded values."""
+        value = self._local_get(key, valid)
+        record_cache_lookup(self.name, 'local', value is not None)
+        if value is not None:
+            return value
+        return self._shared_hit(key, cache.get(key), valid)
+
+    async def aget(self, key, valid=None):
+        value = self._local_get(key, valid)
+        record_cache_lookup(self.name, 'local', value is not None)
+        if value is not None:
+            return value
+        return self._shared_hit(key, await cache.aget(key), valid)
+
+    def set(self, key, value, timeout):
+        self._remember(key, value, min(self.local_ttl, timeout))
+        cache.set(key, value, timeout=timeout)
+
+    async def aset(self, key, value, timeout):
+        self._remember(key, value, min(self.local_ttl, timeout))
+        await cache.aset(key, value, timeout=timeout)
+
+    def _local_delete(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def delete_many(self, keys):
+        keys = list(keys)
+        self._local_delete(keys)
+        cache.delete_many(keys)
+
+    async def adelete_many(self, keys):
+        keys = list(keys)
+        self._local_delete(keys)
+        await cache.adelete_many(keys)
+
+    def clear_local(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def _get_cache(name, max_entries):
+    tiered = _caches.get(name)
+    if tiered is None:
+        with _caches_lock:
+            tiered = _caches.get(name)
+            if tiered is None:
+                tiered = _caches[name] = TieredCache(name, max_entries, settings.WORLD_LOCAL_CACHE_TTL_SECONDS)
+    return tiered
+
+
+def latest_worlds():
+    """``world:latest:`` entries: which world answers a username."""
+    return _get_cache(LATEST_WORLDS, settings.WORLD_LOCAL_CACHE_SIZE)
+
+
+def world_meta():
+    """World metadata and short-lived share-link state, enough to answer detail and share reads."""
+    return _get_cache(WORLD_META, settings.WORLD_LOCAL_CACHE_SIZE)
+
+
+def rendered_worlds():
+    """Gzip-compressed renderings; these are large, so fewer are kept in process memory."""
+    return _get_cache(RENDERED_WORLDS, settings.WORLD_LOCAL_RENDERED_CACHE_SIZE)
+
+
+def tiered_cache_metrics():
+    with _caches_lock:
+        caches = list(_caches.values())
+    return [
+        (
+            'world_local_cache_entries',
+            'Entries held in process memory per tiered cache.',
+            'gauge',
+            [({'cache': tiered.name}, len(tiered)) for tiered in caches],
+        )
+    ]
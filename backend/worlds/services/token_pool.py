@@ -0,0 +1,210 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+DEFAULT_TOKEN_LIMIT = 5000
+
+PARK_RATE_LIMIT = 'rate_limit'
+PARK_SECONDARY = 'secondary'
+PARK_INVALID = 'invalid'
+
+# GitHub budgets REST (``core``) and GraphQL calls separately, per token.
+RESOURCE_CORE = 'core'
+RESOURCE_GRAPHQL = 'graphql'
+RESOURCES = (RESOURCE_CORE, RESOURCE_GRAPHQL)
+
+
+class TokenPool:
+    """Spreads GitHub calls over several tokens by their remaining rate-limit budget.
+
+    Each token's ``X-RateLimit-Remaining``/``X-RateLimit-Reset`` and any parking (exhausted,
+    secondary limit, rejected) is kept in the Django cache per rate-limit resource (``core``
+    or ``graphql``), so every worker picks from the same view. State expires at the reset
+    time, after which it counts as fresh. A rejected token is parked for every resource.
+    Only a hash of each token is ever used as a cache key. The ``a``-prefixed methods are
+    the same operations through the async cache API, for the async client.
+    """
+
+    def __init__(self, tokens, invalid_park_seconds):
+        self.tokens = list(dict.fromkeys(token for token in tokens if token))
+        self.invalid_park_seconds = invalid_park_seconds
+        self._keys = {
+            token: 'github:token:' + hashlib.sha256(token.encode('utf-8')).hexdigest()[:16] for token in self.tokens
+        }
+
+    def __bool__(self):
+        return bool(self.tokens)
+
+    def label(self, token):
+        """A short, non-secret name for ``token`` in metrics; ``anonymous`` for unauthenticated calls."""
+        if token is None:
+            return 'anonymous'
+        return self._keys[token].rsplit(':', 1)[-1][:8]
+
+    def _key(self, token, resource):
+        return f'{self._keys[token]}:{resource}'
+
+    def _by_token(self, states, resource):
+        return {token: states.get(self._key(token, resource)) for token in self.tokens}
+
+    def _states(self, resource=RESOURCE_CORE):
+        return self._by_token(cache.get_many([self._key(token, resource) for token in self.tokens]), resource)
+
+    async def _astates(self, resource=RESOURCE_CORE):
+        return self._by_token(await cache.aget_many([self._key(token, resource) for token in self.tokens]), resource)
+
+    def acquire(self, resource=RESOURCE_CORE):
+        """The usable token with the most ``resource`` headroom, or ``None`` when every token is parked."""
+        return self._best(self._states(resource))
+
+    async def aacquire(self, resource=RESOURCE_CORE):
+        return self._best(await self._astates(resource))
+
+    def _best(self, states):
+        now = time.time()
+        best, best_remaining = None, -1
+        for token, state in states.items():
+            if state is None:
+                remaining = DEFAULT_TOKEN_LIMIT
+            elif state.get('parked_until', 0) > now:
+                continue
+            else:
+                remaining = state['remaining']
+            if remaining > best_remaining:
+                best, best_remaining = token, remaining
+        return best
+
+    def headroom(self, resource=RESOURCE_CORE):
+        """Calls left across every usable token, counting tokens with no recorded state as fresh."""
+        now = time.time()
+        total = 0
+        for state in self._states(resource).values():
+            if state is None:
+                total += DEFAULT_TOKEN_LIMIT
+            elif state.get('parked_until', 0) <= now:
+                total += state['remaining']
+        return total
+
+    def blocked_until(self, resource=RESOURCE_CORE):
+        """When the first rate-limited token frees up, if every token is parked by a rate limit.
+
+        ``None`` when some token is usable, or when the only parked tokens were rejected, in
+        which case callers fall back to anonymous requests as before.
+        """
+        if not self.tokens:
+            return None
+        return self._first_reset(self._states(resource))
+
+    async def ablocked_until(self, resource=RESOURCE_CORE):
+        if not self.tokens:
+            return None
+        return self._first_reset(await self._astates(resource))
+
+    def _first_reset(self, states):
+        now = time.time()
+        resets = []
+        for state in states.values():
+            if state is None or state.get('parked_until', 0) <= now:
+                return None
+            if state['reason'] != PARK_INVALID:
+                resets.append(state['parked_until'])
+        return min(resets) if resets else None
+
+    def update(self, token, response, resource=RESOURCE_CORE):
+        """Record the budget GitHub reported for ``token``; park it once it is exhausted.
+
+        The budget is filed under the response's ``X-RateLimit-Resource``, or ``resource``
+        when it names none.
+        """
+        state = self._budget_state(token, response)
+        if state is not None:
+            self._set(self._key(token, response.headers.get('X-RateLimit-Resource') or resource), *state)
+
+    async def aupdate(self, token, response, resource=RESOURCE_CORE):
+        state = self._budget_state(token, response)
+        if state is not None:
+            await self._aset(self._key(token, response.headers.get('X-RateLimit-Resource') or resource), *state)
+
+    def park(self, token, until, reason, resource=RESOURCE_CORE):
+        state = self._park_state(until, reason)
+        for key in self._park_keys(token, reason, resource):
+            self._set(key, *state)
+
+    async def apark(self, token, until, reason, resource=RESOURCE_CORE):
+        state = self._park_state(until, reason)
+        for key in self._park_keys(token, reason, resource):
+            await self._aset(key, *state)
+
+    def _park_keys(self, token, reason, resource):
+        resources = RESOURCES if reason == PARK_INVALID else (resource,)
+        return [self._key(token, each) for each in resources]
+
+    def _budget_state(self, token, response):
+        """``(state, until)`` to store for ``token`` after ``response``, or ``None`` if it reported no budget."""
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if token is None or remaining is None or reset is None:
+            return None
+        remaining, reset = int(remaining), int(reset)
+        if remaining <= 0:
+            return self._park_state(reset, PARK_RATE_LIMIT)
+        return {'remaining': remaining, 'reset': reset}, reset
+
+    def _park_state(self, until, reason):
+        if reason == PARK_INVALID:
+            until = time.time() + self.invalid_park_seconds
+        return {'remaining': 0, 'reset': until, 'parked_until': until, 'reason': reason}, until
+
+    def _set(self, key, state, until):
+        cache.set(key, state, timeout=max(1, int(until - time.time()) + 1))
+
+    async def _aset(self, key, state, until):
+        await cache.aset(key, state, timeout=max(1, int(until - time.time()) + 1))
+
+
+_token_pool = None
+_token_pool_lock = threading.Lock()
+
+
+def get_token_pool():
+    global _token_pool
+    if _token_pool is None:
+        with _token_pool_lock:
+            if _token_pool is None:
+                _token_pool = TokenPool(
+                    [settings.GITHUB_TOKEN, *settings.GITHUB_TOKENS],
+                    invalid_park_seconds=settings.GITHUB_TOKEN_INVALID_PARK_SECONDS,
+                )
+    return _token_pool
+
+
+def reset_token_pool():
+    """Drop the pool so the next ``get_token_pool()`` reads the token settings again."""
+    global _token_pool
+    with _token_pool_lock:
+        _token_pool = None
+
+
+def token_pool_metrics():
+    """Scrape-time gauges for the shared pool state per rate-limit resource, identical from every worker."""
+    pool = get_token_pool()
+    if not pool:
+        return []
+    now = time.time()
+    parked = []
+    for resource in RESOURCES:
+        for token, state in pool._states(resource).items():
+            is_parked = bool(state) and state.get('parked_until', 0) > now
+            parked.append(({'token': pool.label(token), 'resource': resource}, int(is_parked)))
+    return [
+        (
+            'world_github_token_pool_headroom',
+            'GitHub calls left across usable tokens.',
+            'gauge',
+            [({'resource': resource}, pool.headroom(resource)) for resource in RESOURCES],
+        ),
+        ('world_github_token_parked', 'Whether a token is parked (rate limited or rejected).', 'gauge', parked),
+    ]
@@ -0,0 +1,861 @@
+import asyncio
+import logging
+import secrets
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import LanguageStats, RenderConfig, RepoContent, RepoSnapshot, ShareToken, World
+from .bulk_insert import insert_rows, insert_tables
+from .github_async import afetch_repo_details
+from .github_service import (
+    GitHubError,
+    GitHubRateLimitError,
+    build_world_payload,
+    commits_since,
+    fetch_repo_details,
+    get_github_client,
+)
+from .jobs import enqueue
+from .metrics import collect, record_world, stage
+from .rendering import SERIALIZERS, rendered_cache_key, store_rendered_world, store_rendered_worlds
+from .tiered_cache import latest_worlds, rendered_worlds, world_meta
+
+logger = logging.getLogger(__name__)
+
+ESTIMATED_GENERATION_SECONDS = 8
+RATE_LIMIT_CACHE_KEY = 'github:rate_limited_until'
+GENERATION_LOCK_TIMEOUT_SECONDS = 30
+# What detail and share reads need from a world: enough to build validators and cache headers.
+WORLD_META_FIELDS = (
+    'id', 'source_hash', 'generated_at', 'updated_at', 'expires_at', 'generation_status', 'refresh_started_at'
+)
+STALLED_MESSAGE = 'World generation timed out. Try again.'
+
+# Striped in-process locks keep memory bounded no matter how many usernames we see.
+_generation_locks = [threading.Lock() for _ in range(64)]
+
+
+def latest_cache_key(username):
+    return f'world:latest:{username.lower()}'
+
+
+def remember_latest_world(world):
+    """Point ``world:latest:`` at a ready ``world`` until it expires, so lookups can skip the DB."""
+    timeout = int((world.expires_at - timezone.now()).total_seconds())
+    if world.generation_status != World.STATUS_READY or timeout <= 0:
+        return
+    latest_worlds().set(latest_cache_key(world.username), _latest_entry(world), timeout=timeout)
+
+
+async def aremember_latest_world(world):
+    timeout = int((world.expires_at - timezone.now()).total_seconds())
+    if world.generation_status != World.STATUS_READY or timeout <= 0:
+        return
+    await latest_worlds().aset(latest_cache_key(world.username), _latest_entry(world), timeout=timeout)
+
+
+def _latest_entry(world):
+    return {
+        'id': str(world.id),
+        'username': world.username,
+        'status': world.generation_status,
+        'expires_at': world.expires_at.timestamp(),
+    }
+
+
+def _world_from_latest_entry(entry):
+    """A partial ``World`` (id, username, status, expiry) rebuilt from a ``world:latest:`` entry."""
+    return World(
+        id=entry['id'],
+        username=entry['username'],
+        generation_status=entry['status'],
+        expires_at=datetime.fromtimestamp(entry['expires_at'], tz=dt_timezone.utc),
+    )
+
+
+def worlds_for(username):
+    """Worlds of ``username`` in any letter case, matched through the ``Lower('username')`` index."""
+    return World.objects.alias(username_lower=Lower('username')).filter(username_lower=username.lower())
+
+
+def rate_limited_until():
+    """Return the known GitHub rate-limit reset time, or ``None`` if we are not throttled."""
+    return _reset_time(cache.get(RATE_LIMIT_CACHE_KEY))
+
+
+async def arate_limited_until():
+    return _reset_time(await cache.aget(RATE_LIMIT_CACHE_KEY))
+
+
+def _reset_time(value):
+    if not value:
+        return None
+    reset_at = datetime.fromtimestamp(value, tz=dt_timezone.utc)
+    return reset_at if reset_at > timezone.now() else None
+
+
+def remember_rate_limit(reset_at):
+    timeout = max(1, int((reset_at - timezone.now()).total_seconds()))
+    cache.set(RATE_LIMIT_CACHE_KEY, reset_at.timestamp(), timeout=timeout)
+
+
+async def aremember_rate_limit(reset_at):
+    timeout = max(1, int((reset_at - timezone.now()).total_seconds()))
+    await cache.aset(RATE_LIMIT_CACHE_KEY, reset_at.timestamp(), timeout=timeout)
+
+
+def _unexpired(entry):
+    return isinstance(entry, dict) and entry['expires_at'] > timezone.now().timestamp()
+
+
+def find_active_world(username):
+    """The unexpired ready world for ``username``: one cache read when it is known, else one indexed query.
+
+    A cache hit returns a partial ``World`` carrying only id, username, status and expiry.
+    """
+    entry = latest_worlds().get(latest_cache_key(username), valid=_unexpired)
+    if entry is not None:
+        return _world_from_latest_entry(entry)
+    world = worlds_for(username).filter(
+        generation_status=World.STATUS_READY,
+        expires_at__gt=timezone.now(),
+    ).first()
+    if world is not None:
+        remember_latest_world(world)
+    return world
+
+
+def meta_cache_key(world_id):
+    return f'world:meta:{world_id}'
+
+
+def _timestamp(value):
+    return value.timestamp() if value is not None else None
+
+
+def _from_timestamp(value):
+    return datetime.fromtimestamp(value, tz=dt_timezone.utc) if value is not None else None
+
+
+def _meta_entry(world):
+    return {
+        'id': str(world.pk),
+        'source_hash': world.source_hash,
+        'updated_at': world.updated_at.timestamp(),
+        'expires_at': world.expires_at.timestamp(),
+        'generation_status': world.generation_status,
+        'refresh_started_at': _timestamp(world.refresh_started_at),
+    }
+
+
+def _world_from_meta_entry(entry):
+    return World(
+        id=entry['id'],
+        source_hash=entry['source_hash'],
+        updated_at=_from_timestamp(entry['updated_at']),
+        expires_at=_from_timestamp(entry['expires_at']),
+        generation_status=entry['generation_status'],
+        refresh_started_at=_from_timestamp(entry['refresh_started_at']),
+    )
+
+
+def _world_meta_query(world_id):
+    return World.objects.only(*WORLD_META_FIELDS).filter(pk=world_id)
+
+
+def _meta_timeout(world):
+    """How long ``world``'s metadata may be cached: until it expires, and only while it is settled."""
+    if display_status(world) != World.STATUS_READY:
+        return 0
+    return int((world.expires_at - timezone.now()).total_seconds())
+
+
+def load_world_meta(world_id):
+    """The world with only the fields detail and share reads need, or ``None``.
+
+    Ready worlds come from the tiered cache until they expire; worlds in flight are always read
+    from the database.
+    """
+    entry = world_meta().get(meta_cache_key(world_id))
+    if entry is not None:
+        return _world_from_meta_entry(entry)
+    world = _world_meta_query(world_id).first()
+    if world is not None and _meta_timeout(world) > 0:
+        world_meta().set(meta_cache_key(world_id), _meta_entry(world), timeout=_meta_timeout(world))
+    return world
+
+
+async def aload_world_meta(world_id):
+    entry = await world_meta().aget(meta_cache_key(world_id))
+    if entry is not None:
+        return _world_from_meta_entry(entry)
+    world = await _world_meta_query(world_id).afirst()
+    if world is not None and _meta_timeout(world) > 0:
+        await world_meta().aset(meta_cache_key(world_id), _meta_entry(world), timeout=_meta_timeout(world))
+    return world
+
+
+def share_cache_key(world_id):
+    return f'world:share:{world_id}'
+
+
+def _share_entry(token):
+    if token is None:
+        return {'share': None}
+    return {'share': {'is_public': token.is_public, 'expires_at': _timestamp(token.expires_at)}}
+
+
+def _token_from_share_entry(world_id, entry):
+    share = entry['share']
+    if share is None:
+        return None
+    return ShareToken(world_id=world_id, is_public=share['is_public'], expires_at=_from_timestamp(share['expires_at']))
+
+
+def _share_token_query(world_id):
+    return ShareToken.objects.only('world_id', 'is_public', 'expires_at').filter(world_id=world_id)
+
+
+def load_share_token(world_id):
+    """The share state of a world (``None`` when it has no token), cached for ``WORLD_SHARE_CACHE_SECONDS``.
+
+    Saving or deleting a ``ShareToken`` drops the cached copy; a queryset ``update()`` sends no
+    signal, so that is what the short lifetime is for.
+    """
+    entry = world_meta().get(share_cache_key(world_id))
+    if entry is not None:
+        return _token_from_share_entry(world_id, entry)
+    token = _share_token_query(world_id).first()
+    if settings.WORLD_SHARE_CACHE_SECONDS > 0:
+        world_meta().set(share_cache_key(world_id), _share_entry(token), timeout=settings.WORLD_SHARE_CACHE_SECONDS)
+    return token
+
+
+async def aload_share_token(world_id):
+    entry = await world_meta().aget(share_cache_key(world_id))
+    if entry is not None:
+        return _token_from_share_entry(world_id, entry)
+    token = await _share_token_query(world_id).afirst()
+    if settings.WORLD_SHARE_CACHE_SECONDS > 0:
+        await world_meta().aset(
+            share_cache_key(world_id), _share_entry(token), timeout=settings.WORLD_SHARE_CACHE_SECONDS
+        )
+    return token
+
+
+def _meta_keys(world_ids):
+    return [key for world_id in world_ids for key in (meta_cache_key(world_id), share_cache_key(world_id))]
+
+
+def forget_worlds(world_ids):
+    """Drop the cached metadata, share state and renderings of worlds that changed or were deleted.
+
+    Other workers keep their in-process copies for up to ``WORLD_LOCAL_CACHE_TTL_SECONDS``.
+    """
+    world_meta().delete_many(_meta_keys(world_ids))
+    rendered_worlds().delete_many(
+        [rendered_cache_key(world_id, kind) for world_id in world_ids for kind in SERIALIZERS]
+    )
+
+
+async def aforget_worlds(world_ids):
+    await world_meta().adelete_many(_meta_keys(world_ids))
+    await rendered_worlds().adelete_many(
+        [rendered_cache_key(world_id, kind) for world_id in world_ids for kind in SERIALIZERS]
+    )
+
+
+def forget_share_token(sender, instance, **kwargs):
+    """``post_save``/``post_delete`` receiver for ``ShareToken``: drop the cached share state once committed."""
+    transaction.on_commit(lambda: forget_worlds([instance.world_id]))
+
+
+def find_latest_ready_world(username):
+    return worlds_for(username).filter(generation_status=World.STATUS_READY).first()
+
+
+def find_inflight_world(username):
+    started_after = timezone.now() - timedelta(seconds=settings.WORLD_PROCESSING_TIMEOUT_SECONDS)
+    return worlds_for(username).filter(
+        Q(generation_status=World.STATUS_PROCESSING, generated_at__gt=started_after)
+        | Q(refresh_started_at__gt=started_after),
+    ).first()
+
+
+def is_refreshing(world):
+    if world.refresh_started_at is None:
+        return False
+    started_after = timezone.now() - timedelta(seconds=settings.WORLD_PROCESSING_TIMEOUT_SECONDS)
+    return world.refresh_started_at > started_after
+
+
+def is_stalled(world):
+    """Whether ``world`` has been processing past ``WORLD_PROCESSING_TIMEOUT_SECONDS``, so its job was lost."""
+    if world.generation_status != World.STATUS_PROCESSING:
+        return False
+    started_after = timezone.now() - timedelta(seconds=settings.WORLD_PROCESSING_TIMEOUT_SECONDS)
+    return world.generated_at <= started_after
+
+
+def display_status(world):
+    """The status clients see: a ready world that is being refreshed reports ``processing``.
+
+    A processing world whose job was lost (see ``is_stalled``) reports ``failed``; a new
+    generate request no longer attaches to it.
+    """
+    if is_refreshing(world):
+        return World.STATUS_PROCESSING
+    if is_stalled(world):
+        return World.STATUS_FAILED
+    return world.generation_status
+
+
+def failure_message(world):
+    return world.error_message or (STALLED_MESSAGE if is_stalled(world) else '')
+
+
+def eta_seconds(world):
+    if display_status(world) != World.STATUS_PROCESSING:
+        return 0
+    started_at = world.refresh_started_at if is_refreshing(world) else world.generated_at
+    elapsed = (timezone.now() - started_at).total_seconds()
+    return max(1, int(ESTIMATED_GENERATION_SECONDS - elapsed))
+
+
+def within_stale_grace(world):
+    """Whether an expired ``world`` may still be served while a fresh copy is built."""
+    return world.expires_at + timedelta(hours=settings.WORLD_STALE_GRACE_HOURS) > timezone.now()
+
+
+def create_processing_world(username):
+    return World.objects.create(
+        username=username,
+        generation_status=World.STATUS_PROCESSING,
+        expires_at=timezone.now() + timedelta(hours=settings.WORLD_TTL_HOURS),
+    )
+
+
+@contextmanager
+def _cache_lock(key):
+    token = secrets.token_hex(8)
+    deadline = time.monotonic() + GENERATION_LOCK_TIMEOUT_SECONDS
+    acquired = cache.add(key, token, timeout=GENERATION_LOCK_TIMEOUT_SECONDS)
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(0.05)
+        acquired = cache.add(key, token, timeout=GENERATION_LOCK_TIMEOUT_SECONDS)
+    try:
+        yield
+    finally:
+        if acquired and cache.get(key) == token:
+            cache.delete(key)
+
+
+@contextmanager
+def generation_lock(username):
+    """Serialize generation claims for one username within and across processes.
+
+    Threads in this process share a striped lock; other processes are excluded through a
+    transaction-scoped advisory lock on PostgreSQL, or a cache lock on other databases.
+    Elsewhere the claim runs in autocommit: the cache lock already excludes other claimers,
+    and on SQLite a deferred transaction that reads before it writes cannot wait for another
+    writer, so concurrent claims for different usernames would fail with "database is locked".
+    """
+    key = f'world:generate:{username.lower()}'
+    with _generation_locks[zlib.crc32(key.encode('utf-8')) % len(_generation_locks)]:
+        if connection.vendor == 'postgresql':
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [key])
+                yield
+        else:
+            with _cache_lock(key):
+                yield
+
+
+def claim_world_generation(username):
+    """Return ``(world, created)`` for ``username``.
+
+    Concurrent callers coalesce: only the first one gets ``created=True`` and must run or
+    schedule the work; the rest attach to that world, or to the ready world it produced.
+    With incremental refresh enabled, an expired ready world is claimed for an in-place
+    refresh instead of starting a brand-new processing world.
+    """
+    with generation_lock(username):
+        world = find_active_world(username) or find_inflight_world(username)
+        if world is not None:
+            return world, False
+        if settings.WORLD_INCREMENTAL_REFRESH:
+            world = find_latest_ready_world(username)
+            if world is not None:
+                world.refresh_started_at = timezone.now()
+                World.objects.filter(pk=world.pk).update(refresh_started_at=world.refresh_started_at)
+                forget_worlds([world.pk])
+                return world, True
+        return create_processing_world(username), True
+
+
+def wait_for_world(world, timeout=None):
+    """Block until another caller's generation of ``world`` finishes, then return it refreshed."""
+    timeout = settings.WORLD_PROCESSING_TIMEOUT_SECONDS if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    while display_status(world) == World.STATUS_PROCESSING and time.monotonic() < deadline:
+        time.sleep(0.25)
+        world.refresh_from_db(fields=['generation_status', 'error_message', 'refresh_started_at'])
+    return world
+
+
+async def await_world(world, timeout=None):
+    """``wait_for_world`` without tying up a thread while another caller generates ``world``."""
+    timeout = settings.WORLD_PROCESSING_TIMEOUT_SECONDS if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    while display_status(world) == World.STATUS_PROCESSING and time.monotonic() < deadline:
+        await asyncio.sleep(0.25)
+        await world.arefresh_from_db(fields=['generation_status', 'error_message', 'refresh_started_at'])
+    return world
+
+
+def schedule_world_generation(world):
+    enqueue(run_generation_job, world.pk)
+
+
+def revalidate_world(username):
+    """Queue one background refresh for ``username`` unless a generation is already in flight."""
+    world, created = claim_world_generation(username)
+    if created:
+        schedule_world_generation(world)
+    return world
+
+
+def run_generation_job(world_id):
+    """Worker entry point: build or refresh a claimed world and record the outcome on the row."""
+    world = World.objects.filter(pk=world_id).first()
+    if world is None or display_status(world) != World.STATUS_PROCESSING:
+        return
+    try:
+        generate_world(world, get_github_client())
+    except GitHubRateLimitError as exc:
+        remember_rate_limit(exc.reset_at)
+        mark_failed(world, 'GitHub API rate limit reached. Try again later.')
+    except GitHubError as exc:
+        mark_failed(world, str(exc))
+    except Exception:
+        logger.exception('World generation failed for %s', world.username)
+        mark_failed(world, 'World generation failed.')
+
+
+def mark_failed(world, message):
+    """Record a failed run. A refresh keeps its previous (stale) data and stays ready."""
+    if world.generation_status == World.STATUS_READY:
+        World.objects.filter(pk=world.pk).update(error_message=message, refresh_started_at=None)
+    else:
+        World.objects.filter(pk=world.pk).update(
+            generation_status=World.STATUS_FAILED,
+            error_message=message,
+            updated_at=timezone.now(),
+        )
+    forget_worlds([world.pk])
+
+
+def generate_world(world, client):
+    """Fetch the profile from GitHub, build the payload and persist it onto ``world``.
+
+    A ready ``world`` is refreshed in place: only repos whose ``pushed_at`` moved are
+    deep-fetched again, and only rows whose values differ are written.
+    """
+    with collect() as timings:
+        with stage('github_profile'):
+            user_payload = client.fetch_user(world.username)
+            repos_payload = client.fetch_repos(world.username)
+        with stage('payload'):
+            payload = build_world_payload(user_payload, repos_payload)
+        # Network I/O happens before the transaction so no DB connection is held while waiting on GitHub.
+        if world.generation_status == World.STATUS_READY:
+            previous = {row.repo_id: row for row in world.repos.select_related('content')}
+            with stage('deep_fetch'):
+                repo_details = fetch_changed_repo_details(client, payload['repos'], previous)
+            with stage('persist'):
+                refresh_world(world, user_payload, payload, repo_details, previous)
+        else:
+            with stage('deep_fetch'):
+                repo_details = fetch_repo_details(client, payload['repos'])
+            with stage('persist'):
+                persist_world(world, user_payload, payload, repo_details)
+    record_world(timings)
+    forget_worlds([world.pk])
+    remember_latest_world(world)
+    return world
+
+
+async def agenerate_world(world, client):
+    """``generate_world`` for the async views: GitHub calls are awaited concurrently on ``client``
+    (an ``AsyncGitHubClient``) and only the database writes run in a worker thread.
+    """
+    with collect() as timings:
+        with stage('github_profile'):
+            user_payload, repos_payload = await asyncio.gather(
+                client.fetch_user(world.username),
+                client.fetch_repos(world.username),
+            )
+        with stage('payload'):
+            payload = build_world_payload(user_payload, repos_payload)
+        if world.generation_status == World.STATUS_READY:
+            previous = {row.repo_id: row async for row in world.repos.select_related('content')}
+            repo_details, changed = split_changed_repos(payload['repos'], previous)
+            with stage('deep_fetch'):
+                repo_details.update(await afetch_repo_details(client, changed, limit=len(changed)))
+            with stage('persist'):
+                await sync_to_async(refresh_world)(world, user_payload, payload, repo_details, previous)
+        else:
+            with stage('deep_fetch'):
+                repo_details = await afetch_repo_details(client, payload['repos'])
+            with stage('persist'):
+                await sync_to_async(persist_world)(world, user_payload, payload, repo_details)
+    record_world(timings)
+    await aforget_worlds([world.pk])
+    await aremember_latest_world(world)
+    return world
+
+
+def fetch_changed_repo_details(client, repos, previous):
+    """Deep-fetch the top repos whose stored details may be out of date; reuse the rest.
+
+    See ``split_changed_repos`` for when stored details are still valid.
+    """
+    details, changed = split_changed_repos(repos, previous)
+    details.update(fetch_repo_details(client, changed, limit=len(changed)))
+    return details
+
+
+def _reusable_details(repo, prev):
+    """Stored deep-fetched details that still hold for ``repo``, or ``None`` if it needs a deep fetch.
+
+    Nothing changes without a push, except ``commits_30d``: it counts a sliding window, so
+    a stored non-zero count may have dropped since. It is kept only once the last push has
+    left the window, and then it is zero.
+    """
+    pushed_at = _parse_pushed_at(repo)
+    if prev is None or prev.last_activity_at != pushed_at or not (prev.commits_30d or prev.language_breakdown):
+        return None
+    if prev.commits_30d and (pushed_at is None or pushed_at >= commits_since()):
+        return None
+    return {'commits_30d': 0, 'language_breakdown': prev.language_breakdown}
+
+
+def split_changed_repos(repos, previous):
+    """Stored details for the top repos that need no deep fetch, and the list of those that do."""
+    details = {}
+    changed = []
+    for repo in repos[: settings.GITHUB_DEEP_FETCH_REPOS]:
+        stored = _reusable_details(repo, previous.get(repo['repo_id']))
+        if stored is None:
+            changed.append(repo)
+        else:
+            details[repo['full_name']] = stored
+    return details, changed
+
+
+def _parse_pushed_at(repo):
+    return parse_datetime(repo['last_activity_at']) if repo.get('last_activity_at') else None
+
+
+SNAPSHOT_FIELDS = [
+    'repo_id',
+    'name',
+    'full_name',
+    'html_url',
+    'content_id',
+    'primary_language',
+    'stars',
+    'forks',
+    'open_issues',
+    'watchers',
+    'size_kb',
+    'commits_30d',
+    'activity_score',
+    'last_activity_at',
+    'is_fork',
+    'pos_x',
+    'pos_y',
+    'pos_z',
+]
+
+
+CONTENT_FIELDS = ['content_hash', 'repo_id', 'description', 'language_breakdown']
+
+
+def store_repo_contents(repos, repo_details):
+    """Ensure a ``RepoContent`` row exists for every repo; returns ``{repo_id: content_id}``.
+
+    Content already stored by any world is reused, so only new descriptions and language
+    breakdowns are inserted. Call it inside the transaction that writes the snapshots: the
+    rows are locked until it commits, so orphan pruning cannot delete content this world is
+    about to point at. A row pruned before the lock was taken is simply inserted again.
+    """
+    hashes = {}
+    contents = {}
+    for repo in repos:
+        breakdown = repo_details.get(repo['full_name'], {}).get('language_breakdown', {})
+        content_hash = RepoContent.make_hash(repo['repo_id'], repo['description'], breakdown)
+        hashes[repo['repo_id']] = content_hash
+        contents[content_hash] = (content_hash, repo['repo_id'], repo['description'], breakdown)
+    content_ids = {}
+    missing = list(contents)
+    while missing:
+        locked = RepoContent.objects.select_for_update().filter(content_hash__in=missing)
+        content_ids.update(locked.values_list('content_hash', 'id'))
+        missing = [content_hash for content_hash in missing if content_hash not in content_ids]
+        if missing:
+            rows = [contents[content_hash] for content_hash in missing]
+            insert_rows(RepoContent, CONTENT_FIELDS, rows, ignore_conflicts=True)
+    return {repo_id: content_ids[content_hash] for repo_id, content_hash in hashes.items()}
+
+
+def _snapshot_values(repo, details, content_ids):
+    return {
+        'repo_id': repo['repo_id'],
+        'name': repo['name'],
+        'full_name': repo['full_name'],
+        'html_url': repo['html_url'],
+        'content_id': content_ids[repo['repo_id']],
+        'primary_language': repo['primary_language'],
+        'stars': repo['stars'],
+        'forks': repo['forks'],
+        'open_issues': repo['open_issues'],
+        'watchers': repo['watchers'],
+        'size_kb': repo['size_kb'],
+        'commits_30d': details.get('commits_30d', 0),
+        'activity_score': repo['activity_score'],
+        'last_activity_at': _parse_pushed_at(repo),
+        'is_fork': repo['is_fork'],
+        'pos_x': repo['pos_x'],
+        'pos_y': repo['pos_y'],
+        'pos_z': repo['pos_z'],
+    }
+
+
+# Fields ``_apply_user_payload`` sets, plus ``updated_at``.
+PAYLOAD_WORLD_FIELDS = [
+    'github_url',
+    'avatar_url',
+    'followers',
+    'following',
+    'public_repos',
+    'totals',
+    'generation_status',
+    'source_hash',
+    'error_message',
+    'refresh_started_at',
+    'expires_at',
+    'updated_at',
+]
+
+
+# World fields a payload sets that show up in its renderings.
+WORLD_CONTENT_FIELDS = ('github_url', 'avatar_url', 'followers', 'following', 'public_repos', 'totals', 'source_hash')
+
+
+def _apply_user_payload(world, user_payload, payload):
+    world.github_url = user_payload.get('html_url', '')
+    world.avatar_url = user_payload.get('avatar_url', '')
+    world.followers = user_payload.get('followers', 0)
+    world.following = user_payload.get('following', 0)
+    world.public_repos = user_payload.get('public_repos', 0)
+    world.totals = payload['totals']
+    world.generation_status = World.STATUS_READY
+    world.source_hash = payload['source_hash']
+    world.error_message = ''
+    world.refresh_started_at = None
+    world.expires_at = timezone.now() + timedelta(hours=settings.WORLD_TTL_HOURS)
+
+
+def share_token_expiry():
+    """Share links outlive their world by ``SHARE_TOKEN_TTL_DAYS`` (``0``: they last as long as it does)."""
+    if not settings.SHARE_TOKEN_TTL_DAYS:
+        return None
+    return timezone.now() + timedelta(days=settings.SHARE_TOKEN_TTL_DAYS)
+
+
+SNAPSHOT_INSERT_FIELDS = ['world_id', *SNAPSHOT_FIELDS]
+LANGUAGE_FIELDS = ['world_id', 'language', 'percent', 'color_token']
+RENDER_CONFIG_FIELDS = ['world_id', 'seed', 'layout_version', 'density_level', 'lighting_profile', 'enable_particles']
+SHARE_TOKEN_FIELDS = ['world_id', 'token', 'is_public', 'poster_url', 'created_at', 'expires_at']
+
+
+def _snapshot_row(world, values):
+    return (world.pk, *(values[field] for field in SNAPSHOT_FIELDS))
+
+
+def snapshot_rows(world, repos, repo_details, content_ids):
+    """``RepoSnapshot`` rows of ``repos`` for ``world``, in ``SNAPSHOT_INSERT_FIELDS`` order."""
+    return [
+        _snapshot_row(world, _snapshot_values(repo, repo_details.get(repo['full_name'], {}), content_ids))
+        for repo in repos
+    ]
+
+
+def _world_rows(world, user_payload, payload, repo_details, content_ids):
+    """Insert-ready rows of a new ``world``: ``(snapshots, languages, render_config, share_token)``."""
+    snapshots = snapshot_rows(world, payload['repos'], repo_details, content_ids)
+    languages = [(world.pk, item['language'], item['percent'], item['color_token']) for item in payload['languages']]
+    render_config = (world.pk, (user_payload.get('id', 1) % 100000) + 7, 'v1', 1.0, 'neo_city', True)
+    share_token = (world.pk, ShareToken.make_token(), True, '', timezone.now(), share_token_expiry())
+    return snapshots, languages, render_config, share_token
+
+
+def _insert_world_rows(snapshots, languages, render_configs, share_tokens):
+    """Write the child rows of new worlds: snapshots in bulk (``COPY`` on PostgreSQL), the rest together."""
+    insert_rows(RepoSnapshot, SNAPSHOT_INSERT_FIELDS, snapshots)
+    insert_tables(
+        [
+            (LanguageStats, LANGUAGE_FIELDS, languages),
+            (RenderConfig, RENDER_CONFIG_FIELDS, render_configs),
+            (ShareToken, SHARE_TOKEN_FIELDS, share_tokens),
+        ]
+    )
+
+
+def persist_world(world, user_payload, payload, repo_details):
+    _apply_user_payload(world, user_payload, payload)
+
+    with transaction.atomic():
+        world.save()
+
+        content_ids = store_repo_contents(payload['repos'], repo_details)
+        snapshots, languages, render_config, share_token = _world_rows(
+            world, user_payload, payload, repo_details, content_ids
+        )
+        _insert_world_rows(snapshots, languages, [render_config], [share_token])
+
+        store_rendered_world(world)
+
+    return world
+
+
+def persist_worlds(entries):
+    """Complete several new worlds in one transaction, with one bulk write per table.
+
+    ``entries`` are ``(world, user_payload, payload, repo_details)`` tuples whose worlds were
+    claimed through ``claim_world_generation`` and are still processing; returns the worlds,
+    now ready.
+    """
+    worlds = []
+    repos = []
+    details = {}
+    now = timezone.now()
+    for world, user_payload, payload, repo_details in entries:
+        _apply_user_payload(world, user_payload, payload)
+        world.updated_at = now
+        worlds.append(world)
+        repos.extend(payload['repos'])
+        details.update(repo_details)
+    if not worlds:
+        return worlds
+
+    snapshots = []
+    languages = []
+    render_configs = []
+    share_tokens = []
+    with transaction.atomic():
+        World.objects.bulk_update(worlds, fields=PAYLOAD_WORLD_FIELDS)
+        content_ids = store_repo_contents(repos, details)
+        for world, user_payload, payload, repo_details in entries:
+            world_snapshots, world_languages, render_config, share_token = _world_rows(
+                world, user_payload, payload, repo_details, content_ids
+            )
+            snapshots.extend(world_snapshots)
+            languages.extend(world_languages)
+            render_configs.append(render_config)
+            share_tokens.append(share_token)
+        _insert_world_rows(snapshots, languages, render_configs, share_tokens)
+
+        store_rendered_worlds(worlds)
+
+    forget_worlds([world.pk for world in worlds])
+    for world in worlds:
+        remember_latest_world(world)
+    return worlds
+
+
+def _content_ids_for_refresh(repos, repo_details, previous):
+    """Content ids for a refresh, skipping the content lookup for repos whose content is unchanged."""
+    content_ids = {}
+    changed = []
+    for repo in repos:
+        snapshot = previous.get(repo['repo_id'])
+        breakdown = repo_details.get(repo['full_name'], {}).get('language_breakdown', {})
+        if (
+            snapshot is not None
+            and snapshot.description == repo['description']
+            and snapshot.language_breakdown == breakdown
+        ):
+            content_ids[repo['repo_id']] = snapshot.content_id
+        else:
+            changed.append(repo)
+    if changed:
+        content_ids.update(store_repo_contents(changed, repo_details))
+    return content_ids
+
+
+def refresh_world(world, user_payload, payload, repo_details, previous):
+    """Apply a fresh payload to an existing world, writing only what changed.
+
+    When nothing changed, only ``expires_at`` and the refresh state are updated in place:
+    ``updated_at`` and the rendered blobs stay as they are, so clients keep revalidating
+    with 304s. The stored bodies then carry the previous ``expires_at``.
+    """
+    before = [getattr(world, field) for field in WORLD_CONTENT_FIELDS]
+    _apply_user_payload(world, user_payload, payload)
+    world_changed = before != [getattr(world, field) for field in WORLD_CONTENT_FIELDS]
+    previous = dict(previous)
+    to_create = []
+    to_update = []
+    languages = [(item['language'], item['percent'], item['color_token']) for item in payload['languages']]
+    stored_languages = list(world.languages.order_by('pk').values_list('language', 'percent', 'color_token'))
+
+    with transaction.atomic():
+        # New content rows stay locked until the snapshots pointing at them are committed.
+        content_ids = _content_ids_for_refresh(payload['repos'], repo_details, previous)
+        for repo in payload['repos']:
+            values = _snapshot_values(repo, repo_details.get(repo['full_name'], {}), content_ids)
+            snapshot = previous.pop(repo['repo_id'], None)
+            if snapshot is None:
+                to_create.append(_snapshot_row(world, values))
+            elif any(getattr(snapshot, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(snapshot, field, value)
+                to_update.append(snapshot)
+
+        if not (world_changed or previous or to_update or to_create or languages != stored_languages):
+            World.objects.filter(pk=world.pk).update(
+                generation_status=world.generation_status,
+                error_message=world.error_message,
+                refresh_started_at=world.refresh_started_at,
+                expires_at=world.expires_at,
+            )
+            return world
+
+        world.save()
+        if previous:
+            RepoSnapshot.objects.filter(pk__in=[snapshot.pk for snapshot in previous.values()]).delete()
+        if to_update:
+            RepoSnapshot.objects.bulk_update(to_update, fields=SNAPSHOT_FIELDS)
+        insert_rows(RepoSnapshot, SNAPSHOT_INSERT_FIELDS, to_create)
+        if languages != stored_languages:
+            world.languages.all().delete()
+            insert_rows(LanguageStats, LANGUAGE_FIELDS, [(world.pk, *language) for language in languages])
+
+        store_rendered_world(world)
+
+    return world
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+
+from worlds.fake_github import FakeGitHub
+from worlds.services.tiered_cache import latest_worlds, rendered_worlds, world_meta
+from worlds.services.token_pool import reset_token_pool
+
+
+class FakeGitHubTestCase(TransactionTestCase):
+    """Runs against a ``FakeGitHub`` server with inline generation, no tokens and no API throttles."""
+
+    fake_repos = 30
+
+    def setUp(self):
+        self.fake = FakeGitHub(repos=self.fake_repos)
+        overrides = override_settings(
+            GITHUB_API_BASE=self.fake.start(),
+            GITHUB_API_MODE='rest',
+            GITHUB_TOKEN='',
+            GITHUB_TOKENS=[],
+            WORLD_GENERATION_ASYNC=False,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.addCleanup(self.fake.stop)
+
+        # Throttle classes keep a reference to this dict; a rate of None disables a scope.
+        rates = settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+        self.addCleanup(rates.update, dict(rates))
+        rates.update(dict.fromkeys(rates))
+
+        cache.clear()
+        for tiered in (latest_worlds(), world_meta(), rendered_worlds()):
+            tiered.clear_local()
+        reset_token_pool()
+        self.addCleanup(reset_token_pool)
+
+    def calls_per_world(self):
+        deep = min(settings.GITHUB_DEEP_FETCH_REPOS, self.fake_repos)
+        return {'user': 1, 'repos': 1, 'languages': deep, 'commits': deep}
@@ -0,0 +1,46 @@
+import threading
+import time
+
+from django.db import connections
+from django.test import Client
+
+from worlds.models import World
+from worlds.services.batch import get_batch_report, prewarm_worlds, start_batch
+
+from .support import FakeGitHubTestCase
+
+
+class PrewarmTests(FakeGitHubTestCase):
+    def test_creates_one_world_per_username(self):
+        report = prewarm_worlds(['octo', 'OCTO', 'hubot', 'missing-user'])
+
+        self.assertEqual(report.as_dict()['created'], 2)
+        self.assertEqual(list(report.failures), ['missing-user'])
+        self.assertEqual(World.objects.filter(generation_status=World.STATUS_READY).count(), 2)
+        failed = World.objects.filter(generation_status=World.STATUS_FAILED)
+        self.assertEqual(list(failed.values_list('username', flat=True)), ['missing-user'])
+
+    def test_generate_during_a_run_attaches_to_its_world(self):
+        self.fake.latency = 0.05
+        run = threading.Thread(target=lambda: (prewarm_worlds(['racer']), connections.close_all()))
+        run.start()
+        deadline = time.monotonic() + 5
+        while not self.fake.calls['user'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        client = Client(raise_request_exception=False)
+        response = client.post('/api/world/generate', {'username': 'racer'}, content_type='application/json')
+        run.join()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(World.objects.filter(username='racer').count(), 1)
+        self.assertEqual(self.fake.calls['user'], 1)
+
+    def test_queued_run_completes_on_the_batch_pool(self):
+        batch_id, _ = start_batch(['queued'])
+        deadline = time.monotonic() + 10
+        while not get_batch_report(batch_id)['finished'] and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        self.assertEqual(get_batch_report(batch_id)['created'], 1)
+        self.assertTrue(World.objects.filter(username='queued', generation_status=World.STATUS_READY).exists())
@@ -0,0 +1,31 @@
+from .support import FakeGitHubTestCase
+
+
+class WorldDetailValidatorTests(FakeGitHubTestCase):
+    def setUp(self):
+        super().setUp()
+        response = self.client.post('/api/world/generate', {'username': 'octo'}, content_type='application/json')
+        self.url = f"/api/world/{response.json()['world_id']}"
+
+    def test_gzip_and_identity_bodies_have_different_etags(self):
+        for url in (self.url, f'{self.url}/share', f'{self.url}/geometry'):
+            with self.subTest(url=url):
+                gzipped = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+                identity = self.client.get(url)
+
+                self.assertEqual(gzipped['Content-Encoding'], 'gzip')
+                self.assertFalse(identity.has_header('Content-Encoding'))
+                self.assertEqual(gzipped['ETag'], identity['ETag'][:-1] + '-gz"')
+                self.assertIn('Accept-Encoding', gzipped['Vary'])
+
+    def test_each_representation_revalidates_against_its_own_etag(self):
+        gzip_etag = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        identity_etag = self.client.get(self.url)['ETag']
+
+        self.assertEqual(
+            self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=gzip_etag).status_code, 304
+        )
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=identity_etag).status_code, 304)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=identity_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], gzip_etag)
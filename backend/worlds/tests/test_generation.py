@@ -0,0 +1,73 @@
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+from django.utils import timezone
+
+from worlds.models import World
+from worlds.services.world_service import STALLED_MESSAGE, create_processing_world
+
+from .support import FakeGitHubTestCase
+
+
+class ConcurrentGenerateTests(FakeGitHubTestCase):
+    def _post_together(self, usernames):
+        barrier = threading.Barrier(len(usernames))
+        statuses = []
+
+        def post(username):
+            client = Client(raise_request_exception=False)
+            try:
+                barrier.wait()
+                response = client.post('/api/world/generate', {'username': username}, content_type='application/json')
+                statuses.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=post, args=(username,)) for username in usernames]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return statuses
+
+    def test_same_username_makes_one_set_of_github_calls(self):
+        statuses = self._post_together(['crowd-user'] * 8)
+
+        self.assertEqual(sorted(statuses), [200] * 7 + [201])
+        self.assertEqual(dict(self.fake.calls), self.calls_per_world())
+        self.assertEqual(World.objects.filter(username='crowd-user').count(), 1)
+
+    def test_different_usernames_generate_concurrently(self):
+        usernames = [f'parallel-{index}' for index in range(6)]
+        statuses = self._post_together(usernames)
+
+        self.assertEqual(statuses, [201] * len(usernames))
+        self.assertEqual(World.objects.filter(username__in=usernames).count(), len(usernames))
+        self.assertEqual(self.fake.calls['user'], len(usernames))
+
+
+class StalledWorldTests(FakeGitHubTestCase):
+    def _stalled_world(self, username):
+        world = create_processing_world(username)
+        started_at = timezone.now() - timedelta(seconds=settings.WORLD_PROCESSING_TIMEOUT_SECONDS + 1)
+        World.objects.filter(pk=world.pk).update(generated_at=started_at)
+        return world
+
+    def test_lost_job_reports_failed(self):
+        world = self._stalled_world('stalled')
+        response = self.client.get(f'/api/world/{world.pk}/status')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], World.STATUS_FAILED)
+        self.assertEqual(response.json()['eta_seconds'], 0)
+        self.assertEqual(response.json()['detail'], STALLED_MESSAGE)
+
+    def test_generate_replaces_a_lost_job(self):
+        world = self._stalled_world('stalled')
+        response = self.client.post('/api/world/generate', {'username': 'stalled'}, content_type='application/json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotEqual(response.json()['world_id'], str(world.pk))
@@ -0,0 +1,169 @@
+import asyncio
+from unittest import skipIf
+
+from django.test import SimpleTestCase, override_settings
+
+from worlds.models import World
+from worlds.services.github_async import (
+    AsyncGitHubClient,
+    AsyncGitHubGraphQLClient,
+    afetch_repo_details,
+    get_async_github_client,
+)
+from worlds.services.github_service import (
+    GitHubClient,
+    GitHubError,
+    GitHubGraphQLClient,
+    build_world_payload,
+    fetch_repo_details,
+    get_github_client,
+)
+from worlds.services.http_session import get_async_http_client, httpx
+from worlds.services.token_pool import reset_token_pool
+
+from .support import FakeGitHubTestCase
+
+
+class GraphQLTestCase(FakeGitHubTestCase):
+    """``GITHUB_API_MODE=graphql`` with one token, against the fake server's GraphQL endpoint."""
+
+    # Three GraphQL pages of 100 repos.
+    fake_repos = 250
+
+    def setUp(self):
+        super().setUp()
+        overrides = override_settings(
+            GITHUB_API_MODE='graphql',
+            GITHUB_TOKENS=['test-token'],
+            GITHUB_GRAPHQL_URL=f'{self.fake.base_url}/graphql',
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        reset_token_pool()
+
+
+class GraphQLClientTests(GraphQLTestCase):
+    def _fetch(self, client, username='octo'):
+        user = client.fetch_user(username)
+        repos = client.fetch_repos(username)
+        return build_world_payload(user, repos, use_numpy=False), fetch_repo_details(client, repos)
+
+    def test_graphql_matches_rest(self):
+        rest = self._fetch(GitHubClient())
+        self.fake.calls.clear()
+        client = get_github_client()
+
+        self.assertIsInstance(client, GitHubGraphQLClient)
+        self.assertEqual(self._fetch(client), rest)
+        self.assertEqual(dict(self.fake.calls), {'graphql': 3})
+
+    def test_token_unavailable_on_first_page_uses_rest(self):
+        self.fake.graphql_limit = 0
+        payload, details = self._fetch(get_github_client())
+
+        self.assertEqual((payload, details), self._fetch(GitHubClient()))
+        self.assertEqual(self.fake.calls['graphql'], 1)
+
+    def test_token_rejected_on_a_later_page_finishes_over_rest(self):
+        self.fake.graphql_limit = 2
+        client = get_github_client()
+        user = client.fetch_user('octo')
+        repos = client.fetch_repos('octo')
+
+        self.assertEqual([repo['id'] for repo in repos], [repo['id'] for repo in self.fake.user_repos('octo')])
+        self.assertEqual(user['public_repos'], self.fake_repos)
+        self.assertEqual(self.fake.calls['graphql'], 3)
+        self.assertEqual(self.fake.calls['repos'], 3)
+
+    def test_generate_survives_a_token_rejected_mid_generation(self):
+        self.fake.graphql_limit = 1
+        response = self.client.post('/api/world/generate', {'username': 'octo'}, content_type='application/json')
+
+        self.assertEqual(response.status_code, 201)
+        world = World.objects.get(username='octo')
+        self.assertEqual(world.generation_status, World.STATUS_READY)
+        self.assertEqual(world.repos.count(), self.fake_repos)
+
+
+@skipIf(httpx is None, 'The async client needs httpx.')
+class AsyncGraphQLClientTests(GraphQLTestCase):
+    def _fetch(self, make_client, username='octo'):
+        """``(client, user, repos, details)`` from one run of ``make_client()`` on a fresh loop."""
+
+        async def fetch():
+            client = make_client()
+            user, repos = await asyncio.gather(client.fetch_user(username), client.fetch_repos(username))
+            return client, user, repos, await afetch_repo_details(client, repos)
+
+        return asyncio.run(fetch())
+
+    def test_graphql_matches_rest(self):
+        _, user, repos, details = self._fetch(AsyncGitHubClient)
+        rest = build_world_payload(user, repos, use_numpy=False), details
+        self.fake.calls.clear()
+        client, user, repos, details = self._fetch(get_async_github_client)
+
+        self.assertIsInstance(client, AsyncGitHubGraphQLClient)
+        self.assertEqual((build_world_payload(user, repos, use_numpy=False), details), rest)
+        # fetch_user and fetch_repos share the first page.
+        self.assertEqual(dict(self.fake.calls), {'graphql': 3})
+
+    def test_token_rejected_on_a_later_page_finishes_over_rest(self):
+        self.fake.graphql_limit = 2
+        _, _, repos, _ = self._fetch(get_async_github_client)
+
+        self.assertEqual([repo['id'] for repo in repos], [repo['id'] for repo in self.fake.user_repos('octo')])
+        self.assertEqual(self.fake.calls['graphql'], 3)
+
+    def test_http_client_is_closed_with_its_loop(self):
+        async def open_client():
+            return get_async_http_client()
+
+        self.assertTrue(asyncio.run(open_client()).is_closed)
+
+
+REPOS = [{'full_name': f'octo/repo-{index}', 'default_branch': 'main'} for index in range(4)]
+
+
+class BrokenClient:
+    """Deep-fetch calls for ``octo/repo-1`` fail the ways a bad GitHub response can."""
+
+    errors = {'commits_30d': KeyError('commit'), 'language_breakdown': ValueError('Expecting value')}
+
+    def _answer(self, name, field, value):
+        if name == 'repo-1':
+            raise self.errors[field]
+        if name == 'repo-2':
+            raise GitHubError('GitHub API error: 502')
+        return value
+
+    def fetch_commit_count_30d(self, owner, name, default_branch):
+        return self._answer(name, 'commits_30d', 3)
+
+    def fetch_repo_languages(self, owner, name):
+        return self._answer(name, 'language_breakdown', {'Go': 10})
+
+
+class AsyncBrokenClient(BrokenClient):
+    async def fetch_commit_count_30d(self, owner, name, default_branch):
+        return super().fetch_commit_count_30d(owner, name, default_branch)
+
+    async def fetch_repo_languages(self, owner, name):
+        return super().fetch_repo_languages(owner, name)
+
+
+class DeepFetchErrorTests(SimpleTestCase):
+    """One broken deep-fetch call falls back to the defaults instead of failing the world."""
+
+    expected = {
+        'octo/repo-0': {'commits_30d': 3, 'language_breakdown': {'Go': 10}},
+        'octo/repo-1': {'commits_30d': 0, 'language_breakdown': {}},
+        'octo/repo-2': {'commits_30d': 0, 'language_breakdown': {}},
+        'octo/repo-3': {'commits_30d': 3, 'language_breakdown': {'Go': 10}},
+    }
+
+    def test_sync(self):
+        self.assertEqual(fetch_repo_details(BrokenClient(), REPOS), self.expected)
+
+    def test_async(self):
+        self.assertEqual(asyncio.run(afetch_repo_details(AsyncBrokenClient(), REPOS)), self.expected)
@@ -0,0 +1,79 @@
+import asyncio
+from unittest import skipIf
+
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from worlds.services.github_async import AsyncGitHubClient
+from worlds.services.github_service import GitHubClient
+from worlds.services.http_cache import ResponseCache, get_response_cache
+from worlds.services.http_session import httpx
+
+from .support import FakeGitHubTestCase
+
+
+def make_response(body, etag='"v1"'):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers['ETag'] = etag
+    response._content = body
+    return response
+
+
+class ResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_evicts_least_recently_used_by_size(self):
+        responses = ResponseCache(max_entries=100, timeout=60, max_bytes=8000)
+        # Eight entries of about 900 bytes fit; the ninth evicts the least recently used.
+        for key in 'abcdefgh':
+            responses.store(key, make_response(b'x' * 900))
+        responses.get('a')
+        responses.store('i', make_response(b'x' * 900))
+
+        self.assertLessEqual(responses.stats()['bytes'], 8000)
+        self.assertEqual(list(responses._entries), [*'cdefgh', 'a', 'i'])
+
+    def test_large_bodies_stay_in_the_shared_cache_only(self):
+        responses = ResponseCache(max_entries=100, timeout=60, max_bytes=8000)
+        responses.store('small', make_response(b'x' * 100))
+        responses.store('large', make_response(b'x' * 2000))
+
+        self.assertEqual(list(responses._entries), ['small'])
+        self.assertEqual(responses.get('large')['body'], b'x' * 2000)
+        self.assertEqual(list(responses._entries), ['small'])
+
+    def test_replacing_an_entry_updates_the_byte_count(self):
+        responses = ResponseCache(max_entries=100, timeout=60, max_bytes=8000)
+        responses.store('a', make_response(b'x' * 500))
+        responses.store('a', make_response(b'x' * 100, etag='"v2"'))
+
+        self.assertEqual(responses.stats()['bytes'], ResponseCache.entry_size(responses.get('a')))
+
+
+class ConditionalRequestTests(FakeGitHubTestCase):
+    """A repeated GET revalidates with ``If-None-Match`` and is answered from the cache on 304."""
+
+    def _assert_revalidated(self, fetch_twice):
+        hits = get_response_cache().stats()['hits']
+        first, second = fetch_twice()
+
+        self.assertEqual(second, first)
+        self.assertEqual(self.fake.calls['user'], 2)
+        self.assertEqual(self.fake.not_modified['user'], 1)
+        self.assertEqual(get_response_cache().stats()['hits'], hits + 1)
+
+    def test_sync_client(self):
+        client = GitHubClient()
+        self._assert_revalidated(lambda: (client.fetch_user('octo'), client.fetch_user('octo')))
+
+    @skipIf(httpx is None, 'The async client needs httpx.')
+    def test_async_client(self):
+        async def fetch_twice():
+            client = AsyncGitHubClient()
+            return await client.fetch_user('octo'), await client.fetch_user('octo')
+
+        self._assert_revalidated(lambda: asyncio.run(fetch_twice()))
@@ -0,0 +1,72 @@
+from unittest import skipIf
+
+from django.test import SimpleTestCase
+
+from worlds.benchmarks import synthetic_repos, synthetic_user
+from worlds.services import github_service
+from worlds.services.github_service import build_world_payload
+
+USER = {'id': 42, 'followers': 7}
+
+
+def repo(repo_id, name, language, stars, forks, watchers):
+    return {
+        'id': repo_id,
+        'name': name,
+        'full_name': f'octo/{name}',
+        'html_url': f'https://github.com/octo/{name}',
+        'language': language,
+        'stargazers_count': stars,
+        'forks_count': forks,
+        'watchers_count': watchers,
+    }
+
+
+# A capped height, an unlanguaged empty repo, and scores that need rounding.
+REPOS = [
+    repo(1, 'big', 'Python', 120_000, 9_000, 120_000),
+    repo(2, 'small', 'Go', 3, 1, 3),
+    repo(3, 'empty', None, 0, 0, 0),
+    repo(4, 'odd', 'Python', 7, 3, 11),
+]
+
+# (activity_score, pos_x, pos_y, pos_z) per repo, as computed by the pure-Python backend.
+EXPECTED_LAYOUT = [
+    (347700.0, 8.0, 20.0, 0.0),
+    (9.7, 7.2, 5.4, 3.48),
+    (0.0, 4.97, 3.3, 6.27),
+    (27.9, 1.75, 7.139696961967, 7.81),
+]
+
+
+class BuildWorldPayloadTests(SimpleTestCase):
+    def backends(self):
+        return [False, True] if github_service.np is not None else [False]
+
+    def test_matches_the_fixture_on_every_backend(self):
+        for use_numpy in self.backends():
+            with self.subTest(use_numpy=use_numpy):
+                payload = build_world_payload(USER, REPOS, use_numpy=use_numpy)
+
+                self.assertEqual(
+                    payload['totals'],
+                    {'total_stars': 120_010, 'total_forks': 9_004, 'total_watchers': 120_014, 'repo_count': 4},
+                )
+                self.assertEqual(
+                    [(item['language'], item['percent']) for item in payload['languages']],
+                    [('Python', 66.67), ('Go', 33.33)],
+                )
+                layout = [
+                    (item['activity_score'], item['pos_x'], item['pos_y'], item['pos_z']) for item in payload['repos']
+                ]
+                self.assertEqual(layout, EXPECTED_LAYOUT)
+
+    @skipIf(github_service.np is None, 'NumPy is not installed.')
+    def test_numpy_and_python_agree_on_synthetic_repos(self):
+        repos = synthetic_repos(2_000, owner='parity')
+        user = synthetic_user('parity', repo_count=len(repos))
+
+        self.assertEqual(
+            build_world_payload(user, repos, use_numpy=True),
+            build_world_payload(user, repos, use_numpy=False),
+        )
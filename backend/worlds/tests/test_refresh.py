@@ -0,0 +1,78 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from worlds.models import RenderedWorld, RepoContent, World
+from worlds.services.github_service import get_github_client
+from worlds.services.retention import delete_orphaned_contents
+from worlds.services.world_service import generate_world, split_changed_repos, store_repo_contents
+
+from .support import FakeGitHubTestCase
+
+
+class SplitChangedReposTests(SimpleTestCase):
+    def _split(self, pushed_at, commits_30d):
+        repo = {'repo_id': 1, 'full_name': 'octo/idle', 'last_activity_at': pushed_at.isoformat()}
+        prev = SimpleNamespace(last_activity_at=pushed_at, commits_30d=commits_30d, language_breakdown={'Go': 10})
+        return split_changed_repos([repo], {1: prev})
+
+    def test_count_is_zeroed_once_the_last_push_leaves_the_window(self):
+        details, changed = self._split(timezone.now() - timedelta(days=45), commits_30d=12)
+        self.assertEqual(changed, [])
+        self.assertEqual(details['octo/idle'], {'commits_30d': 0, 'language_breakdown': {'Go': 10}})
+
+    def test_count_inside_the_window_is_refetched(self):
+        details, changed = self._split(timezone.now() - timedelta(days=3), commits_30d=12)
+        self.assertEqual(details, {})
+        self.assertEqual([repo['full_name'] for repo in changed], ['octo/idle'])
+
+    def test_zero_count_is_reused_without_a_new_push(self):
+        details, changed = self._split(timezone.now() - timedelta(days=3), commits_30d=0)
+        self.assertEqual(changed, [])
+        self.assertEqual(details['octo/idle']['commits_30d'], 0)
+
+
+class StoreRepoContentsTests(TestCase):
+    repos = [
+        {'repo_id': 1, 'full_name': 'octo/one', 'description': 'first'},
+        {'repo_id': 2, 'full_name': 'octo/two', 'description': 'second'},
+    ]
+    details = {'octo/one': {'language_breakdown': {'Go': 10}}}
+
+    def test_reuses_stored_content(self):
+        first = store_repo_contents(self.repos, self.details)
+        self.assertEqual(store_repo_contents(self.repos, self.details), first)
+        self.assertEqual(RepoContent.objects.count(), 2)
+
+    def test_pruned_content_is_stored_again(self):
+        store_repo_contents(self.repos[:1], self.details)
+        self.assertEqual(delete_orphaned_contents(batch_size=10), 1)
+        content_ids = store_repo_contents(self.repos, self.details)
+        self.assertEqual(set(content_ids), {1, 2})
+        self.assertEqual(set(RepoContent.objects.values_list('id', flat=True)), set(content_ids.values()))
+
+
+# FakeGitHub's commit counts ignore pushed_at, so deep-fetched counts would always look changed.
+@override_settings(GITHUB_DEEP_FETCH_REPOS=0)
+class UnchangedRefreshTests(FakeGitHubTestCase):
+    def test_refresh_without_changes_keeps_validators(self):
+        response = self.client.post('/api/world/generate', {'username': 'octo'}, content_type='application/json')
+        url = f"/api/world/{response.json()['world_id']}"
+        etag = self.client.get(url)['ETag']
+        world = World.objects.get(username='octo')
+        blobs = set(RenderedWorld.objects.filter(world=world).values_list('pk', flat=True))
+        expired_at = timezone.now() - timedelta(minutes=1)
+        World.objects.filter(pk=world.pk).update(expires_at=expired_at, refresh_started_at=timezone.now())
+        world.refresh_from_db()
+        updated_at = world.updated_at
+
+        generate_world(world, get_github_client())
+
+        refreshed = World.objects.get(pk=world.pk)
+        self.assertEqual(refreshed.updated_at, updated_at)
+        self.assertGreater(refreshed.expires_at, expired_at)
+        self.assertIsNone(refreshed.refresh_started_at)
+        self.assertEqual(set(RenderedWorld.objects.filter(world=world).values_list('pk', flat=True)), blobs)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
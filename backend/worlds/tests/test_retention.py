@@ -0,0 +1,137 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from worlds.models import RepoContent, RepoSnapshot, ShareToken, World
+from worlds.services.retention import prunable_worlds
+from worlds.services.world_service import share_token_expiry
+
+USERS = 600
+WORLDS_PER_USER = 5
+KEEP = 2
+
+
+class PruneWorldsTests(TestCase):
+    """Thousands of synthetic worlds, all expired: five per username, newest first."""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        worlds = []
+        generated_at = []
+        cls.expected = set()
+        for user in range(USERS):
+            for age in range(WORLDS_PER_USER):
+                username = f'user-{user}'
+                status = World.STATUS_READY
+                if user % 10 == 4 and age == 0:
+                    # Retention groups usernames case-insensitively.
+                    username = username.upper()
+                if user % 10 == 3 and age == 3:
+                    status = World.STATUS_PROCESSING
+                worlds.append(World(username=username, generation_status=status, expires_at=now - timedelta(hours=1)))
+                generated_at.append(now - timedelta(minutes=1 if status == World.STATUS_PROCESSING else age + 1))
+                if age >= KEEP and status == World.STATUS_READY and not (user % 10 == 0 and age == 4):
+                    cls.expected.add(worlds[-1].id)
+        World.objects.bulk_create(worlds)
+        # generated_at is auto_now_add, so the synthetic ages can only be set once the rows exist.
+        for world, value in zip(worlds, generated_at):
+            world.generated_at = value
+        World.objects.bulk_update(worlds, ['generated_at'], batch_size=500)
+
+        contents = RepoContent.objects.bulk_create(
+            [RepoContent(content_hash=str(world.id), repo_id=index) for index, world in enumerate(worlds)]
+        )
+        RepoSnapshot.objects.bulk_create(
+            [
+                RepoSnapshot(world=world, repo_id=content.repo_id, name='repo', full_name='user/repo', content=content)
+                for world, content in zip(worlds, contents)
+            ]
+        )
+
+        tokens = []
+        for user in range(USERS):
+            oldest = worlds[user * WORLDS_PER_USER + 4]
+            if user % 10 == 0:
+                tokens.append(ShareToken(world=oldest, token=f'keep-{user}', expires_at=now + timedelta(days=1)))
+            elif user % 10 == 1:
+                tokens.append(ShareToken(world=oldest, token=f'expired-{user}', expires_at=now - timedelta(days=1)))
+            elif user % 10 == 2:
+                tokens.append(ShareToken(world=oldest, token=f'private-{user}', is_public=False))
+            elif user % 10 == 5:
+                # Without an expiry of its own, a link lasts only as long as its world.
+                tokens.append(ShareToken(world=oldest, token=f'unbounded-{user}'))
+        ShareToken.objects.bulk_create(tokens)
+
+    def _prune(self, **options):
+        out = StringIO()
+        call_command('prune_worlds', keep=KEEP, batch_size=250, stdout=out, **options)
+        return out.getvalue()
+
+    def test_selects_expired_worlds_outside_the_kept_sets(self):
+        self.assertEqual(set(prunable_worlds(KEEP).values_list('id', flat=True)), self.expected)
+
+    def test_prune_deletes_worlds_and_their_rows(self):
+        total = World.objects.count()
+        output = self._prune()
+
+        self.assertIn(f'Deleted {len(self.expected)} worlds in 7 batches', output)
+        self.assertFalse(World.objects.filter(id__in=self.expected).exists())
+        self.assertEqual(World.objects.count(), total - len(self.expected))
+        self.assertEqual(RepoSnapshot.objects.count(), World.objects.count())
+        # Each world had its own content row, so content of deleted worlds is now orphaned and gone.
+        self.assertEqual(RepoContent.objects.count(), World.objects.count())
+        self.assertEqual(ShareToken.objects.filter(token__startswith='keep-').count(), USERS // 10)
+        self.assertFalse(ShareToken.objects.exclude(token__startswith='keep-').exists())
+
+    def test_dry_run_reports_without_deleting(self):
+        total = World.objects.count()
+        output = self._prune(dry_run=True)
+
+        self.assertIn(f'Would delete {len(self.expected)} worlds', output)
+        self.assertIn(f'RepoSnapshot   {len(self.expected):>10} rows', output)
+        self.assertEqual(World.objects.count(), total)
+
+    def test_limit_deletes_the_oldest_first(self):
+        oldest = list(prunable_worlds(KEEP).values_list('id', flat=True)[:100])
+        self._prune(limit=100)
+
+        self.assertFalse(World.objects.filter(id__in=oldest).exists())
+        self.assertEqual(prunable_worlds(KEEP).count(), len(self.expected) - 100)
+
+
+class DefaultSharePruneTests(TestCase):
+    """Every ready world gets a public share link; by default that must not keep it forever."""
+
+    def _expired_worlds(self, count):
+        now = timezone.now()
+        worlds = World.objects.bulk_create(
+            [
+                World(username='octo', generation_status=World.STATUS_READY, expires_at=now - timedelta(days=age + 1))
+                for age in range(count)
+            ]
+        )
+        for age, world in enumerate(worlds):
+            world.generated_at = now - timedelta(days=age + 2)
+        World.objects.bulk_update(worlds, ['generated_at'])
+        ShareToken.objects.bulk_create(
+            [
+                ShareToken(world=world, token=f'link-{age}', expires_at=share_token_expiry())
+                for age, world in enumerate(worlds)
+            ]
+        )
+        return worlds
+
+    def test_old_shared_worlds_are_pruned_under_default_settings(self):
+        worlds = self._expired_worlds(5)
+
+        self.assertEqual(set(prunable_worlds(KEEP).values_list('id', flat=True)), {world.id for world in worlds[KEEP:]})
+
+    @override_settings(SHARE_TOKEN_TTL_DAYS=30)
+    def test_links_with_an_expiry_keep_their_worlds(self):
+        self._expired_worlds(5)
+
+        self.assertFalse(prunable_worlds(KEEP).exists())
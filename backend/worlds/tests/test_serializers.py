@@ -0,0 +1,55 @@
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from worlds.benchmarks import synthetic_repo_details, synthetic_repos, synthetic_user
+from worlds.models import RepoSnapshot
+from worlds.serializers import (
+    RepoSnapshotSerializer,
+    ShareSerializer,
+    WorldSerializer,
+    repo_rows,
+    repo_rows_from_dicts,
+    repo_value_paths,
+)
+from worlds.services.github_service import build_world_payload
+from worlds.services.rendering import load_world_for_render
+from worlds.services.world_service import create_processing_world, persist_world
+
+render = JSONRenderer().render
+
+
+class RepoRowsParityTests(TestCase):
+    """The fast repo path must render byte-identical JSON to ``RepoSnapshotSerializer``."""
+
+    @classmethod
+    def setUpTestData(cls):
+        repos = synthetic_repos(300, owner='parity')
+        user = synthetic_user('parity', repo_count=len(repos))
+        world = create_processing_world('parity')
+        cls.world = persist_world(world, user, build_world_payload(user, repos), synthetic_repo_details(repos))
+
+    def snapshots(self):
+        return RepoSnapshot.objects.filter(world_id=self.world.pk).select_related('content')
+
+    def legacy(self, fields=None):
+        data = RepoSnapshotSerializer(self.snapshots(), many=True).data
+        if fields is None:
+            return data
+        return [{name: row[name] for name in fields} for row in data]
+
+    def test_repo_rows_match_the_serializer(self):
+        self.assertEqual(render(repo_rows(self.snapshots())), render(self.legacy()))
+
+    def test_sparse_rows_match_the_serializer(self):
+        fields = ['name', 'description', 'language_breakdown', 'last_activity_at', 'pos_x']
+        self.assertEqual(render(repo_rows(self.snapshots(), fields)), render(self.legacy(fields)))
+        rows = self.snapshots().values(*repo_value_paths(fields))
+        self.assertEqual(render(repo_rows_from_dicts(rows, fields)), render(self.legacy(fields)))
+
+    def test_world_and_share_serializers_match(self):
+        world = load_world_for_render(self.world.pk)
+        legacy_repos = self.legacy()
+        for serializer_class in (WorldSerializer, ShareSerializer):
+            with self.subTest(serializer=serializer_class.__name__):
+                data = serializer_class(world).data
+                self.assertEqual(render(data), render(dict(data, repos=legacy_repos)))
@@ -0,0 +1,44 @@
+from django.test import override_settings
+
+from worlds.models import ShareToken
+
+from .support import FakeGitHubTestCase
+
+
+class ShareRevocationTests(FakeGitHubTestCase):
+    def setUp(self):
+        super().setUp()
+        response = self.client.post('/api/world/generate', {'username': 'octo'}, content_type='application/json')
+        self.world_id = response.json()['world_id']
+        self.url = f'/api/world/{self.world_id}/share'
+
+    def warm(self):
+        """Serve the link once, caching the world's metadata and share state."""
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_revoked_token_is_refused(self):
+        self.warm()
+        token = ShareToken.objects.get(world_id=self.world_id)
+        token.is_public = False
+        token.save()
+
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_deleted_token_is_refused(self):
+        self.warm()
+        ShareToken.objects.filter(world_id=self.world_id).delete()
+
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    @override_settings(WORLD_SHARE_CACHE_SECONDS=0)
+    def test_queryset_update_is_seen_without_share_caching(self):
+        self.warm()
+        ShareToken.objects.filter(world_id=self.world_id).update(is_public=False)
+
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_detail_still_served_after_revocation(self):
+        self.warm()
+        ShareToken.objects.filter(world_id=self.world_id).delete()
+
+        self.assertEqual(self.client.get(f'/api/world/{self.world_id}').status_code, 200)
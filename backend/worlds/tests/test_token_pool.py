@@ -0,0 +1,104 @@
+import time
+
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from worlds.services.github_service import GitHubClient, GitHubRateLimitError, TokenUnavailable
+from worlds.services.token_pool import (
+    PARK_INVALID,
+    PARK_RATE_LIMIT,
+    PARK_SECONDARY,
+    RESOURCE_CORE,
+    RESOURCE_GRAPHQL,
+    get_token_pool,
+    reset_token_pool,
+)
+
+
+def make_response(status_code=200, remaining=None, reset=None, resource=None, retry_after=None):
+    response = requests.Response()
+    response.status_code = status_code
+    if remaining is not None:
+        response.headers['X-RateLimit-Remaining'] = str(remaining)
+        response.headers['X-RateLimit-Reset'] = str(reset or int(time.time()) + 3600)
+    if resource is not None:
+        response.headers['X-RateLimit-Resource'] = resource
+    if retry_after is not None:
+        response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+@override_settings(GITHUB_TOKEN='', GITHUB_TOKENS=['first', 'second'])
+class TokenPoolTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        reset_token_pool()
+        self.addCleanup(reset_token_pool)
+        self.pool = get_token_pool()
+        self.client = GitHubClient()
+
+    def test_picks_the_token_with_the_most_headroom(self):
+        self.pool.update('first', make_response(remaining=10))
+        self.pool.update('second', make_response(remaining=900))
+
+        self.assertEqual(self.pool.acquire(), 'second')
+        self.assertEqual(self.pool.headroom(), 910)
+
+    def test_graphql_and_rest_budgets_are_kept_apart(self):
+        self.pool.update('first', make_response(remaining=4000))
+        self.pool.update('second', make_response(remaining=3000))
+        self.pool.update('first', make_response(remaining=5, resource=RESOURCE_GRAPHQL))
+
+        self.assertEqual(self.pool.acquire(RESOURCE_CORE), 'first')
+        self.assertEqual(self.pool.acquire(RESOURCE_GRAPHQL), 'second')
+        self.assertEqual(self.pool.headroom(RESOURCE_CORE), 7000)
+
+    def test_resource_header_wins_over_the_requested_resource(self):
+        self.pool.update('first', make_response(remaining=7, resource=RESOURCE_GRAPHQL), RESOURCE_CORE)
+
+        self.assertEqual(self.pool._states(RESOURCE_GRAPHQL)['first']['remaining'], 7)
+        self.assertIsNone(self.pool._states(RESOURCE_CORE)['first'])
+
+    def test_exhausted_budget_parks_the_token_until_reset(self):
+        reset = int(time.time()) + 600
+        self.assertTrue(self.client._accept('first', make_response(remaining=0, reset=reset)))
+
+        self.assertEqual(self.pool._states()['first']['reason'], PARK_RATE_LIMIT)
+        self.assertEqual(self.pool.acquire(), 'second')
+        self.assertEqual(self.pool.acquire(RESOURCE_GRAPHQL), 'first')
+
+    def test_every_token_exhausted_raises_rate_limit(self):
+        reset = int(time.time()) + 600
+        for token in ('first', 'second'):
+            self.client._accept(token, make_response(remaining=0, reset=reset))
+
+        self.assertEqual(self.pool.blocked_until(), reset)
+        with self.assertRaises(GitHubRateLimitError):
+            self.client._choose_token()
+
+    def test_retry_after_parks_for_the_requested_time(self):
+        before = time.time()
+        self.assertFalse(self.client._accept('first', make_response(403, retry_after=60)))
+
+        state = self.pool._states()['first']
+        self.assertEqual(state['reason'], PARK_SECONDARY)
+        self.assertGreaterEqual(state['parked_until'], before + 60)
+        self.assertEqual(self.pool.acquire(), 'second')
+
+    def test_rejected_token_is_parked_for_every_resource(self):
+        self.assertFalse(self.client._accept('first', make_response(401), RESOURCE_GRAPHQL))
+
+        for resource in (RESOURCE_CORE, RESOURCE_GRAPHQL):
+            self.assertEqual(self.pool._states(resource)['first']['reason'], PARK_INVALID)
+            self.assertEqual(self.pool.acquire(resource), 'second')
+
+    def test_falls_back_to_anonymous_once_every_token_is_rejected(self):
+        for token in ('first', 'second'):
+            self.client._accept(token, make_response(401))
+
+        self.assertIsNone(self.pool.blocked_until())
+        self.assertIsNone(self.client._choose_token())
+        with self.assertRaises(TokenUnavailable):
+            self.client._choose_token(require_token=True)
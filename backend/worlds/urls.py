@@ -1,9 +1,35 @@
+from django.conf import settings
 from django.urls import path
 
-from .views import GenerateWorldView, WorldDetailView, WorldShareView
+from .views import (
+    BatchGenerateView,
+    BatchStatusView,
+    GenerateWorldView,
+    WorldDetailView,
+    WorldGeometryView,
+    WorldReposView,
+    WorldShareView,
+    WorldStatusView,
+)
 
 urlpatterns = [
     path('world/generate', GenerateWorldView.as_view(), name='world-generate'),
+    path('world/batch', BatchGenerateView.as_view(), name='world-batch'),
+    path('world/batch/<str:batch_id>', BatchStatusView.as_view(), name='world-batch-status'),
     path('world/<uuid:world_id>', WorldDetailView.as_view(), name='world-detail'),
+    path('world/<uuid:world_id>/geometry', WorldGeometryView.as_view(), name='world-geometry'),
+    path('world/<uuid:world_id>/repos', WorldReposView.as_view(), name='world-repos'),
+    path('world/<uuid:world_id>/status', WorldStatusView.as_view(), name='world-status'),
     path('world/<uuid:world_id>/share', WorldShareView.as_view(), name='world-share'),
 ]
+
+if settings.WORLD_ASYNC_VIEWS:
+    from .async_views import AsyncGenerateWorldView, AsyncWorldDetailView, AsyncWorldShareView
+
+    # Same routes and names, answered natively on the event loop under ASGI.
+    urlpatterns = [
+        path('world/generate', AsyncGenerateWorldView.as_view(), name='world-generate'),
+        path('world/<uuid:world_id>', AsyncWorldDetailView.as_view(), name='world-detail'),
+        *(pattern for pattern in urlpatterns if pattern.name not in ('world-generate', 'world-detail', 'world-share')),
+        path('world/<uuid:world_id>/share', AsyncWorldShareView.as_view(), name='world-share'),
+    ]
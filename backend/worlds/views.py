@@ -1,24 +1,66 @@
-from datetime import timedelta
+import gzip
 
 from django.conf import settings
-from django.core.cache import cache
-from django.db import transaction
-from django.db.models import Prefetch
+from django.db import IntegrityError
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.utils.dateparse import parse_datetime
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date, quote_etag
 from rest_framework import status
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 
-from .models import LanguageStats, RenderConfig, RepoSnapshot, ShareToken, World
-from .serializers import GenerateWorldInputSerializer, ShareSerializer, WorldSerializer
+from .models import RenderedWorld, RepoSnapshot, World
+from .pagination import RepoCursorPagination
+from .serializers import (
+    BatchGenerateInputSerializer,
+    GenerateWorldInputSerializer,
+    WorldSerializer,
+    parse_repo_fields,
+    repo_rows_from_dicts,
+    repo_value_paths,
+)
 from .services.github_service import (
-    GitHubClient,
     GitHubError,
     GitHubNotFoundError,
     GitHubRateLimitError,
-    build_world_payload,
+    get_github_client,
+)
+from .services.batch import get_batch_report, start_batch
+from .services.geometry import CONTENT_TYPE as GEOMETRY_CONTENT_TYPE
+from .services.geometry import FORMAT_VERSION as GEOMETRY_FORMAT_VERSION
+from .services.geometry import pack_world_geometry
+from .services.metrics import REGISTRY, stage
+from .services.rendering import (
+    SERIALIZERS,
+    build_rendered_world,
+    get_current_rendering,
+    load_world_for_render,
+    save_rendered_world,
+    world_etag,
+)
+from .services.world_service import (
+    WORLD_META_FIELDS,
+    claim_world_generation,
+    display_status,
+    eta_seconds,
+    failure_message,
+    find_active_world,
+    find_latest_ready_world,
+    generate_world,
+    load_share_token,
+    load_world_meta,
+    mark_failed,
+    rate_limited_until,
+    remember_rate_limit,
+    revalidate_world,
+    schedule_world_generation,
+    wait_for_world,
+    within_stale_grace,
 )
 
 
@@ -27,7 +69,7 @@ class GenerateWorldView(APIView):
         serializer = GenerateWorldInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        client = GitHubClient()
+        client = get_github_client()
 
         try:
             username = client.parse_username(
@@ -37,179 +79,321 @@ class GenerateWorldView(APIView):
         except GitHubError as exc:
             return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-        active_world = World.objects.filter(
-            username__iexact=username,
-            generation_status=World.STATUS_READY,
-            expires_at__gt=timezone.now(),
-        ).first()
+        with stage('lookup'):
+            active_world = find_active_world(username)
+            stale_world = None if active_world else find_latest_ready_world(username)
         if active_world:
-            return Response(
-                {
-                    'world_id': str(active_world.id),
-                    'status': active_world.generation_status,
-                    'cached': True,
-                    'eta_seconds': 0,
-                },
-                status=status.HTTP_200_OK,
-            )
+            return self._cached_response(active_world)
+
+        reset_at = rate_limited_until()
+        if reset_at:
+            return self._rate_limited_response(stale_world, reset_at)
 
-        stale_world = World.objects.filter(
-            username__iexact=username,
-            generation_status=World.STATUS_READY,
-        ).first()
+        # Stale-while-revalidate: answer with the expired world now and refresh it in the background.
+        if stale_world and within_stale_grace(stale_world):
+            revalidate_world(username)
+            return Response(stale_world_data(stale_world), status=status.HTTP_200_OK)
+
+        world, created = claim_world_generation(username)
+        if not created and display_status(world) == World.STATUS_READY:
+            return self._cached_response(world)
+
+        if settings.WORLD_GENERATION_ASYNC:
+            if created:
+                schedule_world_generation(world)
+            return Response(queued_world_data(world), status=status.HTTP_202_ACCEPTED)
+
+        if not created:
+            world = wait_for_world(world)
+            if display_status(world) != World.STATUS_READY:
+                return Response(
+                    {'detail': failure_message(world) or 'World generation is still in progress.'},
+                    status=status.HTTP_502_BAD_GATEWAY,
+                )
+            return self._cached_response(world)
 
         try:
-            user_payload = client.fetch_user(username)
-            repos_payload = client.fetch_repos(username)
+            generate_world(world, client)
         except GitHubNotFoundError as exc:
+            mark_failed(world, str(exc))
             return Response({'detail': str(exc)}, status=status.HTTP_404_NOT_FOUND)
         except GitHubRateLimitError as exc:
-            if stale_world:
-                return Response(
-                    {
-                        'world_id': str(stale_world.id),
-                        'status': stale_world.generation_status,
-                        'cached': True,
-                        'stale': True,
-                        'rate_limited_until': exc.reset_at.isoformat(),
-                        'eta_seconds': 900,
-                    },
-                    status=status.HTTP_200_OK,
-                )
-            return Response(
-                {
-                    'detail': 'GitHub API rate limit reached. Try again later.',
-                    'rate_limited_until': exc.reset_at.isoformat(),
-                },
-                status=status.HTTP_429_TOO_MANY_REQUESTS,
-            )
+            remember_rate_limit(exc.reset_at)
+            mark_failed(world, 'GitHub API rate limit reached. Try again later.')
+            return self._rate_limited_response(stale_world, exc.reset_at)
         except GitHubError as exc:
+            mark_failed(world, str(exc))
             return Response({'detail': str(exc)}, status=status.HTTP_502_BAD_GATEWAY)
 
-        payload = build_world_payload(user_payload, repos_payload)
-        world = self._create_world(client, username, user_payload, payload)
+        return Response(created_world_data(world), status=status.HTTP_201_CREATED)
 
-        cache.set(f'world:latest:{username.lower()}', str(world.id), timeout=settings.WORLD_TTL_HOURS * 3600)
+    def _cached_response(self, world):
+        return Response(cached_world_data(world), status=status.HTTP_200_OK)
 
-        return Response(
-            {
-                'world_id': str(world.id),
-                'status': world.generation_status,
-                'cached': False,
-                'eta_seconds': 0,
-            },
-            status=status.HTTP_201_CREATED,
-        )
+    def _rate_limited_response(self, stale_world, reset_at):
+        data, status_code = rate_limited_data(stale_world, reset_at)
+        return Response(data, status=status_code)
 
-    def _create_world(self, client, username, user_payload, payload):
-        expires_at = timezone.now() + timedelta(hours=settings.WORLD_TTL_HOURS)
-        top_repo_count_for_deep_fetch = 12
-
-        with transaction.atomic():
-            world = World.objects.create(
-                username=username,
-                github_url=user_payload.get('html_url', ''),
-                avatar_url=user_payload.get('avatar_url', ''),
-                followers=user_payload.get('followers', 0),
-                following=user_payload.get('following', 0),
-                public_repos=user_payload.get('public_repos', 0),
-                totals=payload['totals'],
-                generation_status=World.STATUS_READY,
-                source_hash=payload['source_hash'],
-                expires_at=expires_at,
-            )
 
-            repo_models = []
-            for idx, repo in enumerate(payload['repos']):
-                commits_30d = 0
-                language_breakdown = {}
-
-                if idx < top_repo_count_for_deep_fetch:
-                    owner, name = repo['full_name'].split('/', 1)
-                    try:
-                        commits_30d = client.fetch_commit_count_30d(owner, name, repo.get('default_branch', 'main'))
-                    except GitHubError:
-                        commits_30d = 0
-                    try:
-                        language_breakdown = client.fetch_repo_languages(owner, name)
-                    except GitHubError:
-                        language_breakdown = {}
-
-                pushed_at = parse_datetime(repo['last_activity_at']) if repo.get('last_activity_at') else None
-                repo_models.append(
-                    RepoSnapshot(
-                        world=world,
-                        repo_id=repo['repo_id'],
-                        name=repo['name'],
-                        full_name=repo['full_name'],
-                        html_url=repo['html_url'],
-                        description=repo['description'],
-                        primary_language=repo['primary_language'],
-                        language_breakdown=language_breakdown,
-                        stars=repo['stars'],
-                        forks=repo['forks'],
-                        open_issues=repo['open_issues'],
-                        watchers=repo['watchers'],
-                        size_kb=repo['size_kb'],
-                        commits_30d=commits_30d,
-                        activity_score=repo['activity_score'],
-                        last_activity_at=pushed_at,
-                        is_fork=repo['is_fork'],
-                        pos_x=repo['pos_x'],
-                        pos_y=repo['pos_y'],
-                        pos_z=repo['pos_z'],
-                    )
-                )
-            RepoSnapshot.objects.bulk_create(repo_models)
-
-            LanguageStats.objects.bulk_create(
-                [
-                    LanguageStats(
-                        world=world,
-                        language=item['language'],
-                        percent=item['percent'],
-                        color_token=item['color_token'],
-                    )
-                    for item in payload['languages']
-                ]
-            )
+def queued_world_data(world):
+    return {
+        'world_id': str(world.id),
+        'status': display_status(world),
+        'cached': False,
+        'eta_seconds': eta_seconds(world),
+    }
 
-            RenderConfig.objects.create(
-                world=world,
-                seed=(user_payload.get('id', 1) % 100000) + 7,
-                layout_version='v1',
-                density_level=1.0,
-                lighting_profile='neo_city',
-                enable_particles=True,
-            )
 
-            ShareToken.objects.create(world=world, token=ShareToken.make_token(), is_public=True)
+def created_world_data(world):
+    return {
+        'world_id': str(world.id),
+        'status': world.generation_status,
+        'cached': False,
+        'eta_seconds': 0,
+    }
 
-        return world
 
+def cached_world_data(world):
+    return {
+        'world_id': str(world.id),
+        'status': world.generation_status,
+        'cached': True,
+        'eta_seconds': 0,
+    }
+
+
+def stale_world_data(world):
+    return {**cached_world_data(world), 'stale': True}
+
+
+def rate_limited_data(stale_world, reset_at):
+    """The stale world to show while GitHub is rate limiting us, or a 429 when there is none."""
+    if stale_world:
+        return {
+            'world_id': str(stale_world.id),
+            'status': stale_world.generation_status,
+            'cached': True,
+            'stale': True,
+            'rate_limited_until': reset_at.isoformat(),
+            'eta_seconds': 900,
+        }, status.HTTP_200_OK
+    return {
+        'detail': 'GitHub API rate limit reached. Try again later.',
+        'rate_limited_until': reset_at.isoformat(),
+    }, status.HTTP_429_TOO_MANY_REQUESTS
+
+
+class BatchGenerateView(APIView):
+    """Pre-generate worlds for a list of usernames in the background (staff only)."""
+
+    permission_classes = [IsAdminUser]
+    throttle_classes = []
+
+    def post(self, request):
+        serializer = BatchGenerateInputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        batch_id, report = start_batch(serializer.validated_data['usernames'])
+        return Response({'batch_id': batch_id, **report.as_dict()}, status=status.HTTP_202_ACCEPTED)
+
+
+class BatchStatusView(APIView):
+    permission_classes = [IsAdminUser]
+    throttle_classes = []
+
+    def get(self, request, batch_id):
+        report = get_batch_report(batch_id)
+        if report is None:
+            raise Http404
+        return Response({'batch_id': batch_id, **report}, status=status.HTTP_200_OK)
+
+
+class WorldStatusView(APIView):
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'world-status'
 
-class WorldDetailView(APIView):
     def get(self, request, world_id):
         world = get_object_or_404(
-            World.objects.prefetch_related(
-                Prefetch('repos', queryset=RepoSnapshot.objects.all()),
-                Prefetch('languages', queryset=LanguageStats.objects.all()),
-            ).select_related('render_config'),
+            World.objects.only(
+                'id',
+                'username',
+                'generation_status',
+                'generated_at',
+                'expires_at',
+                'error_message',
+                'refresh_started_at',
+            ),
             pk=world_id,
         )
-        return Response(WorldSerializer(world).data, status=status.HTTP_200_OK)
+        data = {
+            'world_id': str(world.id),
+            'status': display_status(world),
+            'eta_seconds': eta_seconds(world),
+        }
+        if data['status'] == World.STATUS_READY and world.expires_at <= timezone.now():
+            data['stale'] = True
+        if data['status'] == World.STATUS_FAILED:
+            data['detail'] = failure_message(world)
+            fallback = find_latest_ready_world(world.username)
+            if fallback:
+                data['fallback_world_id'] = str(fallback.id)
+            reset_at = rate_limited_until()
+            if reset_at:
+                data['rate_limited_until'] = reset_at.isoformat()
+        return Response(data, status=status.HTTP_200_OK)
+
+
+# Strong validators must differ between representations, so gzip bodies get their own ETag.
+GZIP_ETAG_SUFFIX = '-gz'
+
+
+def _accepts_gzip(request):
+    return 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+
+def _apply_cache_headers(response, world, etag):
+    """Validators plus a freshness lifetime that ends when the world itself expires."""
+    if response.get('Content-Encoding') == 'gzip':
+        etag += GZIP_ETAG_SUFFIX
+    response['ETag'] = quote_etag(etag)
+    response['Last-Modified'] = http_date(world.updated_at.timestamp())
+    max_age = int((world.expires_at - timezone.now()).total_seconds())
+    if display_status(world) == World.STATUS_READY and max_age > 0:
+        patch_cache_control(response, public=True, max_age=max_age)
+    else:
+        patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def _rendered_response(request, rendered):
+    return _gzipped_response(request, bytes(rendered.body), 'application/json')
+
+
+def _gzipped_response(request, body, content_type):
+    """Serve a gzip-compressed body as-is, decompressing only for clients that cannot take gzip."""
+    response = HttpResponse(content_type=content_type)
+    if _accepts_gzip(request):
+        response['Content-Encoding'] = 'gzip'
+    else:
+        body = gzip.decompress(body)
+    response.content = body
+    return response
+
+
+def _render_on_demand(request, world_id, kind):
+    """Fallback for worlds without a current blob: serialize live, and store it once the world is ready."""
+    world = load_world_for_render(world_id)
+    if world is None:
+        raise Http404
+    if display_status(world) != World.STATUS_READY:
+        response = Response(SERIALIZERS[kind](world).data, status=status.HTTP_200_OK)
+        patch_cache_control(response, no_cache=True)
+        return response
+    with stage('render'):
+        rendered = build_rendered_world(world)
+    try:
+        save_rendered_world(world, rendered)
+    except IntegrityError:
+        pass  # A concurrent request stored the same rendering first.
+    return _apply_cache_headers(_rendered_response(request, rendered[kind]), world, rendered[kind].etag)
+
+
+def _not_modified(request, world, etag, gzipped=False):
+    """A 304 for ``etag`` if the request's validators still match, else ``None``.
+
+    ``gzipped`` marks endpoints that send gzip to clients accepting it; those are validated
+    against the gzip representation's ETag.
+    """
+    if gzipped and _accepts_gzip(request):
+        etag += GZIP_ETAG_SUFFIX
+    response = get_conditional_response(
+        request,
+        etag=quote_etag(etag),
+        last_modified=int(world.updated_at.timestamp()),
+    )
+    if response is None:
+        return None
+    return _apply_cache_headers(response, world, etag)
+
+
+def _serve_world(request, world, kind):
+    """Answer conditional requests from world metadata alone; load the blob only on a miss."""
+    etag = world_etag(world, kind)
+    not_modified = _not_modified(request, world, etag, gzipped=True)
+    if not_modified is not None:
+        return not_modified
+    rendered = get_current_rendering(world, kind, etag)
+    if rendered is None:
+        return _render_on_demand(request, world.pk, kind)
+    return _apply_cache_headers(_rendered_response(request, rendered), world, etag)
+
+
+def _world_meta_or_404(world_id):
+    world = load_world_meta(world_id)
+    if world is None:
+        raise Http404(f'No {World._meta.object_name} matches the given query.')
+    return world
+
+
+class WorldDetailView(APIView):
+    def get(self, request, world_id):
+        fields = parse_repo_fields(request.query_params.get('fields'))
+        world = _world_meta_or_404(world_id)
+        if fields is None:
+            return _serve_world(request, world, RenderedWorld.KIND_DETAIL)
+
+        # Sparse repo fields are rendered live; the stored blob always carries every field.
+        etag = world_etag(world, f"{RenderedWorld.KIND_DETAIL}:{','.join(fields)}")
+        not_modified = _not_modified(request, world, etag)
+        if not_modified is not None:
+            return not_modified
+        data = WorldSerializer(load_world_for_render(world.pk), context={'repo_fields': fields}).data
+        return _apply_cache_headers(Response(data, status=status.HTTP_200_OK), world, etag)
+
+
+class WorldGeometryView(APIView):
+    """Per-repo positions and sizes as packed little-endian typed-array columns."""
+
+    def get(self, request, world_id):
+        world = get_object_or_404(World.objects.only(*WORLD_META_FIELDS), pk=world_id)
+        etag = world_etag(world, f'geometry:{GEOMETRY_FORMAT_VERSION}')
+        not_modified = _not_modified(request, world, etag, gzipped=True)
+        if not_modified is not None:
+            return not_modified
+        body = gzip.compress(pack_world_geometry(world.pk), mtime=0)
+        return _apply_cache_headers(_gzipped_response(request, body, GEOMETRY_CONTENT_TYPE), world, etag)
+
+
+class WorldReposView(APIView):
+    """Cursor-paginated repo listing so large worlds can be streamed in progressively."""
+
+    def get(self, request, world_id):
+        fields = parse_repo_fields(request.query_params.get('fields'))
+        world = get_object_or_404(World.objects.only(*WORLD_META_FIELDS), pk=world_id)
+        etag = world_etag(world, f'repos:{request.query_params.urlencode()}')
+        not_modified = _not_modified(request, world, etag)
+        if not_modified is not None:
+            return not_modified
+
+        paginator = RepoCursorPagination()
+        queryset = RepoSnapshot.objects.filter(world_id=world.pk).values(*{*repo_value_paths(fields), 'activity_score'})
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        response = paginator.get_paginated_response(repo_rows_from_dicts(page, fields))
+        return _apply_cache_headers(response, world, etag)
 
 
 class WorldShareView(APIView):
     def get(self, request, world_id):
-        world = get_object_or_404(
-            World.objects.prefetch_related(
-                Prefetch('repos', queryset=RepoSnapshot.objects.all()),
-                Prefetch('languages', queryset=LanguageStats.objects.all()),
-            ).select_related('render_config', 'share_token'),
-            pk=world_id,
-        )
-        token = getattr(world, 'share_token', None)
+        world = _world_meta_or_404(world_id)
+        token = load_share_token(world.pk)
         if not token or not token.is_valid():
             return Response({'detail': 'Share link is not active.'}, status=status.HTTP_403_FORBIDDEN)
-        return Response(ShareSerializer(world).data, status=status.HTTP_200_OK)
+        return _serve_world(request, world, RenderedWorld.KIND_SHARE)
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; needs ``Authorization: Bearer <METRICS_TOKEN>`` when that is set."""
+    token = settings.METRICS_TOKEN
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,4 +1,12 @@
-import { GenerateWorldResponse, WorldData } from '@/lib/types';
+import {
+  GenerateWorldResponse,
+  GeometryHeader,
+  RepoPage,
+  RepoSnapshot,
+  WorldData,
+  WorldGeometry,
+  WorldStatusResponse,
+} from '@/lib/types';
 
 const API_BASE = process.env.NEXT_PUBLIC_API_BASE || 'http://127.0.0.1:8000/api';
 
@@ -20,17 +28,105 @@ async function request<T>(path: string, init?: RequestInit): Promise<T> {
   return (await res.json()) as T;
 }
 
+const STATUS_POLL_INTERVAL_MS = 1000;
+// Matches the server's default WORLD_PROCESSING_TIMEOUT_SECONDS, after which a lost job reports failed.
+const STATUS_POLL_TIMEOUT_MS = 5 * 60 * 1000;
+
+function sleep(ms: number) {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+export async function getWorldStatus(worldId: string) {
+  return request<WorldStatusResponse>(`/world/${worldId}/status`);
+}
+
 export async function generateWorld(payload: { github_url?: string; username?: string }) {
-  return request<GenerateWorldResponse>('/world/generate', {
+  const result = await request<GenerateWorldResponse>('/world/generate', {
     method: 'POST',
     body: JSON.stringify(payload),
   });
+
+  // Generation runs in the background; wait until the world is ready before handing it back.
+  const deadline = Date.now() + STATUS_POLL_TIMEOUT_MS;
+  while (true) {
+    const current = result.status === 'processing' ? await getWorldStatus(result.world_id) : null;
+    if (!current || current.status === 'ready') {
+      return { ...result, status: 'ready' as const, eta_seconds: 0 };
+    }
+    if (current.status === 'failed') {
+      if (current.fallback_world_id) {
+        return {
+          ...result,
+          world_id: current.fallback_world_id,
+          status: 'ready' as const,
+          cached: true,
+          stale: true,
+          rate_limited_until: current.rate_limited_until,
+          eta_seconds: 0,
+        };
+      }
+      throw new Error(current.detail || 'World generation failed');
+    }
+    if (Date.now() >= deadline) {
+      throw new Error('World generation is taking too long. Try again later.');
+    }
+    await sleep(STATUS_POLL_INTERVAL_MS);
+  }
 }
 
 export async function getWorld(worldId: string) {
   return request<WorldData>(`/world/${worldId}`);
 }
 
+export async function getWorldRepos<K extends keyof RepoSnapshot>(
+  worldId: string,
+  options: { fields?: K[]; cursor?: string; pageSize?: number } = {},
+) {
+  const params = new URLSearchParams();
+  if (options.fields?.length) params.set('fields', options.fields.join(','));
+  if (options.cursor) params.set('cursor', options.cursor);
+  if (options.pageSize) params.set('page_size', String(options.pageSize));
+  const query = params.toString();
+  return request<RepoPage<Pick<RepoSnapshot, K>>>(`/world/${worldId}/repos${query ? `?${query}` : ''}`);
+}
+
+export function decodeWorldGeometry(buffer: ArrayBuffer): WorldGeometry {
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== 'GPWG') {
+    throw new Error('Unexpected geometry payload');
+  }
+  const headerLength = new DataView(buffer).getUint32(4, true);
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength))) as GeometryHeader;
+  const dataStart = 8 + headerLength;
+
+  // Columns are 4-byte aligned little-endian blocks, so they can be viewed in place without copying.
+  const columns = {} as WorldGeometry['columns'];
+  for (const column of header.columns) {
+    const offset = dataStart + column.offset;
+    columns[column.name] =
+      column.type === 'float32'
+        ? new Float32Array(buffer, offset, header.count)
+        : new Int32Array(buffer, offset, header.count);
+  }
+
+  return {
+    count: header.count,
+    repoIds: header.repo_id,
+    names: header.name,
+    languages: header.primary_language,
+    columns,
+  };
+}
+
+// Default cache mode: the endpoint sends ETag and Cache-Control, so repeat loads revalidate or skip the network.
+export async function getWorldGeometry(worldId: string) {
+  const res = await fetch(`${API_BASE}/world/${worldId}/geometry`);
+  if (!res.ok) {
+    throw new Error(`Request failed (${res.status})`);
+  }
+  return decodeWorldGeometry(await res.arrayBuffer());
+}
+
 export async function getShareWorld(worldId: string) {
   return request<WorldData & { share_token?: string }>(`/world/${worldId}/share`);
 }
@@ -22,6 +22,39 @@ export interface RepoSnapshot {
   pos_z: number;
 }
 
+export interface RepoPage<T = RepoSnapshot> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
+export type GeometryColumnName =
+  | 'pos_x'
+  | 'pos_y'
+  | 'pos_z'
+  | 'activity_score'
+  | 'stars'
+  | 'forks'
+  | 'size_kb'
+  | 'commits_30d';
+
+export interface GeometryHeader {
+  version: number;
+  count: number;
+  columns: { name: GeometryColumnName; type: 'float32' | 'int32'; offset: number }[];
+  repo_id: number[];
+  name: string[];
+  primary_language: string[];
+}
+
+export interface WorldGeometry {
+  count: number;
+  repoIds: number[];
+  names: string[];
+  languages: string[];
+  columns: Record<GeometryColumnName, Float32Array | Int32Array>;
+}
+
 export interface LanguageStat {
   language: string;
   percent: number;
@@ -67,3 +100,12 @@ export interface GenerateWorldResponse {
   rate_limited_until?: string;
   eta_seconds: number;
 }
+
+export interface WorldStatusResponse {
+  world_id: string;
+  status: GenerationStatus;
+  eta_seconds: number;
+  detail?: string;
+  fallback_world_id?: string;
+  rate_limited_until?: string;
+}